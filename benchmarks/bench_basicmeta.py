@@ -0,0 +1,68 @@
+""" Three apply passes + transpose vs the fused UniversalMetaProducer.getBasicMetaData """
+
+from dbmeta import UniversalMetaProducer
+from pandas import DataFrame, Series
+from time import perf_counter
+import numpy as np
+
+
+class Artist:
+    __slots__ = ["name"]
+
+    def __init__(self, name):
+        self.name = name
+
+
+class URL:
+    __slots__ = ["url"]
+
+    def __init__(self, url):
+        self.url = url
+
+
+class MediaCounts:
+    __slots__ = ["counts"]
+
+    def __init__(self, counts):
+        self.counts = counts
+
+
+class RawData:
+    __slots__ = ["artist", "url", "mediaCounts"]
+
+    def __init__(self, i, counts):
+        self.artist = Artist(f"artist {i}")
+        self.url = URL(f"/artist/{i}")
+        self.mediaCounts = MediaCounts(counts)
+
+
+def getShard(numRows):
+    rng = np.random.default_rng(0)
+    counts = rng.integers(0, 20, size=(numRows, 3))
+    return Series([RawData(i, {"Album": int(a), "Single": int(b), "EP": int(c)}) for i, (a, b, c) in enumerate(counts)],
+                  index=[str(i) for i in range(numRows)])
+
+
+def applied(modValData):
+    artistNames = modValData.apply(lambda rData: rData.artist.name)
+    artistNames.name = "ArtistName"
+    artistURLs = modValData.apply(lambda rData: rData.url.url)
+    artistURLs.name = "URL"
+    artistNumAlbums = modValData.apply(lambda rData: sum(rData.mediaCounts.counts.values()))
+    artistNumAlbums.name = "NumAlbums"
+    return DataFrame([artistNames, artistURLs, artistNumAlbums]).T
+
+
+if __name__ == "__main__":
+    ump = UniversalMetaProducer()
+    for numRows in [10_000, 100_000, 1_000_000]:
+        modValData = getShard(numRows)
+        start = perf_counter()
+        expected = applied(modValData)
+        appliedTime = perf_counter() - start
+        start = perf_counter()
+        result = ump.getBasicMetaData(modValData)
+        fusedTime = perf_counter() - start
+        assert (result["NumAlbums"].to_numpy() == expected["NumAlbums"].to_numpy()).all()
+        print(f"{numRows:>9} rows  apply+transpose {appliedTime:7.3f}s  fused {fusedTime:7.3f}s  "
+              f"({appliedTime / fusedTime:4.1f}x, {result.memory_usage(deep=True).sum() / expected.memory_usage(deep=True).sum():.2f} memory)")
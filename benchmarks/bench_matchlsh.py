@@ -0,0 +1,57 @@
+""" MinHash/LSH candidate pairs vs exact media set overlap on two synthetic databases """
+
+from dbmeta import MatchMediaLSH
+from pandas import Series, DataFrame
+from time import perf_counter
+import numpy as np
+
+
+def getMedia(numArtists=20_000, numAlbums=200_000, overlap=0.3, seed=0):
+    # Right artists copy a left artist's media set with a few albums swapped out
+    rng = np.random.default_rng(seed)
+    left = [list({f"album {a}" for a in rng.integers(0, numAlbums, size=rng.integers(2, 20))}) for _ in range(numArtists)]
+    right = []
+    for i in range(numArtists):
+        if rng.random() < overlap:
+            media = list(left[i])
+            swap = rng.integers(0, max(len(media) // 4, 1) + 1)
+            right.append(media[swap:] + [f"album {a}" for a in rng.integers(0, numAlbums, size=swap)])
+        else:
+            right.append([f"album {a}" for a in rng.integers(0, numAlbums, size=rng.integers(2, 20))])
+    return (Series(left, index=[f"L{i}" for i in range(numArtists)]), Series(right, index=[f"R{i}" for i in range(numArtists)]))
+
+
+def exact(left: Series, right: Series, threshold: float) -> 'DataFrame':
+    # Exact Jaccard through an album => artist join (avoids all pairs, still exact)
+    leftAlbums = left.map(set).explode().rename("Album").reset_index().rename(columns={"index": "LeftID"})
+    rightAlbums = right.map(set).explode().rename("Album").reset_index().rename(columns={"index": "RightID"})
+    shared = leftAlbums.merge(rightAlbums, on="Album").groupby(["LeftID", "RightID"]).size().rename("Shared").reset_index()
+    sizes = shared["LeftID"].map(left.map(lambda x: len(set(x)))) + shared["RightID"].map(right.map(lambda x: len(set(x))))
+    shared["Jaccard"] = shared["Shared"] / (sizes - shared["Shared"])
+    retval = shared[shared["Jaccard"] >= threshold]
+    return retval
+
+
+if __name__ == "__main__":
+    threshold = 0.5
+    lsh = MatchMediaLSH(numPerm=128, bands=32)
+    for numArtists in [10_000, 40_000]:
+        left, right = getMedia(numArtists=numArtists, numAlbums=10 * numArtists)
+
+        start = perf_counter()
+        truth = exact(left, right, threshold)
+        exactTime = perf_counter() - start
+
+        start = perf_counter()
+        leftSigs, rightSigs = lsh.getSignatures(left), lsh.getSignatures(right)
+        signatureTime = perf_counter() - start
+        start = perf_counter()
+        candidates = lsh.getCandidates((left.index, leftSigs), (right.index, rightSigs))
+        candidateTime = perf_counter() - start
+
+        found = set(zip(candidates["LeftID"], candidates["RightID"]))
+        recall = np.mean([pair in found for pair in zip(truth["LeftID"], truth["RightID"])]) if len(truth) > 0 else 1.0
+        print(f"[{numArtists} x {numArtists} artists]")
+        print(f"{'exact overlap':>16} {exactTime:8.3f}s  {len(truth)} pairs with Jaccard >= {threshold}")
+        print(f"{'minhash':>16} {signatureTime:8.3f}s  {leftSigs.shape} + {rightSigs.shape} signatures")
+        print(f"{'lsh candidates':>16} {candidateTime:8.3f}s  {len(candidates)} pairs, recall {recall:.3f}")
@@ -0,0 +1,67 @@
+""" Per artist int()/median apply vs the bulk UniversalMetaProducer.getDatesMetaData """
+
+from dbmeta import UniversalMetaProducer
+from utils import getFlatList
+from pandas import Series
+from statistics import median
+from time import perf_counter
+import numpy as np
+
+
+class Release:
+    __slots__ = ["year"]
+
+    def __init__(self, year):
+        self.year = year
+
+
+class Media:
+    __slots__ = ["media"]
+
+    def __init__(self, media):
+        self.media = media
+
+
+class RawData:
+    __slots__ = ["media"]
+
+    def __init__(self, media):
+        self.media = Media(media)
+
+
+def getShard(numRows):
+    rng = np.random.default_rng(0)
+    years = [int(year) for year in rng.integers(1950, 2024, size=numRows * 10)]
+    years = [str(year) if i % 3 == 0 else (f"{year}?" if i % 17 == 0 else year) for i, year in enumerate(years)]
+    return Series([RawData({"Album": {j: Release(years[i * 10 + j]) for j in range(i % 7)},
+                            "Single": {j: Release(years[i * 10 + 7 + j]) for j in range(i % 4)}}) for i in range(numRows)],
+                  index=[str(i) for i in range(numRows)])
+
+
+def applied(ump, modValData):
+    def getMediaDateStats(mediaDates):
+        mediaTypeDates = []
+        for year in getFlatList(mediaDates.values()):
+            try:
+                mediaTypeDates.append(int(year))
+            except Exception:
+                continue
+        return (min(mediaTypeDates), max(mediaTypeDates), int(median(mediaTypeDates))) if len(mediaTypeDates) > 0 else (None, None, None)
+
+    metaData = modValData.apply(ump.utils.getMediaDates).apply(getMediaDateStats).apply(Series)
+    metaData.columns = ["MinYear", "MaxYear", "MedianYear"]
+    return metaData
+
+
+if __name__ == "__main__":
+    ump = UniversalMetaProducer()
+    for numRows in [10_000, 100_000, 500_000]:
+        modValData = getShard(numRows)
+        start = perf_counter()
+        expected = applied(ump, modValData)
+        appliedTime = perf_counter() - start
+        start = perf_counter()
+        result = ump.getDatesMetaData(modValData)
+        bulkTime = perf_counter() - start
+        assert result.equals(expected)
+        print(f"{numRows:>9} rows  apply {appliedTime:7.3f}s  bulk {bulkTime:7.3f}s  ({appliedTime / bulkTime:4.1f}x)")
@@ -0,0 +1,51 @@
+""" Pairwise concat vs SummaryAccumulator on a synthetic Basic summary """
+
+from dbmeta import SummaryAccumulator
+from pandas import DataFrame, concat
+from time import perf_counter
+import numpy as np
+import tracemalloc
+
+
+def getShards(numArtists=1_000_000, numShards=100):
+    rng = np.random.default_rng(0)
+    shardSize = numArtists // numShards
+    shards = []
+    for modVal in range(numShards):
+        ids = np.arange(modVal * shardSize, (modVal + 1) * shardSize)
+        shards.append(DataFrame({"ArtistName": np.array([f"artist {i}" for i in ids], dtype=object),
+                                 "URL": np.array([f"/artist/{i}" for i in ids], dtype=object),
+                                 "NumAlbums": rng.integers(0, 50, size=shardSize)},
+                                index=np.array([f"{i}" for i in ids], dtype=object)))
+    return shards
+
+
+def pairwise(shards):
+    retval = None
+    for shard in shards:
+        retval = concat([retval, shard]) if retval is not None else shard
+    return retval
+
+
+def accumulated(shards, maxMemory=None):
+    acc = SummaryAccumulator(maxMemory=maxMemory)
+    for modVal, shard in enumerate(shards):
+        acc.add(shard, key=modVal)
+    return acc.get()
+
+
+def run(name, func, shards, **kwargs):
+    # Peak is measured above the already loaded shards
+    tracemalloc.start()
+    start = perf_counter()
+    retval = func(shards, **kwargs)
+    elapsed = perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{name: <28} {elapsed: >8.2f}s   peak={peak / 1e6: >8.1f}MB   rows={retval.shape[0]}")
+
+
+if __name__ == "__main__":
+    shards = getShards()
+    run("pairwise concat", pairwise, shards)
+    run("SummaryAccumulator", accumulated, shards)
@@ -1,14 +1,29 @@
+from .compact import *
+from .datacache import *
 from .metabasicprod import *
+from .metacheckpoint import *
 from .metamediaprod import *
 from .metatypeprod import *
+from .metavisitor import *
+from .modvalpipe import *
 from .metaprodbase import *
 from .mediametaprod import *
 from .mediametaprod import *
+from .mediasumjoin import *
 from .mediasumfileio import *
 from .mediasumjoiner import *
+from .mediasumsched import *
 from .mediasumprodbase import *
 from .mediasumtypeprod import *
+from .matchindex import *
+from .matchlsh import *
 from .matchprod import *
+from .namecache import *
+from .fileutils import *
+from .dbpipeline import *
 from .prodbase import *
+from .summaryaccum import *
+from .summarymanifest import *
+from .summarystore import *
 from .summaryprod import *
 from .universalprod import *
@@ -0,0 +1,102 @@
+""" Compact Storage Profile For Summary/Match Data """
+
+__all__ = ["compactSummaryData", "expandSummaryData", "getCompactSeries", "getMemoryUsage"]
+
+from pandas import Series, DataFrame, to_numeric, ArrowDtype
+from pandas.api.types import is_integer_dtype, is_object_dtype, is_string_dtype, infer_dtype
+try:
+    import pyarrow as pa
+except ImportError:
+    pa = None
+
+
+###############################################################################
+# Optional pyarrow Dependency (pip install 'dbmeta[arrow]')
+###############################################################################
+def requireArrow(feature: str) -> 'None':
+    if pa is None:
+        raise ImportError(f"pyarrow is required for {feature}. Install it with the arrow extra: pip install 'dbmeta[arrow]'")
+
+
+###############################################################################
+# Per Column Conversions
+###############################################################################
+def getCompactStrings(values: Series, categoryRatio: float) -> 'Series':
+    numUnique = values.nunique(dropna=True)
+    if len(values) > 0 and numUnique <= categoryRatio * len(values):
+        return values.astype("category")
+    retval = values.astype("string[pyarrow]")
+    return retval
+
+
+def getCompactLists(values: Series) -> 'Series':
+    requireArrow("compact list columns")
+    try:
+        listValues = pa.array([value if isinstance(value, list) else None for value in values], type=pa.list_(pa.string()))
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        return values
+    retval = Series(listValues, index=values.index, name=values.name, dtype=ArrowDtype(pa.list_(pa.string())))
+    return retval
+
+
+def isArrowList(values: Series) -> 'bool':
+    retval = pa is not None and isinstance(values.dtype, ArrowDtype) and pa.types.is_list(values.dtype.pyarrow_dtype)
+    return retval
+
+
+def getObjectLists(values: Series) -> 'Series':
+    # Element-wise consumers (e.g. MatchNameStandard) expect plain python lists
+    retval = Series([value if isinstance(value, list) else None for value in values.tolist()], index=values.index, name=values.name, dtype=object)
+    return retval
+
+
+def getCompactSeries(values: Series, categoryRatio=0.5) -> 'Series':
+    assert isinstance(values, Series), f"values [{type(values)}] is not a Series"
+    if is_integer_dtype(values.dtype) and not isinstance(values.dtype, ArrowDtype):
+        if len(values) == 0:
+            return values
+        return to_numeric(values, downcast="unsigned" if values.min() >= 0 else "integer")
+    if not (is_object_dtype(values.dtype) or is_string_dtype(values.dtype)) or values.dtype == "category":
+        return values
+    valueType = infer_dtype(values, skipna=True)
+    if valueType == "string":
+        return getCompactStrings(values, categoryRatio)
+    if valueType == "integer":
+        return getCompactSeries(values.astype("int64"), categoryRatio) if values.notna().all() else values
+    if valueType == "mixed" and values.dropna().map(lambda value: isinstance(value, list)).all():
+        return getCompactLists(values)
+    return values
+
+
+###############################################################################
+# Summary/Match Artifacts
+###############################################################################
+def compactSummaryData(data, categoryRatio=0.5):
+    requireArrow("compact summary and match data")
+    if isinstance(data, Series):
+        return getCompactSeries(data, categoryRatio)
+    if isinstance(data, DataFrame):
+        retval = DataFrame({column: getCompactSeries(values, categoryRatio) for column, values in data.items()}, index=data.index)
+        retval.columns = data.columns
+        return retval
+    return data
+
+
+def expandSummaryData(data):
+    if isinstance(data, Series):
+        return getObjectLists(data) if isArrowList(data) else data
+    if isinstance(data, DataFrame):
+        arrowLists = [column for column, values in data.items() if isArrowList(values)]
+        if len(arrowLists) == 0:
+            return data
+        retval = data.copy()
+        for column in arrowLists:
+            retval[column] = getObjectLists(data[column])
+        return retval
+    return data
+
+
+def getMemoryUsage(data) -> 'int':
+    retval = data.memory_usage(deep=True)
+    retval = int(retval.sum()) if isinstance(retval, Series) else int(retval)
+    return retval
@@ -0,0 +1,173 @@
+""" Shared, Memory-Budgeted Read-Through Cache For rdio.getData/saveData """
+
+__all__ = ["DataCache", "CachedDataIO", "getDataIO", "getDataSize"]
+
+from dbbase import MusicDBRootDataIO
+from pandas import DataFrame, Series, Index
+from collections import OrderedDict
+from threading import RLock
+from .fileutils import getArtifactPath, getFileStats
+import sys
+
+
+###############################################################################
+# Approximate In-Memory Size
+###############################################################################
+def getDataSize(data) -> 'int':
+    if isinstance(data, DataFrame):
+        return int(data.memory_usage(index=True, deep=True).sum())
+    if isinstance(data, (Series, Index)):
+        return int(data.memory_usage(deep=True))
+    # Shallow estimate: the container plus its direct items (no serialization)
+    retval = sys.getsizeof(data)
+    if isinstance(data, dict):
+        retval += sum(sys.getsizeof(key) + sys.getsizeof(value) for key, value in data.items())
+    elif isinstance(data, (list, tuple, set, frozenset)):
+        retval += sum(sys.getsizeof(value) for value in data)
+    return retval
+
+
+###############################################################################
+# (db, name, modVal) => (data, size, file stats) With LRU Eviction
+###############################################################################
+class DataCache:
+    def __repr__(self):
+        return f"DataCache(entries={len(self.entries)}, bytes={self.numBytes}, maxBytes={self.maxBytes})"
+
+    def __init__(self, **kwargs):
+        self.verbose = kwargs.get('verbose', False)
+        self.maxBytes = kwargs.get('maxBytes', 1 << 30)
+        assert isinstance(self.maxBytes, int) and self.maxBytes >= 0, f"maxBytes [{self.maxBytes}] is not an int >= 0"
+        self.lock = RLock()
+        self.clear()
+
+    def clear(self) -> 'None':
+        self.entries = OrderedDict()
+        self.numBytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __getstate__(self):
+        # Entries (and the lock) stay in this process. Copies shipped to workers start empty.
+        state = self.__dict__.copy()
+        state["entries"], state["numBytes"] = OrderedDict(), 0
+        del state["lock"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.lock = RLock()
+
+    ###########################################################################
+    # Access
+    ###########################################################################
+    def get(self, key: tuple, stats=None):
+        # Returns (found, data). A hit whose file stats no longer match is dropped.
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None and (stats is None or entry[2] == stats):
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return True, entry[0]
+            if entry is not None:
+                self.invalidate(key)
+            self.misses += 1
+            return False, None
+
+    def put(self, key: tuple, data, stats=None) -> 'None':
+        size = getDataSize(data)
+        with self.lock:
+            self.invalidate(key)
+            if size > self.maxBytes:
+                return
+            self.entries[key] = (data, size, stats)
+            self.numBytes += size
+            while self.numBytes > self.maxBytes:
+                _, (_, evictSize, _) = self.entries.popitem(last=False)
+                self.numBytes -= evictSize
+                self.evictions += 1
+
+    def invalidate(self, key: tuple) -> 'None':
+        with self.lock:
+            entry = self.entries.pop(key, None)
+            if entry is not None:
+                self.numBytes -= entry[1]
+
+    def info(self) -> 'None':
+        lookups = max(self.hits + self.misses, 1)
+        print(f"  ==> DataCache: {len(self.entries)} Entries, {self.numBytes / 1e6:.1f}/{self.maxBytes / 1e6:.1f} MB, "
+              f"{self.hits} Hits ({self.hits / lookups:.1%}), {self.evictions} Evictions")
+
+
+###############################################################################
+# rdio Wrapper: getData Reads Through, saveData Writes Through
+###############################################################################
+class CachedDataIO:
+    def __repr__(self):
+        return f"CachedDataIO(db={self.rdio.db}, cache={self.dataCache})"
+
+    def __init__(self, rdio: MusicDBRootDataIO, dataCache=None, **kwargs):
+        assert isinstance(rdio, MusicDBRootDataIO), f"rdio [{rdio}] is not of type MusicDBRootDataIO"
+        self.rdio = rdio
+        self.dataCache = dataCache if isinstance(dataCache, DataCache) else DataCache(**kwargs)
+        self.copy = kwargs.get('copy', True)
+        self.validate = kwargs.get('validate', True)
+
+    def __getattr__(self, name):
+        # Everything but getData/saveData (db, getFilename, getModValData, ...) is the wrapped rdio's
+        if name == "rdio":
+            raise AttributeError(name)
+        return getattr(self.rdio, name)
+
+    def getKey(self, name: str, modVal=None) -> 'tuple':
+        return (self.rdio.db, name, modVal)
+
+    def getStats(self, name: str, modVal=None):
+        # Files written outside this process (e.g. by pool workers) must not be served stale
+        if self.validate is False:
+            return None
+        path = getArtifactPath(self.rdio, name, modVal)
+        retval = getFileStats(path) if path.exists() else None
+        return retval
+
+    def getCopy(self, data):
+        # Frames are copied on the way out only: saveData caches the saved object itself (not changed after saving)
+        retval = data.copy() if (self.copy is True and isinstance(data, (DataFrame, Series, Index))) else data
+        return retval
+
+    ###########################################################################
+    # I/O
+    ###########################################################################
+    def getData(self, name: str, modVal=None, **kwargs):
+        if len(kwargs) > 0:
+            return self.rdio.getData(name, modVal, **kwargs) if modVal is not None else self.rdio.getData(name, **kwargs)
+        key, stats = self.getKey(name, modVal), self.getStats(name, modVal)
+        found, data = self.dataCache.get(key, stats)
+        if found is True:
+            return self.getCopy(data)
+        data = self.rdio.getData(name, modVal) if modVal is not None else self.rdio.getData(name)
+        if data is None:
+            return data
+        self.dataCache.put(key, data, stats)
+        return self.getCopy(data)
+
+    def saveData(self, name: str, modVal=None, **kwargs) -> 'None':
+        key = self.getKey(name, modVal)
+        self.dataCache.invalidate(key)
+        if modVal is not None:
+            self.rdio.saveData(name, modVal, **kwargs)
+        else:
+            self.rdio.saveData(name, **kwargs)
+        data = kwargs.get('data')
+        if data is not None:
+            self.dataCache.put(key, data, self.getStats(name, modVal))
+
+
+def getDataIO(rdio, **kwargs):
+    # Producers wrap their rdio when given a shared dataCache=DataCache(...)
+    dataCache = kwargs.get('dataCache')
+    if not isinstance(dataCache, DataCache) or isinstance(rdio, CachedDataIO):
+        return rdio
+    retval = CachedDataIO(rdio, dataCache)
+    return retval
@@ -0,0 +1,204 @@
+""" Meta => Summary => Match Pipeline Across MasterDBs (Budgeted, Skip-If-Unchanged, Resumable) """
+
+__all__ = ["MusicDBPipeline", "makePipelineDB"]
+
+from dbmaster import MasterDBs
+from dbbase import MusicDBRootDataIO, getModVals
+from utils import Timestat
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from functools import partial
+from hashlib import blake2b
+from time import perf_counter
+from .metaprodbase import MetaProducerBase
+from .summaryprod import SummaryProducerIO
+from .matchprod import MatchProducerIO
+from .prodbase import MatchOmitBase
+from .metacheckpoint import MetaCheckpoint, getProducerFingerprint
+from .datacache import DataCache, getDataIO
+from .fileutils import getFileStats
+import traceback
+import pickle
+import os
+
+
+###############################################################################
+# Per DB State (Next To The ModVal Files)
+###############################################################################
+def getPipelineStateFilename(rdio: MusicDBRootDataIO):
+    return MetaCheckpoint(rdio).getRawFilename(getModVals()[0]).parent / "PipelineState.p"
+
+
+def loadPipelineState(rdio: MusicDBRootDataIO) -> 'dict':
+    stateFile = getPipelineStateFilename(rdio)
+    if not stateFile.exists():
+        return {}
+    with open(stateFile, "rb") as f:
+        retval = pickle.load(f)
+    return retval
+
+
+def savePipelineState(rdio: MusicDBRootDataIO, state: dict) -> 'None':
+    stateFile = getPipelineStateFilename(rdio)
+    tmpFile = stateFile.with_suffix(".tmp")
+    with open(tmpFile, "wb") as f:
+        pickle.dump(state, f, protocol=pickle.HIGHEST_PROTOCOL)
+    tmpFile.replace(stateFile)
+
+
+def getRawFingerprint(rdio: MusicDBRootDataIO) -> 'str':
+    # (size, mtime) of every raw ModVal shard: the inputs of the first stage
+    fhash = blake2b(digest_size=16)
+    checkpoint = MetaCheckpoint(rdio)
+    for modVal in getModVals():
+        rawFile = checkpoint.getRawFilename(modVal)
+        fhash.update(repr((modVal, getFileStats(rawFile) if rawFile.exists() else None)).encode("utf-8"))
+    return fhash.hexdigest()
+
+
+###############################################################################
+# One DB: Stages In Order (module level so it can run in a process pool)
+###############################################################################
+def makePipelineDB(db: str, stages: dict, options: dict) -> 'dict':
+    # A stage's fingerprint chains the upstream fingerprint with its producer, so a rerun
+    # upstream stage (or changed producer code or config) invalidates everything after it.
+    verbose = options.get('verbose', False)
+    test = options.get('test', False)
+    force = options.get('force', False)
+    rdio = MusicDBRootDataIO(db)
+    state = loadPipelineState(rdio)
+    # Stages of one DB run back-to-back here, so artifacts a stage saves are served from memory to the next
+    dataCache = DataCache(maxBytes=options['cacheBytes']) if isinstance(options.get('cacheBytes'), int) else None
+    fingerprint = getRawFingerprint(rdio)
+    retval = {}
+    for stage, factory in stages.items():
+        start = perf_counter()
+        try:
+            producer = factory(getDataIO(rdio, dataCache=dataCache))
+            fhash = blake2b(digest_size=16)
+            fhash.update(repr((fingerprint, getProducerFingerprint(producer))).encode("utf-8"))
+            fingerprint = fhash.hexdigest()
+            if force is False and state.get(stage, {}).get("Status") == "Done" and state[stage].get("Fingerprint") == fingerprint:
+                retval[stage] = {"Status": "Skipped", "Seconds": perf_counter() - start}
+                continue
+
+            producer.make(verbose=verbose, test=test, force=force, workers=options.get('workers'))
+            failedModVals = getattr(producer, 'failedModVals', {})
+            if len(failedModVals) > 0:
+                raise RuntimeError(f"{stage} failed for ModVals {sorted(failedModVals.keys())}")
+            retval[stage] = {"Status": "Done", "Fingerprint": fingerprint, "Seconds": perf_counter() - start}
+        except Exception:
+            retval[stage] = {"Status": "Failed", "Error": traceback.format_exc(), "Seconds": perf_counter() - start}
+
+        if test is False:
+            state[stage] = retval[stage]
+            savePipelineState(rdio, state)
+        if retval[stage]["Status"] == "Failed":
+            break
+    return retval
+
+
+###############################################################################
+# All DBs: Independent DBs Concurrently Under A Worker/Memory Budget
+###############################################################################
+class MusicDBPipeline:
+    def __repr__(self):
+        return f"MusicDBPipeline(dbs={self.dbs}, stages={list(self.stages.keys())}, workers={self.workers}, maxMemory={self.maxMemory})"
+
+    def __init__(self, dbs=None, stages=None, **kwargs):
+        self.verbose = kwargs.get('verbose', False)
+        self.dbs = list(dbs) if dbs is not None else list(MasterDBs().getDBs())
+        self.stages = stages if stages is not None else {"Meta": MetaProducerBase, "Summary": SummaryProducerIO,
+                                                         "Match": partial(MatchProducerIO, omit=MatchOmitBase())}
+        assert isinstance(self.stages, dict), f"stages [{type(self.stages)}] is not a dict"
+        for stage, factory in self.stages.items():
+            assert callable(factory), f"stage [{stage}] factory is not callable"
+        self.workers = kwargs.get('workers', os.cpu_count())
+        self.maxMemory = kwargs.get('maxMemory', None)
+        self.memoryFactor = kwargs.get('memoryFactor', 4.0)
+        self.cacheBytes = kwargs.get('cacheBytes', None)
+        assert isinstance(self.workers, int) and self.workers > 0, f"workers [{self.workers}] is not a positive int"
+        self.graph = self.getGraph()
+        self.results = {}
+
+    ###########################################################################
+    # Graph And Budget
+    ###########################################################################
+    def getGraph(self) -> 'dict':
+        # (db, stage) => upstream (db, stage). DBs do not depend on each other.
+        retval = {}
+        for db in self.dbs:
+            upstream = []
+            for stage in self.stages.keys():
+                retval[(db, stage)] = upstream
+                upstream = [(db, stage)]
+        return retval
+
+    def getMemoryEstimate(self, db: str) -> 'int':
+        # Peak memory of a DB's stages scales with its raw ModVal data
+        checkpoint = MetaCheckpoint(MusicDBRootDataIO(db))
+        rawFiles = [checkpoint.getRawFilename(modVal) for modVal in getModVals()]
+        retval = int(self.memoryFactor * sum([rawFile.stat().st_size for rawFile in rawFiles if rawFile.exists()]))
+        retval += self.cacheBytes if isinstance(self.cacheBytes, int) else 0
+        return retval
+
+    def getConcurrency(self) -> 'int':
+        return max(min(self.workers, len(self.dbs)), 1)
+
+    def getStageWorkers(self) -> 'int':
+        # Each running DB gets an equal share of the global worker budget for its stages
+        return max(self.workers // self.getConcurrency(), 1)
+
+    def isAdmissible(self, memory: int, runningMemory: int, numRunning: int) -> 'bool':
+        if numRunning >= self.getConcurrency():
+            return False
+        if self.maxMemory is None or numRunning == 0:
+            return True
+        retval = runningMemory + memory <= self.maxMemory
+        return retval
+
+    ###########################################################################
+    # Runner
+    ###########################################################################
+    def make(self, **kwargs) -> 'dict':
+        verbose = kwargs.get('verbose', self.verbose)
+        options = {"verbose": verbose, "test": kwargs.get('test', False), "force": kwargs.get('force', False),
+                   "workers": kwargs.get('stageWorkers', self.getStageWorkers()), "cacheBytes": kwargs.get('cacheBytes', self.cacheBytes)}
+        memory = {db: self.getMemoryEstimate(db) for db in self.dbs} if self.maxMemory is not None else {db: 0 for db in self.dbs}
+        ts = Timestat(f"Running {list(self.stages.keys())} For {len(self.dbs)} DBs (concurrency={self.getConcurrency()}, stage workers={options['workers']})", verbose=verbose)
+
+        self.results = {}
+        if self.getConcurrency() == 1:
+            for db in self.dbs:
+                self.results[db] = makePipelineDB(db, self.stages, options)
+        else:
+            pending, running = list(self.dbs), {}
+            with ProcessPoolExecutor(max_workers=self.getConcurrency()) as executor:
+                while len(pending) > 0 or len(running) > 0:
+                    # Admit DBs in order while they fit in the memory budget (one always runs)
+                    while len(pending) > 0 and self.isAdmissible(memory[pending[0]], sum([memory[db] for db in running.values()]), len(running)):
+                        db = pending.pop(0)
+                        running[executor.submit(makePipelineDB, db, self.stages, options)] = db
+                    finished, _ = wait(running.keys(), return_when=FIRST_COMPLETED)
+                    for future in finished:
+                        db = running.pop(future)
+                        try:
+                            self.results[db] = future.result()
+                        except Exception:
+                            self.results[db] = {"Pipeline": {"Status": "Failed", "Error": traceback.format_exc(), "Seconds": None}}
+                        ts.update(n=len(self.results), N=len(self.dbs))
+            self.results = {db: self.results[db] for db in self.dbs}
+
+        self.report(verbose)
+        ts.stop()
+        return self.results
+
+    def report(self, verbose=True) -> 'None':
+        failed = {db: stage for db, results in self.results.items() for stage, result in results.items() if result["Status"] == "Failed"}
+        if verbose is True:
+            for db, results in self.results.items():
+                summary = " | ".join([f"{stage}={result['Status']}" + (f" ({result['Seconds']:.1f}s)" if result['Seconds'] is not None else "") for stage, result in results.items()])
+                print(f"  ==> {db: <20} {summary}")
+        if len(failed) > 0:
+            print(f"  ==> {len(failed)}/{len(self.results)} DBs Failed: {failed}")
+            for db, stage in failed.items():
+                print(f"    {db: <20} {stage: <10} | {self.results[db][stage]['Error'].strip().splitlines()[-1]}")
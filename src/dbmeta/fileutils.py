@@ -0,0 +1,32 @@
+""" File Utilities For Producer Side Data (Manifests, Checkpoints, Indices) """
+
+__all__ = ["getArtifactPath", "getSidecarPath", "getFileStats", "getFileHash"]
+
+from dbbase import MusicDBRootDataIO
+from pathlib import Path
+from hashlib import blake2b
+
+
+def getArtifactPath(rdio: MusicDBRootDataIO, name: str, modVal=None) -> 'Path':
+    finfo = rdio.getFilename(name, modVal) if modVal is not None else rdio.getFilename(name)
+    retval = Path(finfo.str) if hasattr(finfo, 'str') else Path(finfo)
+    return retval
+
+
+def getSidecarPath(rdio: MusicDBRootDataIO, anchor: str, fname: str) -> 'Path':
+    # Producer side files live next to an existing rdio artifact
+    retval = getArtifactPath(rdio, anchor).parent / fname
+    return retval
+
+
+def getFileStats(path: Path) -> 'tuple':
+    stat = path.stat()
+    return (stat.st_size, stat.st_mtime_ns)
+
+
+def getFileHash(path: Path, chunkSize=1 << 20) -> 'str':
+    fhash = blake2b(digest_size=16)
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunkSize), b""):
+            fhash.update(chunk)
+    return fhash.hexdigest()
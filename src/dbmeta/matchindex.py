@@ -0,0 +1,147 @@
+""" Inverted N-Gram/Token Index Over MatchName (Cross-DB Candidate Retrieval) """
+
+__all__ = ["MatchNameIndex"]
+
+from dbbase import MusicDBRootDataIO
+from pandas import Series, Index, factorize
+from time import perf_counter
+from .fileutils import getSidecarPath
+import numpy as np
+
+
+###############################################################################
+# MatchName => Terms (Character N-Grams + Tokens) => CSR Postings
+###############################################################################
+class MatchNameIndex:
+    def __repr__(self):
+        return f"MatchNameIndex(names={len(self.ids)}, terms={len(self.terms)}, postings={len(self.postings)}, ngram={self.ngram})"
+
+    def __init__(self, **kwargs):
+        self.verbose = kwargs.get('verbose', False)
+        self.ngram = kwargs.get('ngram', 3)
+        self.minTokenLength = kwargs.get('minTokenLength', 2)
+        self.maxFrequency = kwargs.get('maxFrequency', 0.1)
+        assert isinstance(self.ngram, int) and self.ngram > 0, f"ngram [{self.ngram}] is not a positive int"
+        self.clear()
+
+    def clear(self) -> 'None':
+        self.ids = Index([])
+        self.terms = np.array([], dtype=object)
+        self.offsets = np.zeros(1, dtype=np.int64)
+        self.postings = np.array([], dtype=np.int32)
+        self.idf = np.array([], dtype=np.float32)
+        self.termCodes = None
+
+    ###########################################################################
+    # Terms
+    ###########################################################################
+    def getTerms(self, name) -> 'set':
+        if not isinstance(name, str) or len(name) == 0:
+            return set()
+        padded = f" {name} "
+        retval = {f"#{padded[i:i+self.ngram]}" for i in range(max(len(padded) - self.ngram + 1, 1))}
+        retval |= {f"@{token}" for token in name.split() if len(token) >= self.minTokenLength}
+        return retval
+
+    def getTermCodes(self) -> 'dict':
+        if self.termCodes is None:
+            self.termCodes = {term: code for code, term in enumerate(self.terms)}
+        return self.termCodes
+
+    ###########################################################################
+    # Build
+    ###########################################################################
+    def build(self, names: Series) -> 'MatchNameIndex':
+        assert isinstance(names, Series), f"names [{type(names)}] is not a Series"
+        self.clear()
+        names = names[names.notna()]
+        docTerms = [self.getTerms(name) for name in names.to_numpy()]
+        numTerms = np.fromiter((len(terms) for terms in docTerms), dtype=np.int64, count=len(docTerms))
+        docs = np.repeat(np.arange(len(docTerms), dtype=np.int32), numTerms)
+        codes, terms = factorize(np.fromiter((term for terms in docTerms for term in terms), dtype=object, count=int(numTerms.sum())))
+
+        # Sort (term, doc) pairs by term so each term's postings are contiguous
+        order = np.argsort(codes, kind="stable")
+        df = np.bincount(codes, minlength=len(terms))
+        self.ids = names.index
+        self.terms = np.asarray(terms, dtype=object)
+        self.offsets = np.concatenate([[0], np.cumsum(df)]).astype(np.int64)
+        self.postings = docs[order].astype(np.int32)
+        self.idf = np.log((1 + len(self.ids)) / (1 + df)).astype(np.float32) + np.float32(1.0)
+        if self.verbose is True:
+            print(f"  ==> Indexed {len(self.ids)} Names Using {len(self.terms)} Terms And {len(self.postings)} Postings")
+        return self
+
+    ###########################################################################
+    # IO
+    ###########################################################################
+    def getFilename(self, rdio: MusicDBRootDataIO):
+        return getSidecarPath(rdio, "MatchName", "MatchNameIndex.npz")
+
+    def save(self, filename) -> 'None':
+        np.savez(filename, ids=np.asarray(self.ids, dtype=object), terms=self.terms, offsets=self.offsets,
+                 postings=self.postings, idf=self.idf, ngram=np.array([self.ngram, self.minTokenLength]))
+
+    def load(self, filename) -> 'MatchNameIndex':
+        with np.load(filename, allow_pickle=True) as indexData:
+            self.ids = Index(indexData["ids"])
+            self.terms = indexData["terms"]
+            self.offsets = indexData["offsets"]
+            self.postings = indexData["postings"]
+            self.idf = indexData["idf"]
+            self.ngram, self.minTokenLength = [int(value) for value in indexData["ngram"]]
+        self.termCodes = None
+        return self
+
+    def make(self, rdio: MusicDBRootDataIO, **kwargs) -> 'MatchNameIndex':
+        test = kwargs.get('test', False)
+        self.build(rdio.getData("MatchName"))
+        if test is True:
+            print("  ==> Only testing. Will not save.")
+        else:
+            self.save(self.getFilename(rdio))
+        return self
+
+    def read(self, rdio: MusicDBRootDataIO) -> 'MatchNameIndex':
+        return self.load(self.getFilename(rdio))
+
+    ###########################################################################
+    # Query
+    ###########################################################################
+    def query(self, name: str, k=10, budget=None) -> 'Series':
+        # Top-k artist IDs by summed idf of shared terms. Rarest terms are scored first so
+        # a latency budget (seconds) cuts off the least selective (longest) postings. Terms
+        # found in more than maxFrequency of all names are only used if nothing rarer matches.
+        assert isinstance(k, (int, np.integer)) and k > 0, f"k [{k}] is not a positive int"
+        start = perf_counter()
+        termCodes = self.getTermCodes()
+        codes = np.array([termCodes[term] for term in self.getTerms(name) if term in termCodes], dtype=np.int64)
+        df = self.offsets[codes + 1] - self.offsets[codes]
+        order = np.argsort(df, kind="stable")
+        codes, df = codes[order], df[order]
+        common = df > self.maxFrequency * len(self.ids)
+        if not common.all():
+            codes, df = codes[~common], df[~common]
+
+        docs, weights = [], []
+        for code in codes:
+            if budget is not None and len(docs) > 0 and perf_counter() - start > budget:
+                break
+            postings = self.postings[self.offsets[code]:self.offsets[code + 1]]
+            docs.append(postings)
+            weights.append(np.full(len(postings), self.idf[code], dtype=np.float32))
+        if len(docs) == 0:
+            return Series([], index=self.ids[:0], name="Score", dtype=np.float32)
+
+        docs, weights = np.concatenate(docs), np.concatenate(weights)
+        if len(docs) > len(self.ids) // 8:
+            scores = np.bincount(docs, weights=weights, minlength=len(self.ids)).astype(np.float32)
+            candidates = np.flatnonzero(scores)
+            scores = scores[candidates]
+        else:
+            candidates, inverse = np.unique(docs, return_inverse=True)
+            scores = np.bincount(inverse, weights=weights).astype(np.float32)
+        top = np.argpartition(-scores, k)[:k] if len(scores) > k else np.arange(len(scores))
+        top = top[np.argsort(-scores[top], kind="stable")]
+        retval = Series(scores[top], index=self.ids[candidates[top]], name="Score")
+        return retval
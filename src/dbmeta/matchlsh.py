@@ -0,0 +1,145 @@
+""" MinHash Signatures + LSH Banding Over Match{Key} Media Sets (Cross-DB Candidate Pairs) """
+
+__all__ = ["MatchMediaLSH"]
+
+from dbbase import MusicDBRootDataIO
+from pandas import Series, DataFrame, Index, concat
+from pandas.util import hash_array
+from .fileutils import getSidecarPath
+from .compact import expandSummaryData
+import numpy as np
+
+
+MAX_HASH = np.uint32((1 << 32) - 1)
+HASH_VERSION = 2
+
+
+###############################################################################
+# Match{Key} (Artist ID => Standardized Media Names) => MinHash => LSH Buckets
+###############################################################################
+class MatchMediaLSH:
+    def __repr__(self):
+        return f"MatchMediaLSH(numPerm={self.numPerm}, bands={self.bands}, rows={self.rows})"
+
+    def __init__(self, **kwargs):
+        self.verbose = kwargs.get('verbose', False)
+        self.numPerm = kwargs.get('numPerm', 128)
+        self.bands = kwargs.get('bands', 32)
+        self.maxBucketSize = kwargs.get('maxBucketSize', 1000)
+        self.chunkSize = kwargs.get('chunkSize', 16)
+        self.maxElements = kwargs.get('maxElements', 1 << 18)
+        assert isinstance(self.numPerm, int) and isinstance(self.bands, int), f"numPerm [{self.numPerm}] and bands [{self.bands}] must be ints"
+        assert self.numPerm % self.bands == 0, f"bands [{self.bands}] does not divide numPerm [{self.numPerm}]"
+        self.rows = self.numPerm // self.bands
+
+        # Multiply-shift hashes h(x) = ((a*x + b) mod 2^64) >> 32 on 32 bit element hashes (a odd).
+        # Small multipliers mod a large prime are nearly monotone in x and bias the Jaccard estimate low.
+        self.seed = kwargs.get('seed', 1)
+        rng = np.random.default_rng(self.seed)
+        self.a = rng.integers(0, 1 << 64, size=self.numPerm, dtype=np.uint64, endpoint=False) | np.uint64(1)
+        self.b = rng.integers(0, 1 << 64, size=self.numPerm, dtype=np.uint64, endpoint=False)
+        self.bandMix = rng.integers(1, 1 << 63, size=self.rows, dtype=np.uint64) | np.uint64(1)
+
+    ###########################################################################
+    # Signatures
+    ###########################################################################
+    def getMediaSets(self, media: Series) -> 'tuple':
+        # Flat element array + per artist set sizes (duplicates are harmless for MinHash)
+        media = expandSummaryData(media)
+        sizes = np.fromiter((len(value) if isinstance(value, (list, tuple, set, np.ndarray)) else 0 for value in media.to_numpy()), dtype=np.int64, count=len(media))
+        elements = [element for value in media.to_numpy() if isinstance(value, (list, tuple, set, np.ndarray)) for element in value]
+        return np.asarray(elements, dtype=object), sizes
+
+    def getSignatures(self, media: Series) -> 'np.ndarray':
+        assert isinstance(media, Series), f"media [{type(media)}] is not a Series"
+        elements, sizes = self.getMediaSets(media)
+        signatures = np.full((len(media), self.numPerm), MAX_HASH, dtype=np.uint32)
+        nonEmpty = np.flatnonzero(sizes > 0)
+        if len(nonEmpty) == 0:
+            return signatures
+
+        # Artists are hashed in slices of ~maxElements elements so that each (chunkSize, maxElements) hash block stays bounded
+        ends = np.cumsum(sizes[nonEmpty])
+        begins = ends - sizes[nonEmpty]
+        first = 0
+        while first < len(nonEmpty):
+            last = max(int(np.searchsorted(ends, begins[first] + self.maxElements, side="right")), first + 1)
+            artists, offset = nonEmpty[first:last], begins[first]
+            values = (hash_array(elements[offset:ends[last - 1]]) & np.uint64(0xFFFFFFFF)).reshape(1, -1)
+            starts = begins[first:last] - offset
+            for start in range(0, self.numPerm, self.chunkSize):
+                perms = slice(start, start + self.chunkSize)
+                with np.errstate(over="ignore"):
+                    hashes = (self.a[perms, None] * values + self.b[perms, None]) >> np.uint64(32)
+                signatures[artists, perms] = np.minimum.reduceat(hashes, starts, axis=1).T
+            first = last
+        return signatures
+
+    ###########################################################################
+    # LSH Banding
+    ###########################################################################
+    def getBandKeys(self, signatures: np.ndarray) -> 'np.ndarray':
+        bandKeys = np.empty((signatures.shape[0], self.bands), dtype=np.uint64)
+        with np.errstate(over="ignore"):
+            for band in range(self.bands):
+                rows = signatures[:, band * self.rows:(band + 1) * self.rows].astype(np.uint64)
+                bandKeys[:, band] = (rows * self.bandMix).sum(axis=1) + np.uint64(band)
+        return bandKeys
+
+    def getCandidates(self, left: tuple, right: tuple, threshold=0.0) -> 'DataFrame':
+        # left/right are (ids, signatures). Pairs sharing at least one band bucket are scored
+        # by the fraction of equal MinHash values (estimated Jaccard).
+        leftIDs, leftSigs = left
+        rightIDs, rightSigs = right
+        leftValid = np.flatnonzero((leftSigs != MAX_HASH).any(axis=1))
+        rightValid = np.flatnonzero((rightSigs != MAX_HASH).any(axis=1))
+        leftKeys, rightKeys = self.getBandKeys(leftSigs[leftValid]), self.getBandKeys(rightSigs[rightValid])
+
+        pairs = []
+        for band in range(self.bands):
+            leftBand = DataFrame({"Key": leftKeys[:, band], "Left": leftValid})
+            rightBand = DataFrame({"Key": rightKeys[:, band], "Right": rightValid})
+            if self.maxBucketSize is not None:
+                leftBand = leftBand[leftBand.groupby("Key")["Key"].transform("size") <= self.maxBucketSize]
+                rightBand = rightBand[rightBand.groupby("Key")["Key"].transform("size") <= self.maxBucketSize]
+            pairs.append(leftBand.merge(rightBand, on="Key")[["Left", "Right"]])
+        pairs = concat(pairs).drop_duplicates() if len(pairs) > 0 else DataFrame({"Left": [], "Right": []}, dtype=np.int64)
+        left, right = pairs["Left"].to_numpy(), pairs["Right"].to_numpy()
+
+        jaccard = (leftSigs[left] == rightSigs[right]).mean(axis=1) if len(pairs) > 0 else np.array([], dtype=np.float64)
+        retval = DataFrame({"LeftID": Index(leftIDs)[left], "RightID": Index(rightIDs)[right], "Jaccard": jaccard})
+        retval = retval[retval["Jaccard"] >= threshold].sort_values("Jaccard", ascending=False, kind="stable").reset_index(drop=True)
+        if self.verbose is True:
+            print(f"  ==> Found {retval.shape[0]} Candidate Pairs (Jaccard >= {threshold}) From {len(pairs)} Bucket Collisions")
+        return retval
+
+    ###########################################################################
+    # IO
+    ###########################################################################
+    def getFilename(self, rdio: MusicDBRootDataIO, key: str):
+        return getSidecarPath(rdio, f"Match{key}", f"Match{key}MinHash.npz")
+
+    def make(self, rdio: MusicDBRootDataIO, matchTypes: list, **kwargs) -> 'dict':
+        test = kwargs.get('test', False)
+        retval = {}
+        for key in [key for key in matchTypes if key != "Name"]:
+            media = rdio.getData(f"Match{key}")
+            if not isinstance(media, Series):
+                continue
+            retval[key] = (media.index, self.getSignatures(media))
+            if self.verbose is True:
+                print(f"  ==> Created {len(media)} Artist ID => {key} MinHash Signatures")
+            if test is True:
+                print("  ==> Only testing. Will not save.")
+                continue
+            np.savez(self.getFilename(rdio, key), ids=np.asarray(media.index, dtype=object), signatures=retval[key][1],
+                     params=np.array([self.numPerm, self.seed, HASH_VERSION]))
+        return retval
+
+    def read(self, rdio: MusicDBRootDataIO, key: str) -> 'tuple':
+        with np.load(self.getFilename(rdio, key), allow_pickle=True) as signatureData:
+            numPerm, seed, version = ([int(value) for value in signatureData["params"]] + [1])[:3]
+            assert (numPerm, seed) == (self.numPerm, self.seed), f"Saved {key} signatures use numPerm={numPerm}/seed={seed}, not {self.numPerm}/{self.seed}"
+            assert version == HASH_VERSION, f"Saved {key} signatures use hash version {version}, not {HASH_VERSION}. Rerun make()"
+            retval = (Index(signatureData["ids"]), signatureData["signatures"])
+        return retval
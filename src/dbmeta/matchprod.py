@@ -5,8 +5,40 @@ __all__ = ["MatchProducerIO", "MusicDBIgnoreData"]
 from dbmaster import MasterParams, MasterPersist
 from dbbase import MusicDBRootDataIO
 from utils import Timestat, FileIO, header
-from pandas import Series, DataFrame
+from pandas import Series, DataFrame, Index, CategoricalDtype, to_numeric, concat
+from pandas.api.types import infer_dtype
+from pandas.util import hash_pandas_object
+import numpy as np
+import pickle
+from concurrent.futures import ProcessPoolExecutor
 from .prodbase import MatchProducerBase, MatchOmitBase
+from .summarystore import SummaryPartitionIO
+from .namecache import NameStandardCache
+from .compact import compactSummaryData, expandSummaryData
+from .fileutils import getSidecarPath, getArtifactPath
+from .metacheckpoint import getProducerFingerprint
+
+
+###############################################################################
+# Match Type Workers (module level so they can run in a process pool)
+###############################################################################
+matchTypeWorker = {}
+
+
+def initMatchTypeWorker(producer, matchableResults, options) -> 'None':
+    matchTypeWorker["producer"] = producer
+    matchTypeWorker["matchableResults"] = matchableResults
+    matchTypeWorker["options"] = options
+    if isinstance(producer.mns, NameStandardCache):
+        producer.mns.startUpdates()
+
+
+def makeMatchTypeWorker(key: str) -> 'tuple':
+    # (changeLog, new name cache entries) so the parent keeps what the worker standardized
+    producer = matchTypeWorker["producer"]
+    changeLog = producer.makeMatchTypeData(key, matchTypeWorker["matchableResults"], matchTypeWorker["options"])
+    updates = producer.mns.popUpdates() if isinstance(producer.mns, NameStandardCache) else None
+    return changeLog, updates
 
 
 ###############################################################################
@@ -21,6 +53,10 @@ class MatchProducerIO(MatchProducerBase):
         self.verbose = kwargs.get('verbose', False)
         self.minMedia = 1
         self.omit = omit
+        self.partitioned = kwargs.get('partitioned', False)
+        self.compact = kwargs.get('compact', False)
+        self.workers = kwargs.get('workers', None)
+        self.incremental = kwargs.get('incremental', False)
         
         if self.verbose is True:
             print(self.__repr__())
@@ -34,6 +70,137 @@ class MatchProducerIO(MatchProducerBase):
         if dupls.shape[0] > 0:
             raise ValueError(f"Found duplicated indices in metadata: {dupls.index}")
         
+    ###########################################################################
+    # Matchable Mask (Computed Once For All Match Types)
+    ###########################################################################
+    def getNameRequirement(self, artistNameData: Series) -> 'Series':
+        if isinstance(artistNameData.dtype, CategoricalDtype):
+            categoryReq = self.getNameRequirement(Series(artistNameData.cat.categories)).to_numpy()
+            codes = artistNameData.cat.codes.to_numpy()
+            retval = np.where(codes >= 0, categoryReq[np.maximum(codes, 0)], False) if len(categoryReq) > 0 else np.zeros(len(codes), dtype=bool)
+            return Series(retval, index=artistNameData.index)
+        valueType = infer_dtype(artistNameData, skipna=True)
+        if valueType == "empty":
+            return Series(False, index=artistNameData.index)
+        if valueType == "string":
+            return artistNameData.str.len().gt(0).fillna(False).astype(bool)
+        return artistNameData.map(lambda value: (isinstance(value, str) and len(value) > 0)).astype(bool)
+    
+    def getMatchableResults(self, artistNameData: Series, artistCountsData: Series) -> 'Series':
+        countsReq = to_numeric(artistCountsData, errors="coerce").ge(self.minMedia)
+        nameReq = self.getNameRequirement(artistNameData)
+        omitReq = ~artistNameData.index.isin(self.omit.getOmitIndex())
+        retval = (countsReq & nameReq) & Series(omitReq, index=artistNameData.index)
+        return retval
+    
+    def getMatchableData(self, summaryData, matchableResults: Series):
+        if summaryData.index.equals(matchableResults.index):
+            return summaryData.loc[matchableResults.to_numpy()]
+        return summaryData.loc[matchableResults.reindex(summaryData.index, fill_value=False).to_numpy()]
+        
+    ###########################################################################
+    # Incremental (Delta) Match Data
+    ###########################################################################
+    def getSnapshotFilename(self, key: str):
+        return getSidecarPath(self.rdio, f"Match{key}", f"Match{key}Snapshot.p")
+    
+    def getSnapshot(self, matchableData) -> 'Series':
+        # One hash per artist ID of the (matchable) summary input used to build Match{key}
+        try:
+            retval = hash_pandas_object(matchableData, index=False)
+        except TypeError:
+            retval = hash_pandas_object(matchableData.map(repr), index=False)
+        return retval
+    
+    def getStandardName(self) -> 'str':
+        # Source and config of the (unwrapped) name standard, so a changed standard rebuilds everything
+        standard = getattr(self.mns, 'standard', self.mns)
+        retval = f"{standard.__class__.__name__}-{getProducerFingerprint(standard)}"
+        return retval
+    
+    def saveSnapshot(self, key: str, snapshot: Series) -> 'None':
+        with open(self.getSnapshotFilename(key), "wb") as f:
+            pickle.dump({"standard": self.getStandardName(), "snapshot": snapshot}, f, protocol=pickle.HIGHEST_PROTOCOL)
+    
+    def getMatchDelta(self, key: str, snapshot: Series) -> 'tuple':
+        snapshotFile = self.getSnapshotFilename(key)
+        if not (snapshotFile.exists() and getArtifactPath(self.rdio, f"Match{key}").exists()):
+            return None, None
+        with open(snapshotFile, "rb") as f:
+            previous = pickle.load(f)
+        if previous.get("standard") != self.getStandardName():
+            return None, None
+        previousSnapshot = previous["snapshot"]
+        previousMatchData = expandSummaryData(self.rdio.getData(f"Match{key}"))
+        
+        common = snapshot.index.intersection(previousSnapshot.index)
+        changed = common[snapshot.loc[common].to_numpy() != previousSnapshot.loc[common].to_numpy()]
+        changeLog = {"Added": snapshot.index.difference(previousSnapshot.index),
+                     "Changed": changed,
+                     "Removed": previousSnapshot.index.difference(snapshot.index)}
+        return previousMatchData, changeLog
+    
+    def saveChangeLog(self, changeLogs: dict) -> 'None':
+        # Affected artist IDs per match type for downstream (cross-DB) matching
+        with open(getSidecarPath(self.rdio, "MatchName", "MatchChangeLog.p"), "wb") as f:
+            pickle.dump(changeLogs, f, protocol=pickle.HIGHEST_PROTOCOL)
+    
+    ###########################################################################
+    # Single Match Type
+    ###########################################################################
+    def makeMatchTypeData(self, key: str, matchableResults: Series, options: dict) -> 'dict':
+        verbose = options.get('verbose', True)
+        if verbose:
+            print(f"  ==> Loading {key} ... ", end="")
+        sio = SummaryPartitionIO(self.rdio) if options.get('partitioned') is True else None
+        if sio is not None and sio.exists(f"Summary{key}"):
+            summaryData = sio.read(f"Summary{key}", modVals=options.get('modVals'))
+        else:
+            summaryData = self.rdio.getData(f"Summary{key}")
+        if not isinstance(summaryData, (DataFrame, Series)):
+            print("No Data")
+            return None
+            
+        dtype = "Name" if key == "Name" else "Media"
+        try:
+            matchableData = expandSummaryData(self.getMatchableData(summaryData, matchableResults))
+        except Exception as error:
+            raise ValueError(f"No data for {key} using results {len(matchableResults)} ({matchableResults.head()}): {error}")
+        snapshot = self.getSnapshot(matchableData)
+        previousMatchData, changeLog = None, None
+        if options.get('incremental') is True:
+            previousMatchData, changeLog = self.getMatchDelta(key, snapshot)
+        if changeLog is not None:
+            matchableData = matchableData[matchableData.index.isin(changeLog["Added"].append(changeLog["Changed"]))]
+        if verbose:
+            print("Transforming Data ... ", end="")
+        matchData = self.mns.update(matchableData, dtype=dtype, verbose=False)
+        if changeLog is not None:
+            previousMatchData = previousMatchData[~previousMatchData.index.isin(changeLog["Removed"].append(changeLog["Changed"]))]
+            matchData = concat([previousMatchData, matchData])
+        else:
+            changeLog = {"Added": snapshot.index, "Changed": Index([]), "Removed": Index([])}
+        matchData.name = key
+        if verbose:
+            print("")
+        
+        if verbose is True:
+            delta = ", ".join([f"{change}={len(ids)}" for change, ids in changeLog.items()])
+            print(f"  ==> Created {matchData.shape[0]} Artist ID => {key} Match Data ({delta})")
+
+        if options.get('test') is True:
+            print("  ==> Only testing. Will not save.")
+        else:
+            if len(matchData) > 0:
+                matchData = compactSummaryData(matchData) if options.get('compact') is True else matchData
+                self.rdio.saveData(f"Match{key}", data=matchData)
+            elif getArtifactPath(self.rdio, f"Match{key}").exists():
+                # An empty result replaces the previous data so it is not reused by the next delta
+                self.rdio.saveData(f"Match{key}", data=matchData)
+            self.saveSnapshot(key, snapshot)
+        changeLog["Num"] = matchData.shape[0]
+        return changeLog
+        
     ###########################################################################
     # Artist ID => Name/URL Map
     ###########################################################################
@@ -42,10 +209,23 @@ class MatchProducerIO(MatchProducerBase):
         test = kwargs.get('test', False)
         ts = Timestat(f"Making {self.db} Match Data (Name>=1 & Media>={self.minMedia})", verbose)
 
+        partitioned = kwargs.get('partitioned', self.partitioned)
+        compact = kwargs.get('compact', self.compact)
+        sio = SummaryPartitionIO(self.rdio) if partitioned is True else None
+        modVals = None
+
         if verbose:
             print("  ==> Loading Name and Counts Data ... ", end="")
-        artistNameData = self.rdio.getData("SummaryName")
-        artistCountsData = self.rdio.getData("SummaryNumAlbums")
+        if partitioned is True:
+            # Only the partitions that can hold NumAlbums >= minMedia are read
+            countsFilter = [("NumAlbums", ">=", self.minMedia)]
+            modVals = sio.getPartitions("SummaryNumAlbums", filters=countsFilter)
+            artistCountsData = sio.read("SummaryNumAlbums", filters=countsFilter, modVals=modVals)
+            artistNameData = sio.read("SummaryName", modVals=modVals)
+            artistCountsData = artistCountsData.reindex(artistNameData.index, fill_value=0)
+        else:
+            artistNameData = self.rdio.getData("SummaryName")
+            artistCountsData = self.rdio.getData("SummaryNumAlbums")
         if verbose:
             print("Done")
             
@@ -57,43 +237,41 @@ class MatchProducerIO(MatchProducerBase):
             
         if verbose:
             print(f"  ==> Getting Matchable Data ({artistNameData.shape[0]}) ... ", end="")
-        countsReq = artistCountsData >= self.minMedia
-        nameReq = artistNameData.apply(lambda value: (isinstance(value, str) and len(value) > 0))
-        matchableResults = (countsReq & nameReq)
+        matchableResults = self.getMatchableResults(artistNameData, artistCountsData)
         if verbose:
             print("Done")
             print(f"  ==> Matchable Data ({artistNameData.shape[0]}) ==> ({matchableResults.sum()})")
                 
-        for key in self.omit.matchTypes:
-            if verbose:
-                print(f"  ==> Loading {key} ... ", end="")
-            summaryData = self.rdio.getData(f"Summary{key}")
-            if not isinstance(summaryData, (DataFrame, Series)):
-                print("No Data")
-                continue
-                
-            dtype = "Name" if key == "Name" else "Media"
-            try:
-                matchableData = summaryData.loc[matchableResults]
-            except Exception as error:
-                raise ValueError(f"No data for {key} using results {len(matchableResults)} ({matchableResults.head()}): {error}")
+        options = {"verbose": verbose, "test": test, "partitioned": partitioned, "compact": compact, "modVals": modVals,
+                   "incremental": kwargs.get('incremental', self.incremental)}
+        matchTypes = list(self.omit.matchTypes)
+        workers = kwargs.get('workers', self.workers)
+        if isinstance(workers, int) and workers > 1 and len(matchTypes) > 1:
+            # The mask is shipped once per worker by the initializer, not once per match type
+            numWorkers = min(workers, len(matchTypes))
             if verbose:
-                print("Transforming Data ... ", end="")
-            matchData = self.mns.update(matchableData, dtype=dtype, verbose=False)
-            matchData = matchData[matchData.index.map(self.omit.isValid)]
-            matchData.name = key
-            if verbose:
-                print("")
-            
+                print(f"  ==> Making {len(matchTypes)} Match Types With {numWorkers} Workers")
+            options["verbose"] = False
+            with ProcessPoolExecutor(max_workers=numWorkers, initializer=initMatchTypeWorker, initargs=(self, matchableResults, options)) as executor:
+                changeLogs = {}
+                for key, (changeLog, updates) in zip(matchTypes, executor.map(makeMatchTypeWorker, matchTypes)):
+                    changeLogs[key] = changeLog
+                    if isinstance(self.mns, NameStandardCache):
+                        self.mns.mergeUpdates(updates)
             if verbose is True:
-                print(f"  ==> Created {matchData.shape[0]} Artist ID => {key} Match Data")
-
-            if test is True:
-                print("  ==> Only testing. Will not save.")
-            else:
-                if len(matchData) > 0:
-                    self.rdio.saveData(f"Match{key}", data=matchData)
+                for key, changeLog in changeLogs.items():
+                    if changeLog is not None:
+                        print(f"  ==> Created {changeLog['Num']} Artist ID => {key} Match Data")
+        else:
+            changeLogs = {key: self.makeMatchTypeData(key, matchableResults, options) for key in matchTypes}
         
+        if test is False:
+            self.saveChangeLog({key: {change: ids for change, ids in changeLog.items() if change != "Num"} for key, changeLog in changeLogs.items() if changeLog is not None})
+        
+        if isinstance(self.mns, NameStandardCache):
+            if verbose:
+                self.mns.info()
+            self.mns.save()
         ts.stop()
             
             
@@ -1,9 +1,51 @@
 """ Media MetaData Classes """
 
-__all__ = ["MediaMetaProducer"]
+__all__ = ["MediaMetaProducer", "isLongMediaMetaData", "flattenLongMediaMetaData"]
 
-from pandas import DataFrame
+from pandas import DataFrame, Series, Categorical, factorize
 from .prodbase import MetaProducerUtilBase
+import numpy as np
+
+
+###############################################################################
+# Long (ArtistID, RankName, MediaType, Position, Name) Media MetaData
+###############################################################################
+LONG_MEDIA_COLUMNS = ["ArtistID", "RankName", "MediaType", "Position", "Name"]
+
+
+def isLongMediaMetaData(metaData) -> 'bool':
+    retval = isinstance(metaData, DataFrame) and list(metaData.columns) == LONG_MEDIA_COLUMNS
+    return retval
+
+
+def flattenLongMediaMetaData(metaData: DataFrame, counts=False):
+    # Same frame as flattening the wide format: artist ID => one list of names per rank
+    # (media types in order), [] for media types without names and None where the artist
+    # has no media of that rank. With counts=True also returns the names per (artist, rank).
+    artistCodes, artistIDs = factorize(metaData["ArtistID"].to_numpy(), sort=False)
+    rankNames = metaData["RankName"].cat.categories
+    rankCodes = metaData["RankName"].cat.codes.to_numpy()
+    valid = np.flatnonzero(rankCodes >= 0)
+    keys = artistCodes[valid].astype(np.int64) * len(rankNames) + rankCodes[valid]
+    order = valid[np.argsort(keys, kind="stable")]
+    keys = np.sort(keys, kind="stable")
+    # Rows with Position -1 only mark a media type (or artist) without names
+    isName = metaData["Position"].to_numpy()[order] >= 0
+    
+    flatData = np.full(len(artistIDs) * len(rankNames), None, dtype=object)
+    if len(keys) > 0:
+        starts = np.flatnonzero(np.concatenate([[True], keys[1:] != keys[:-1]]))
+        ends = np.append(starts[1:], len(keys))
+        names = metaData["Name"].to_numpy(dtype=object)[order][isName]
+        numNames = np.concatenate([[0], np.cumsum(isName)])
+        flatData[keys[starts]] = [names[numNames[start]:numNames[end]].tolist() for start, end in zip(starts, ends)]
+    retval = DataFrame(flatData.reshape(len(artistIDs), len(rankNames)), index=artistIDs, columns=list(rankNames))
+    if counts is False:
+        return retval
+    
+    numNames = np.bincount(keys[isName], minlength=len(artistIDs) * len(rankNames))
+    countsData = DataFrame(numNames.reshape(len(artistIDs), len(rankNames)), index=artistIDs, columns=list(rankNames))
+    return retval, countsData
 
 
 class MediaMetaProducer:
@@ -11,6 +53,7 @@ class MediaMetaProducer:
         self.utils = MetaProducerUtilBase(**kwargs)
         self.mediaTypeRank = mediaTypeRank
         self.maxMediaNum = kwargs.get("MaxMediaNum", 500)
+        self.longFormat = kwargs.get("longFormat", False)
             
     ###########################################################################
     # Media MetaData
@@ -20,21 +63,31 @@ class MediaMetaProducer:
         return retval
         
     def getRankedMediaData(self, rData):
+        retval = self.getRankedMediaNames(self.utils.getMediaNames(rData, maxNum=self.maxMediaNum))
+        return retval
+        
+    def getRankedMediaNames(self, mediaData):
         retval = {}
-        mediaData = self.utils.getMediaNames(rData, maxNum=self.maxMediaNum)
         if isinstance(mediaData, dict):
-            for mediaType, mediaTypeData in mediaData.items():
-                mediaTypeRankName = self.mediaTypeRank.getMediaTypeRank(mediaType)
+            mediaTypeRankNames = self.mediaTypeRank.getMediaTypeRanks(mediaData.keys())
+            for (mediaType, mediaTypeData), mediaTypeRankName in zip(mediaData.items(), mediaTypeRankNames):
                 if retval.get(mediaTypeRankName) is None:
                     retval[mediaTypeRankName] = {}
                 retval[mediaTypeRankName][mediaType] = mediaTypeData
         del mediaData
         return retval
         
+    def getMediaNamesData(self, modValData) -> 'Series':
+        # Media names of the whole shard through the batch accessor plan (one plan per raw class)
+        retval = self.utils.getBatchData(modValData, ["MediaNames"], maxNum=self.maxMediaNum)["MediaNames"]
+        return retval
+        
     def getMediaMetaData(self, modValData):
+        if self.longFormat is True:
+            return self.getLongMediaMetaData(modValData)
         mediaRankData = {mediaTypeRankName: {} for rank, mediaTypeRankName in self.mediaTypeRank.mediaTypes.items()}
-        for n, (artistID, artistIDData) in enumerate(modValData.iteritems()):
-            rankedMediaData = self.getRankedMediaData(artistIDData)
+        for n, (artistID, mediaData) in enumerate(self.getMediaNamesData(modValData).items()):
+            rankedMediaData = self.getRankedMediaNames(mediaData)
             if len(rankedMediaData) > 0:
                 for mediaTypeRankName, mediaTypeRankNameData in rankedMediaData.items():
                     mediaRankData[mediaTypeRankName][artistID] = mediaTypeRankNameData
@@ -43,4 +96,44 @@ class MediaMetaProducer:
                     mediaRankData[mediaTypeRankName][artistID] = None
                     
         metaData = DataFrame(mediaRankData)
-        return metaData
\ No newline at end of file
+        return metaData
+    
+    def getLongMediaMetaData(self, modValData) -> 'DataFrame':
+        # One pass to size the table, one pass to fill preallocated columns (artists without media and
+        # media types without names keep one placeholder row with Position -1)
+        artistMediaData = []
+        numRows = 0
+        for artistID, mediaData in self.getMediaNamesData(modValData).items():
+            mediaData = mediaData if isinstance(mediaData, dict) else {}
+            mediaTypeRankNames = self.mediaTypeRank.getMediaTypeRanks(mediaData.keys())
+            artistMediaData.append((artistID, mediaData, mediaTypeRankNames))
+            numRows += max(sum([max(len(mediaTypeData), 1) for mediaTypeData in mediaData.values()]), 1)
+        
+        rankNames = list(self.mediaTypeRank.mediaTypes.values())
+        rankCodes = {rankName: code for code, rankName in enumerate(rankNames)}
+        artistIDs = np.empty(numRows, dtype=object)
+        rankNameCodes = np.full(numRows, -1, dtype=np.int16)
+        mediaTypes = np.full(numRows, None, dtype=object)
+        positions = np.full(numRows, -1, dtype=np.int32)
+        names = np.full(numRows, None, dtype=object)
+        
+        row = 0
+        for artistID, mediaData, mediaTypeRankNames in artistMediaData:
+            start = row
+            for (mediaType, mediaTypeData), mediaTypeRankName in zip(mediaData.items(), mediaTypeRankNames):
+                num = len(mediaTypeData)
+                rankNameCodes[row:row + max(num, 1)] = rankCodes[mediaTypeRankName]
+                mediaTypes[row:row + max(num, 1)] = mediaType
+                positions[row:row + num] = np.arange(num, dtype=np.int32)
+                names[row:row + num] = mediaTypeData
+                row += max(num, 1)
+            row = max(row, start + 1)
+            artistIDs[start:row] = artistID
+        del artistMediaData
+        
+        metaData = DataFrame({"ArtistID": artistIDs,
+                              "RankName": Categorical.from_codes(rankNameCodes, categories=rankNames),
+                              "MediaType": Categorical(mediaTypes),
+                              "Position": positions,
+                              "Name": names})
+        return metaData
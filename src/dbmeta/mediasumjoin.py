@@ -0,0 +1,202 @@
+""" Sorted Merge / Partitioned Hash Join Engine For Media Summary Joins """
+
+__all__ = ["MediaJoinEngine"]
+
+from pandas import DataFrame, Series, concat, merge
+from pandas.util import hash_array
+from tempfile import TemporaryDirectory
+from pathlib import Path
+import numpy as np
+import pickle
+
+
+###############################################################################
+# Outer Join On dbid => Coalesced Columns + One Row Per Artist ID, In Blocks
+###############################################################################
+class MediaJoinEngine:
+    def __repr__(self):
+        return f"MediaJoinEngine(on={self.on}, method={self.method}, numPartitions={self.numPartitions}, spill={self.spill})"
+
+    def __init__(self, **kwargs):
+        self.verbose = kwargs.get('verbose', False)
+        self.on = kwargs.get('on', 'dbid')
+        self.artistKey = kwargs.get('artistKey', 'artids')
+        self.method = kwargs.get('method', 'auto')
+        self.numPartitions = kwargs.get('numPartitions', 16)
+        self.blockSize = kwargs.get('blockSize', 250000)
+        self.spill = kwargs.get('spill', False)
+        self.spillDir = kwargs.get('spillDir', None)
+        assert self.method in ["auto", "merge", "hash"], f"method [{self.method}] is not one of auto/merge/hash"
+        assert isinstance(self.numPartitions, int) and self.numPartitions > 0, f"numPartitions [{self.numPartitions}] is not a positive int"
+        assert isinstance(self.blockSize, int) and self.blockSize > 0, f"blockSize [{self.blockSize}] is not a positive int"
+
+    ###########################################################################
+    # Method
+    ###########################################################################
+    def isSorted(self, data: DataFrame) -> 'bool':
+        keys = data[self.on]
+        return bool(keys.notna().all() and keys.is_monotonic_increasing)
+
+    def getMethod(self, left: DataFrame, right: DataFrame) -> 'str':
+        if self.method != "auto":
+            return self.method
+        retval = "merge" if (self.isSorted(left) and self.isSorted(right)) else "hash"
+        return retval
+
+    ###########################################################################
+    # Block Join
+    ###########################################################################
+    def joinBlock(self, left: DataFrame, right: DataFrame) -> 'tuple':
+        # Same result as merge(how='outer') + unique(artids_x, artids_y) + coalesce(_x, _y) + explode,
+        # without building a per row array of artist IDs. Returns (joined, merged keys, dupls).
+        mergeData = merge(left, right, how='outer', on=self.on)
+        col = self.artistKey
+        artistX, artistY = mergeData[f"{col}_x"].to_numpy(), mergeData[f"{col}_y"].to_numpy()
+        keepX = mergeData[f"{col}_x"].notna().to_numpy()
+        keepY = mergeData[f"{col}_y"].notna().to_numpy() & ~(keepX & (artistX == artistY))
+        mergeData[col] = None
+
+        dupls = [col[:-2] for col in mergeData.columns if (col.endswith("_x") and not col.startswith(self.artistKey))]
+        for col in dupls:
+            mergeData[col] = mergeData[f"{col}_x"]
+            mergeData.loc[mergeData[col].isna(), col] = mergeData.loc[mergeData[col].isna(), f"{col}_y"]
+        dropCols = [f"{col}{suffix}" for col in [self.artistKey] + dupls for suffix in ["_x", "_y"]]
+        mergeKeys = mergeData[self.on]
+        mergeData = mergeData.drop(dropCols, axis=1)
+
+        # Artist ID from the left side first, then the right side if it differs
+        rows = np.concatenate([np.flatnonzero(keepX), np.flatnonzero(keepY)])
+        fromY = np.concatenate([np.zeros(keepX.sum(), dtype=bool), np.ones(keepY.sum(), dtype=bool)])
+        order = np.lexsort((fromY, rows))
+        rows, fromY = rows[order], fromY[order]
+        joinData = mergeData.take(rows)
+        joinData[self.artistKey] = Series(list(np.where(fromY, artistY[rows], artistX[rows])), index=joinData.index, dtype=object if len(rows) == 0 else None)
+        return joinData, mergeKeys, dupls
+
+    ###########################################################################
+    # Sorted Merge Join (Aligned Key Ranges)
+    ###########################################################################
+    def iterMergeJoin(self, left: DataFrame, right: DataFrame):
+        leftKeys, rightKeys = left[self.on].to_numpy(), right[self.on].to_numpy()
+        bounds = leftKeys[self.blockSize::self.blockSize]
+        leftCuts = np.concatenate([[0], np.searchsorted(leftKeys, bounds, side="left"), [len(leftKeys)]])
+        rightCuts = np.concatenate([[0], np.searchsorted(rightKeys, bounds, side="left"), [len(rightKeys)]])
+        offset = 0
+        for block in range(len(leftCuts) - 1):
+            leftBlock = left.iloc[leftCuts[block]:leftCuts[block + 1]]
+            rightBlock = right.iloc[rightCuts[block]:rightCuts[block + 1]]
+            if leftBlock.shape[0] == 0 and rightBlock.shape[0] == 0:
+                continue
+            joinData, mergeKeys, dupls = self.joinBlock(leftBlock, rightBlock)
+            joinData.index = joinData.index + offset
+            offset += len(mergeKeys)
+            yield joinData, dupls
+
+    ###########################################################################
+    # Partitioned Hash Join (Optionally Spilled To Disk)
+    ###########################################################################
+    def getPartitionCodes(self, data: DataFrame) -> 'np.ndarray':
+        return (hash_array(data[self.on].to_numpy()) % np.uint64(self.numPartitions)).astype(np.int64)
+
+    def getPartitions(self, data: DataFrame):
+        codes = self.getPartitionCodes(data)
+        order = np.argsort(codes, kind="stable")
+        cuts = np.concatenate([[0], np.cumsum(np.bincount(codes, minlength=self.numPartitions))])
+        for partition in range(self.numPartitions):
+            yield data.iloc[order[cuts[partition]:cuts[partition + 1]]]
+
+    def iterPartitions(self, left: DataFrame, right: DataFrame, spillDir):
+        if spillDir is None:
+            yield from zip(self.getPartitions(left), self.getPartitions(right))
+            return
+
+        for side, data in [("left", left), ("right", right)]:
+            for partition, partitionData in enumerate(self.getPartitions(data)):
+                with open(Path(spillDir) / f"{side}-{partition}.p", "wb") as f:
+                    pickle.dump(partitionData, f, protocol=pickle.HIGHEST_PROTOCOL)
+        for partition in range(self.numPartitions):
+            partitionData = []
+            for side in ["left", "right"]:
+                spillFile = Path(spillDir) / f"{side}-{partition}.p"
+                with open(spillFile, "rb") as f:
+                    partitionData.append(pickle.load(f))
+                spillFile.unlink()
+            yield tuple(partitionData)
+
+    def iterHashJoin(self, left: DataFrame, right: DataFrame):
+        if self.spill is False:
+            for partition, (leftPartition, rightPartition) in enumerate(self.iterPartitions(left, right, None)):
+                if leftPartition.shape[0] > 0 or rightPartition.shape[0] > 0:
+                    yield (partition,) + self.joinBlock(leftPartition, rightPartition)
+            return
+
+        with TemporaryDirectory(prefix="mediajoin-", dir=self.spillDir) as spillDir:
+            for partition, (leftPartition, rightPartition) in enumerate(self.iterPartitions(left, right, spillDir)):
+                if leftPartition.shape[0] > 0 or rightPartition.shape[0] > 0:
+                    yield (partition,) + self.joinBlock(leftPartition, rightPartition)
+
+    ###########################################################################
+    # Runner
+    ###########################################################################
+    def getDupls(self, left: DataFrame, right: DataFrame) -> 'list':
+        retval = [col for col in left.columns if col in right.columns and col not in [self.on, self.artistKey]]
+        return retval
+    
+    def iterJoin(self, left: DataFrame, right: DataFrame, columns=None):
+        # Streams (joined block, dupls). Merge blocks arrive in key order, hash partitions do not.
+        # With columns only those columns of each block are kept, so the full block is freed right away.
+        for frame in [left, right]:
+            assert isinstance(frame, DataFrame), f"join data [{type(frame)}] is not a DataFrame"
+            assert self.on in frame.columns and self.artistKey in frame.columns, f"join data does not have [{self.on}, {self.artistKey}]: {frame.columns}"
+        if self.getMethod(left, right) == "merge":
+            blocks = self.iterMergeJoin(left, right)
+        else:
+            blocks = ((joinData, dupls) for partition, joinData, mergeKeys, dupls in self.iterHashJoin(left, right))
+        for joinData, dupls in blocks:
+            yield (joinData if columns is None else joinData[columns]), dupls
+    
+    def sortJoin(self, joinData: DataFrame) -> 'DataFrame':
+        # Outer merge row order: keys sorted (missing last), rows of one key stay in block order (one key
+        # is never split across hash partitions)
+        retval = joinData.sort_values(self.on, kind="stable", na_position="last")
+        retval.index = np.arange(retval.shape[0])
+        return retval
+
+    def join(self, left: DataFrame, right: DataFrame) -> 'tuple':
+        # Full result in the row order (and index) of a single outer merge. Returns (joined, dupls).
+        method = self.getMethod(left, right)
+        if self.verbose is True:
+            print(f"  ==> Joining [{left.shape[0]}] <-> [{right.shape[0]}] Rows On [{self.on}] Using {method} Join")
+
+        dupls = []
+        if method == "merge":
+            blocks = []
+            for joinData, blockDupls in self.iterMergeJoin(left, right):
+                blocks.append(joinData)
+                dupls = blockDupls
+            retval = concat(blocks) if len(blocks) > 0 else self.joinBlock(left, right)[0]
+            return retval, dupls
+
+        # Merged keys of every partition are kept (not the rows) so the global merge position of each row is known
+        blocks, partitionKeys, partitionOffsets = [], [], {}
+        numRows = 0
+        for partition, joinData, mergeKeys, blockDupls in self.iterHashJoin(left, right):
+            partitionOffsets[partition] = numRows
+            numRows += len(mergeKeys)
+            partitionKeys.append(mergeKeys.reset_index(drop=True))
+            joinData.index = joinData.index + partitionOffsets[partition]
+            blocks.append(joinData)
+            dupls = blockDupls
+        if len(blocks) == 0:
+            return self.joinBlock(left, right)[0], dupls
+
+        mergeKeys = concat(partitionKeys, ignore_index=True)
+        mergePosition = np.empty(numRows, dtype=np.int64)
+        mergePosition[mergeKeys.sort_values(kind="stable", na_position="last").index.to_numpy()] = np.arange(numRows)
+        del mergeKeys, partitionKeys
+        retval = concat(blocks)
+        del blocks
+        position = mergePosition[retval.index.to_numpy()]
+        retval = retval.take(np.argsort(position, kind="stable"))
+        retval.index = np.sort(position, kind="stable")
+        return retval, dupls
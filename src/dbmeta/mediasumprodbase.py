@@ -4,7 +4,9 @@ __all__ = ["MediaSummaryProducerBase"]
 
 from dbbase import MusicDBRootDataIO, getModVals
 from utils import Timestat
+from .datacache import getDataIO
 from .mediasumfileio import MediaSummaryFileIO
+from .mediasumsched import MediaSummaryScheduler
 
 
 class MediaSummaryProducerBase:
@@ -14,12 +16,15 @@ class MediaSummaryProducerBase:
     def __init__(self, rdio: MusicDBRootDataIO, mediaSummary: dict, **kwargs):
         self.verbose = kwargs.get('verbose', False)
         self.maxMedia = kwargs.get('maxMedia', None)
+        self.workers = kwargs.get('workers', 1)
+        rdio = getDataIO(rdio, **kwargs)
         self.msfio = MediaSummaryFileIO(rdio, mediaSummary, **kwargs)
         self.summaryTypeInfo = {key: val for key, val in mediaSummary.items() if key not in ["Artist", "Media"]}
         self.rdio = rdio
         self.db = rdio.db
         self.joinedStatus = {}
         self.procs = {}
+        self.timings = {}
         self.splitMediaData = None
         
     ###########################################################################
@@ -34,23 +39,15 @@ class MediaSummaryProducerBase:
             assert key in keys, f"key={key} is not available in {keys}"
             keys = [key]
             
-        ts = Timestat("Loading Media Data")
-        self.msfio.setMediaData(verbose=self.verbose, test=self.test)
-        self.msfio.setArtistMediaData(verbose=self.verbose, test=self.test)
-        for mediaName, mediaData in self.msfio.mediaData.items():
-            print(mediaName, mediaData.columns)
-        for mediaNames, cols in self.msfio.mediaConcats.items():
-            self.msfio.concatMediaData(mediaNames, cols, verbose=self.verbose, test=self.test)
-        joinPairs = {col: colPairs for col, colPairs in self.msfio.colPairings.items() if len(colPairs) == 2}
-        for col, colPairs in joinPairs.items():
-            self.msfio.joinMediaData(colPairs[0], colPairs[1], verbose=self.verbose)
+        # Loads, concats and joins feed the procs through a dependency graph. Independent procs overlap on the pool.
+        workers = kwargs.get('workers', self.workers)
+        ts = Timestat(f"Making Media Summary Data For {keys} (workers={workers})")
+        sched = MediaSummaryScheduler(self.msfio, {key: self.procs[key] for key in keys}, workers=workers, verbose=self.verbose)
+        self.timings = sched.run(verbose=self.verbose, test=self.test)
+        if self.verbose is True:
+            for mediaName, mediaData in self.msfio.mediaData.items():
+                print(mediaName, mediaData.columns)
         ts.stop()
-        
-        if key in keys:
-            proc = self.procs[key].getMediaSummaryData()
-        else:
-            for key, proc in self.procs.items():
-                proc.getMediaSummaryData()
     
     ###########################################################################
     # Easy I/O
@@ -0,0 +1,114 @@
+""" Dependency Graph Scheduler For Media Summary Loads, Concats, Joins And Procs """
+
+__all__ = ["MediaSummaryScheduler"]
+
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from functools import partial
+from time import perf_counter
+from .mediasumfileio import MediaSummaryFileIO
+
+
+###############################################################################
+# (Load|Concat|Join|Proc, name) Tasks => Thread Pool In Dependency Order
+###############################################################################
+class MediaSummaryScheduler:
+    def __repr__(self):
+        return f"MediaSummaryScheduler(procs={list(self.procs.keys())}, tasks={len(self.tasks)}, workers={self.workers})"
+
+    def __init__(self, msfio: MediaSummaryFileIO, procs: dict, **kwargs):
+        self.verbose = kwargs.get('verbose', False)
+        self.workers = kwargs.get('workers', 1)
+        assert isinstance(msfio, MediaSummaryFileIO), f"msfio [{type(msfio)}] is not a MediaSummaryFileIO"
+        assert isinstance(procs, dict), f"procs [{type(procs)}] is not a dict"
+        assert isinstance(self.workers, int) and self.workers > 0, f"workers [{self.workers}] is not a positive int"
+        self.msfio = msfio
+        self.procs = procs
+        self.tasks = {}
+        self.deps = {}
+        self.timings = {}
+
+    ###########################################################################
+    # Graph
+    ###########################################################################
+    def getProcColumns(self, proc) -> 'list':
+        # Media columns read by the proc's mapper (all columns if it does not say)
+        mapper = getattr(proc, 'mapper', None)
+        retval = list(mapper.keys()) if isinstance(mapper, dict) else list(self.msfio.colPairings.keys())
+        return retval
+
+    def getSource(self, mediaName: str) -> 'tuple':
+        retval = ("Concat", mediaName) if mediaName in self.msfio.mediaConcats.keys() else ("Load", mediaName)
+        return retval
+
+    def getColumnSource(self, col: str) -> 'tuple':
+        colPairs = self.msfio.colPairings[col]
+        retval = ("Join", f"{colPairs[0][1]}-{colPairs[1][1]}") if len(colPairs) == 2 else self.getSource(colPairs[0][1])
+        return retval
+
+    def addTask(self, task: tuple, func, deps: list) -> 'None':
+        self.tasks[task] = func
+        self.deps[task] = set(deps)
+
+    def setGraph(self, **kwargs) -> 'None':
+        self.tasks, self.deps = {}, {}
+        procColumns = {key: self.getProcColumns(proc) for key, proc in self.procs.items()}
+        plan = self.msfio.getMediaPlan(list({col: True for cols in procColumns.values() for col in cols}.keys()))
+        for mediaName, columns in plan["Load"].items():
+            self.addTask(("Load", mediaName), partial(self.msfio.loadMediaColumns, mediaName, columns, **kwargs), [])
+        for name, cols in plan["Concat"].items():
+            self.addTask(("Concat", name), partial(self.msfio.concatMediaData, name, cols, **kwargs), [("Load", mediaName) for mediaName in name.split('-')])
+        for (artistMediaName, mediaName) in plan["Join"]:
+            deps = [self.getSource(artistMediaName), self.getSource(mediaName)]
+            self.addTask(("Join", f"{artistMediaName}-{mediaName}"), partial(self.msfio.joinMediaData, artistMediaName, mediaName, **kwargs), deps)
+
+        # Procs writing the same Summary{summaryType} file run one after another
+        lastWriter = {}
+        for key, proc in self.procs.items():
+            deps = [self.getColumnSource(col) for col in procColumns[key]]
+            summaryType = getattr(proc, 'summaryType', key)
+            deps += [lastWriter[summaryType]] if summaryType in lastWriter else []
+            self.addTask(("Proc", key), proc.getMediaSummaryData, deps)
+            lastWriter[summaryType] = ("Proc", key)
+
+    ###########################################################################
+    # Runner
+    ###########################################################################
+    def runTask(self, task: tuple) -> 'None':
+        start = perf_counter()
+        self.tasks[task]()
+        self.timings[task] = perf_counter() - start
+
+    def run(self, **kwargs) -> 'dict':
+        self.setGraph(**kwargs)
+        self.timings = {}
+        pending = {task: set(deps) for task, deps in self.deps.items()}
+        running, done, failed = {}, set(), None
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="mediasum") as pool:
+            while len(pending) > 0 or len(running) > 0:
+                if failed is None:
+                    for task in [task for task, deps in pending.items() if deps <= done]:
+                        running[pool.submit(self.runTask, task)] = task
+                        del pending[task]
+                if len(running) == 0:
+                    break
+                finished, _ = wait(running.keys(), return_when=FIRST_COMPLETED)
+                for future in finished:
+                    task = running.pop(future)
+                    if future.exception() is not None:
+                        failed = (task, future.exception()) if failed is None else failed
+                    else:
+                        done.add(task)
+
+        if failed is not None:
+            print(f"  ==> Media summary task {failed[0]} failed. Skipped {len(pending)} dependent tasks.")
+            raise failed[1]
+        assert len(pending) == 0, f"Media summary tasks have unresolvable dependencies: {list(pending.keys())}"
+        self.report()
+        return self.timings
+
+    def report(self) -> 'None':
+        if self.verbose is False:
+            return
+        for (taskType, name) in [task for task in self.tasks.keys() if task in self.timings]:
+            seconds = self.timings[(taskType, name)]
+            print(f"  ==> {taskType:<6} {name:<40} {seconds:.3f}s")
@@ -0,0 +1,133 @@
+""" Skip-If-Fresh Checkpoints For Meta{MetaType} Production """
+
+__all__ = ["MetaCheckpoint", "getProducerFingerprint"]
+
+from dbbase import MusicDBRootDataIO, getModVals
+from hashlib import blake2b
+from pathlib import Path
+from pandas import DataFrame, Series, Index
+from .fileutils import getArtifactPath
+from .datacache import DataCache, CachedDataIO
+import inspect
+import pickle
+
+
+###############################################################################
+# Producer Fingerprint (Class Sources + Instance Config + Optional Version)
+###############################################################################
+def getConfigData(value, depth=0):
+    # Plain data as is, functions by name and nested objects by their own config (not their address).
+    # Data I/O and caches are not config, and pandas data is summarized by its shape.
+    if value is None or isinstance(value, (bool, int, float, str, bytes)):
+        return value
+    if isinstance(value, (MusicDBRootDataIO, CachedDataIO, DataCache)):
+        return "DataIO"
+    if isinstance(value, (DataFrame, Series, Index)):
+        return (type(value).__qualname__, value.shape)
+    if isinstance(value, dict):
+        return sorted([(repr(key), getConfigData(item, depth + 1)) for key, item in value.items()])
+    if isinstance(value, (list, tuple)):
+        return [getConfigData(item, depth + 1) for item in value]
+    if isinstance(value, (set, frozenset)):
+        return sorted([repr(getConfigData(item, depth + 1)) for item in value])
+    if callable(value) and hasattr(value, '__qualname__'):
+        return f"{getattr(value, '__module__', None)}.{value.__qualname__}"
+    if hasattr(value, '__dict__') and depth < 4:
+        return (type(value).__qualname__, getProducerConfig(value, depth + 1))
+    return type(value).__qualname__
+
+
+def getFingerprintExclude(proc) -> 'set':
+    # Memo/run state named by each class of the producer (fingerprintExclude class attribute)
+    retval = {"verbose", "cache"}
+    for procClass in type(proc).__mro__:
+        retval |= set(procClass.__dict__.get('fingerprintExclude', ()))
+    return retval
+
+
+def getProducerConfig(proc, depth=0) -> 'list':
+    # Memo/cache attributes, run state and verbosity do not change what the producer makes
+    exclude = getFingerprintExclude(proc)
+    retval = [(name, getConfigData(value, depth)) for name, value in sorted(vars(proc).items()) if name not in exclude and not name.startswith("_")]
+    return retval
+
+
+def getProducerFingerprint(proc) -> 'str':
+    if callable(getattr(proc, 'getFingerprint', None)):
+        return str(proc.getFingerprint())
+    sources = []
+    for procClass in type(proc).__mro__:
+        if procClass is object:
+            continue
+        try:
+            sources.append(inspect.getsource(procClass))
+        except (OSError, TypeError):
+            sources.append(f"{procClass.__module__}.{procClass.__qualname__}")
+    fhash = blake2b(digest_size=16)
+    fhash.update(repr((getattr(proc, 'version', None), sources, getProducerConfig(proc))).encode("utf-8"))
+    return fhash.hexdigest()
+
+
+###############################################################################
+# Meta{MetaType} => {modVal: producer fingerprint} (next to the Meta files)
+###############################################################################
+class MetaCheckpoint:
+    def __repr__(self):
+        return f"MetaCheckpoint(db={self.rdio.db}, metaTypes={list(self.checkpoints.keys())})"
+
+    def __init__(self, rdio: MusicDBRootDataIO, **kwargs):
+        self.verbose = kwargs.get('verbose', False)
+        self.rdio = rdio
+        self.checkpoints = {}
+
+    ###########################################################################
+    # Files
+    ###########################################################################
+    def getRawFilename(self, modVal):
+        assert callable(getattr(self.rdio, 'getModValFilename', None)), f"rdio [{self.rdio}] does not have a getModValFilename function"
+        finfo = self.rdio.getModValFilename(modVal)
+        retval = Path(finfo.str) if hasattr(finfo, 'str') else Path(finfo)
+        return retval
+
+    def getFilename(self, metaType: str):
+        return getArtifactPath(self.rdio, f"Meta{metaType}", getModVals()[0]).parent / f"Meta{metaType}Checkpoint.p"
+
+    def load(self, metaType: str) -> 'dict':
+        if metaType not in self.checkpoints:
+            checkpointFile = self.getFilename(metaType)
+            self.checkpoints[metaType] = {}
+            if checkpointFile.exists():
+                with open(checkpointFile, "rb") as f:
+                    self.checkpoints[metaType] = pickle.load(f)
+        return self.checkpoints[metaType]
+
+    def save(self, metaType: str) -> 'None':
+        checkpointFile = self.getFilename(metaType)
+        tmpFile = checkpointFile.with_suffix(".tmp")
+        with open(tmpFile, "wb") as f:
+            pickle.dump(self.load(metaType), f, protocol=pickle.HIGHEST_PROTOCOL)
+        tmpFile.replace(checkpointFile)
+
+    ###########################################################################
+    # Freshness
+    ###########################################################################
+    def isFresh(self, modVal, metaType: str, fingerprint: str) -> 'bool':
+        # Output exists, is not older than the raw shard and was made by the same producer
+        if self.load(metaType).get(modVal) != fingerprint:
+            return False
+        outputFile = getArtifactPath(self.rdio, f"Meta{metaType}", modVal)
+        rawFile = self.getRawFilename(modVal)
+        if not (outputFile.exists() and rawFile.exists()):
+            return False
+        retval = outputFile.stat().st_mtime_ns >= rawFile.stat().st_mtime_ns
+        return retval
+
+    def getStaleMetaTypes(self, modVal, fingerprints: dict) -> 'list':
+        retval = [metaType for metaType, fingerprint in fingerprints.items() if not self.isFresh(modVal, metaType, fingerprint)]
+        return retval
+
+    def update(self, modVal, fingerprints: dict) -> 'None':
+        # Called only after the shard's Meta files are written so an interrupted run resumes after the last finished shard
+        for metaType, fingerprint in fingerprints.items():
+            self.load(metaType)[modVal] = fingerprint
+            self.save(metaType)
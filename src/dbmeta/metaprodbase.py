@@ -4,18 +4,57 @@ __all__ = ["MetaProducerBase"]
 
 from dbbase import MusicDBRootDataIO, getModVals
 from utils import Timestat
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
 from .metabasicprod import MetaBasicProducer
+from .modvalpipe import ModValPipeline
+from .datacache import getDataIO
+from .metacheckpoint import MetaCheckpoint, getProducerFingerprint
+from .metavisitor import MetaVisitor
+import traceback
+
+
+###############################################################################
+# ModVal Shard Workers (module level so they can run in a process pool)
+###############################################################################
+metaShardWorker = {}
+
+
+def getShardError(error: Exception) -> 'str':
+    retval = f"{type(error).__name__}: {error}\n{traceback.format_exc()}"
+    return retval
+
+
+def initMetaShardWorker(producer, options) -> 'None':
+    metaShardWorker["producer"] = producer
+    metaShardWorker["options"] = options
+
+
+def makeMetaShardWorker(task: tuple) -> 'tuple':
+    # (modVal, {metaType: shape}, None) or (modVal, None, error) so one bad shard does not stop the run
+    modVal, metaTypes = task
+    try:
+        retval = metaShardWorker["producer"].makeModValMetaData(modVal, metaShardWorker["options"], metaTypes=metaTypes)
+    except Exception as error:
+        return (modVal, None, getShardError(error))
+    return (modVal, retval, None)
 
 
 class MetaProducerBase:
+    fingerprintExclude = {"failedModVals", "fingerprints", "visitor", "checkpoint"}
+    
     def __repr__(self):
         return f"MetaProducerBase(db={self.rdio.db})"
         
     def __init__(self, rdio: MusicDBRootDataIO, **kwargs):
-        self.rdio = rdio
+        self.rdio = getDataIO(rdio, **kwargs)
         self.verbose = kwargs.get('verbose', False)
         self.mediaRanking = {}
         self.dbmetas = {}
+        self.workers = kwargs.get('workers', None)
+        self.failedModVals = {}
+        self.checkpoint = MetaCheckpoint(rdio, verbose=self.verbose)
+        self.fingerprints = {}
+        self.visitor = None
         
         self.procs = {}
         self.procs["Basic"] = MetaBasicProducer()
@@ -36,35 +75,176 @@ class MetaProducerBase:
             return {key: self.dbmetas[key]}
         return self.dbmetas
     
+    ###########################################################################
+    # Single ModVal Shard
+    ###########################################################################
+    def makeModValMetaData(self, modVal, options: dict, modValData=None, saver=None, metaTypes=None) -> 'dict':
+        verbose = options.get('verbose', False)
+        test = options.get('test', False)
+        saver = self.rdio.saveData if saver is None else saver
+        metaTypes = list(self.procs.keys()) if metaTypes is None else metaTypes
+        retval = {}
+        modValData = self.rdio.getModValData(modVal) if modValData is None else modValData
+        # With the visitor all producers' outputs come from one traversal of the shard
+        metaDatas = self.visitor.visit(modValData, metaTypes) if self.visitor is not None else None
+        for metaType in metaTypes:
+            metaTypeProd = self.procs[metaType]
+            if verbose:
+                print(f"    ModVal={modVal: <4} | MetaType={metaType} ... ", end="")
+                
+            metaData = metaDatas[metaType] if metaDatas is not None else metaTypeProd.getMetaData(modValData)
+            retval[metaType] = metaData.shape
+            if test is True:
+                print("Only testing. Will not save.")
+                continue
+            
+            if verbose:
+                print(f"{metaData.shape} ... ", end="")
+            saver(f"Meta{metaType}", modVal, data=metaData)
+            if verbose is True:
+                print("✓")
+        return retval
+    
+    def loadModValData(self, modVal) -> 'tuple':
+        # (modValData, None) or (None, error) so a bad shard read on a prefetch thread does not stop the run
+        try:
+            retval = (self.rdio.getModValData(modVal), None)
+        except Exception as error:
+            retval = (None, getShardError(error))
+        return retval
+    
+    def saveModValMetaData(self, modVal, saves: list, metaTypes: list, options: dict) -> 'None':
+        # Writer side of the prefetch path: a shard is checkpointed only once all of its saves succeeded
+        try:
+            for args, kwargs in saves:
+                self.rdio.saveData(*args, **kwargs)
+        except Exception as error:
+            self.setFailedModVal(modVal, getShardError(error), options.get('verbose', False))
+            return
+        self.updateCheckpoint(modVal, metaTypes, options)
+    
+    def setFailedModVal(self, modVal, error: str, verbose=False) -> 'None':
+        self.failedModVals[modVal] = error
+        if verbose:
+            print(f"    ModVal={modVal: <4} | Failed: {error.splitlines()[0]}")
+    
+    def makeParallel(self, tasks: dict, options: dict, ts: Timestat, workers: int, maxInFlight: int) -> 'None':
+        # At most maxInFlight shards are submitted (loaded/held by workers) at any time
+        verbose = options.get('verbose', False)
+        workerOptions = {**options, "verbose": False}
+        pending, done = set(), 0
+        with ProcessPoolExecutor(max_workers=workers, initializer=initMetaShardWorker, initargs=(self, workerOptions)) as executor:
+            for task in tasks.items():
+                pending.add(executor.submit(makeMetaShardWorker, task))
+                if len(pending) < maxInFlight:
+                    continue
+                finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+                done = self.collectShards(finished, done, len(tasks), ts, options)
+            while len(pending) > 0:
+                finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+                done = self.collectShards(finished, done, len(tasks), ts, options)
+    
+    def collectShards(self, finished, done: int, numModVals: int, ts: Timestat, options: dict) -> 'int':
+        verbose = options.get('verbose', False)
+        for future in finished:
+            modVal, shapes, error = future.result()
+            if error is not None:
+                self.setFailedModVal(modVal, error, verbose)
+            else:
+                self.updateCheckpoint(modVal, list(shapes.keys()), options)
+                if verbose:
+                    print(f"    ModVal={modVal: <4} | {' | '.join([f'{metaType}={shape}' for metaType, shape in shapes.items()])}")
+            if self.isUpdateModVal(done):
+                ts.update(n=done + 1, N=numModVals)
+            done += 1
+        return done
+    
+    ###########################################################################
+    # Checkpoints (Skip Fresh ModVal/MetaType Pairs, Resume After Interruption)
+    ###########################################################################
+    def getFingerprints(self, metaTypes: list) -> 'dict':
+        retval = {metaType: getProducerFingerprint(self.procs[metaType]) for metaType in metaTypes}
+        return retval
+    
+    def getTasks(self, modVals: list, options: dict) -> 'dict':
+        metaTypes = list(self.procs.keys())
+        # Producers (code + config) are fingerprinted once per run, not once per shard
+        self.fingerprints = self.getFingerprints(metaTypes)
+        if options.get('test') is True or options.get('force') is True:
+            return {modVal: metaTypes for modVal in modVals}
+        retval = {}
+        for modVal in modVals:
+            staleMetaTypes = self.checkpoint.getStaleMetaTypes(modVal, self.fingerprints)
+            if len(staleMetaTypes) > 0:
+                retval[modVal] = staleMetaTypes
+        if options.get('verbose') and len(retval) < len(modVals):
+            print(f"  ==> Skipping {len(modVals) - len(retval)}/{len(modVals)} Fresh ModVals (use force=True to remake)")
+        return retval
+    
+    def updateCheckpoint(self, modVal, metaTypes: list, options: dict) -> 'None':
+        if options.get('test') is True:
+            return
+        self.checkpoint.update(modVal, {metaType: self.fingerprints[metaType] for metaType in metaTypes})
+    
     ###########################################################################
     # General Make Runner
     ###########################################################################
     def make(self, modVal=None, key=None, **kwargs):
         verbose = kwargs.get("verbose", self.verbose)
         test = kwargs.get('test', False)
+        workers = kwargs.get('workers', self.workers)
+        prefetch = kwargs.get('prefetch', None)
+        # onError="raise" (default) raises once every shard was tried, "collect" only keeps failedModVals
+        onError = kwargs.get('onError', "raise")
+        assert onError in ["raise", "collect"], f"onError [{onError}] is not raise or collect"
         modVals = getModVals(modVal) if test is False else [0]
         metaTypes = list(self.procs.keys())
+        options = {"verbose": verbose, "test": test, "force": kwargs.get('force', False)}
+        self.failedModVals = {}
+        self.visitor = MetaVisitor(self.procs, verbose=verbose) if kwargs.get('fused', True) is True else None
             
         ts = Timestat(f"Making {len(modVals)} {metaTypes} MetaData Files", verbose=verbose)
+        tasks = self.getTasks(modVals, options)
         
-        for n, modVal in enumerate(modVals):
-            if self.isUpdateModVal(n):
-                ts.update(n=n + 1, N=len(modVals))
-
-            modValData = self.rdio.getModValData(modVal)
-            for metaType, metaTypeProd in self.procs.items():
-                if verbose:
-                    print(f"    ModVal={modVal: <4} | MetaType={metaType} ... ", end="")
-                    
-                metaData = metaTypeProd.getMetaData(modValData)
-                if test is True:
-                    print("Only testing. Will not save.")
+        if isinstance(workers, int) and workers > 1 and len(tasks) > 1:
+            numWorkers = min(workers, len(tasks))
+            maxInFlight = kwargs.get('maxInFlight', 2 * numWorkers)
+            if verbose:
+                print(f"  ==> Making {len(tasks)} ModVals With {numWorkers} Workers ({maxInFlight} Shards In Flight)")
+            self.makeParallel(tasks, options, ts, numWorkers, maxInFlight)
+        elif isinstance(prefetch, int) and prefetch > 0:
+            # Next shards load on threads while this one is processed, saves (then the checkpoint) are written behind
+            with ModValPipeline(self.loadModValData, list(tasks.keys()), prefetch=prefetch, verbose=verbose) as pipe:
+                for n, (modVal, (modValData, error)) in enumerate(pipe):
+                    if self.isUpdateModVal(n):
+                        ts.update(n=n + 1, N=len(tasks))
+                    saves = []
+                    if error is None:
+                        try:
+                            self.makeModValMetaData(modVal, options, modValData, lambda *args, **kwargs: saves.append((args, kwargs)), tasks[modVal])
+                        except Exception as err:
+                            error = getShardError(err)
+                    if error is not None:
+                        self.setFailedModVal(modVal, error, verbose)
+                        continue
+                    pipe.write(self.saveModValMetaData, modVal, saves, tasks[modVal], options)
+        else:
+            for n, (modVal, modValMetaTypes) in enumerate(tasks.items()):
+                if self.isUpdateModVal(n):
+                    ts.update(n=n + 1, N=len(tasks))
+                try:
+                    self.makeModValMetaData(modVal, options, metaTypes=modValMetaTypes)
+                except Exception as error:
+                    self.setFailedModVal(modVal, getShardError(error), verbose)
                     continue
-                
-                if verbose:
-                    print(f"{metaData.shape} ... ", end="")
-                self.rdio.saveData(f"Meta{metaType}", modVal, data=metaData)
-                if verbose is True:
-                    print("✓")
+                self.updateCheckpoint(modVal, modValMetaTypes, options)
+        
+        if len(self.failedModVals) > 0:
+            print(f"  ==> {len(self.failedModVals)}/{len(modVals)} ModVals Failed: {sorted(self.failedModVals.keys())}")
+            for modVal, error in sorted(self.failedModVals.items()):
+                print(f"    ModVal={modVal: <4} | {error.splitlines()[0]}")
                         
-        ts.stop()
\ No newline at end of file
+        ts.stop()
+        if onError == "raise" and len(self.failedModVals) > 0:
+            modVal, error = sorted(self.failedModVals.items())[0]
+            raise RuntimeError(f"{len(self.failedModVals)}/{len(modVals)} ModVals failed {sorted(self.failedModVals.keys())}. ModVal={modVal}: {error}")
@@ -0,0 +1,88 @@
+""" Fused (Single Traversal) Meta Data Extraction For All Registered Producers """
+
+__all__ = ["MetaVisitor"]
+
+from pandas import Series, DataFrame
+import numpy as np
+
+
+###############################################################################
+# Collect (column, key, op) Requests => Walk Each Column Once => Build Outputs
+###############################################################################
+class MetaVisitor:
+    fingerprintExclude = {"plans"}
+
+    def __repr__(self):
+        return f"MetaVisitor(fused={list(self.fused.keys())}, unfused={list(self.unfused.keys())})"
+
+    def __init__(self, procs: dict, **kwargs):
+        self.verbose = kwargs.get('verbose', False)
+        self.procs = procs
+        self.fused = {metaType: metaTypeProd for metaType, metaTypeProd in procs.items() if self.isFusable(metaTypeProd)}
+        self.unfused = {metaType: metaTypeProd for metaType, metaTypeProd in procs.items() if metaType not in self.fused}
+        self.plans = {}
+
+    def getOwner(self, metaTypeProd, attr: str):
+        retval = next((cls for cls in type(metaTypeProd).__mro__ if attr in cls.__dict__), None)
+        return retval
+
+    def isFusable(self, metaTypeProd) -> 'bool':
+        # A producer that overrides getMetaData (but not buildMetaData) keeps its own getMetaData
+        if not (callable(getattr(metaTypeProd, 'getFields', None)) and callable(getattr(metaTypeProd, 'buildMetaData', None))):
+            return False
+        retval = self.getOwner(metaTypeProd, "getMetaData") is self.getOwner(metaTypeProd, "buildMetaData")
+        return retval
+
+    def getPlan(self, metaTypes: tuple) -> 'dict':
+        # column => unique (key, op) requests of all fused producers reading that column
+        if metaTypes not in self.plans:
+            plan = {}
+            for metaType in metaTypes:
+                for column, key, op in self.fused[metaType].getFields():
+                    requests = plan.setdefault(column, [])
+                    if (key, op) not in requests:
+                        requests.append((key, op))
+            self.plans[metaTypes] = plan
+        return self.plans[metaTypes]
+
+    ###########################################################################
+    # Single Traversal
+    ###########################################################################
+    def applyOp(self, values: list, op) -> 'list':
+        if op == "len":
+            return [len(value) if isinstance(value, (dict, list)) else 0 for value in values]
+        if op == "shape":
+            return [value.shape[0] if isinstance(value, DataFrame) else 0 for value in values]
+        return values
+
+    def getFieldData(self, modValData: DataFrame, plan: dict) -> 'dict':
+        # Each column is walked once (type checks included) and every requested key is read from that one pass
+        retval = {}
+        for column, requests in plan.items():
+            if column not in modValData.columns:
+                continue
+            values = modValData[column].to_numpy(dtype=object).tolist()
+            # One comprehension reads every requested key of a value (tuples), then transposes into per key lists
+            dictKeys = list(dict.fromkeys([key for key, op in requests if key is not None]))
+            missing = (None,) * len(dictKeys)
+            rows = [tuple([value.get(key) for key in dictKeys]) if isinstance(value, dict) else missing for value in values]
+            keyValues = {key: list(keyData) for key, keyData in zip(dictKeys, zip(*rows))} if len(rows) > 0 else {key: [] for key in dictKeys}
+            keyValues[None] = values
+            del rows
+            for key, op in requests:
+                fieldValues = self.applyOp(keyValues[key], op)
+                fieldValues = Series(fieldValues, index=modValData.index, name=key, dtype=np.int64 if op in ["len", "shape"] else None)
+                retval[(column, key, op)] = fieldValues
+        return retval
+
+    def visit(self, modValData: DataFrame, metaTypes=None) -> 'dict':
+        assert isinstance(modValData, DataFrame), f"ModValData [{type(modValData)}] is not a DataFrame object"
+        metaTypes = list(self.procs.keys()) if metaTypes is None else metaTypes
+        fieldData = self.getFieldData(modValData, self.getPlan(tuple([metaType for metaType in metaTypes if metaType in self.fused])))
+        retval = {}
+        for metaType in metaTypes:
+            if metaType in self.fused:
+                retval[metaType] = self.fused[metaType].buildMetaData(fieldData, modValData)
+            else:
+                retval[metaType] = self.unfused[metaType].getMetaData(modValData)
+        return retval
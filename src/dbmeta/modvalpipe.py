@@ -0,0 +1,89 @@
+""" Prefetching Read / Asynchronous Write Pipeline For ModVal Loops """
+
+__all__ = ["ModValPipeline"]
+
+from concurrent.futures import ThreadPoolExecutor
+from collections import deque
+
+
+###############################################################################
+# load(modVal) K Shards Ahead On Threads, save() Behind With Back-Pressure
+###############################################################################
+class ModValPipeline:
+    def __repr__(self):
+        return f"ModValPipeline(modVals={len(self.modVals)}, prefetch={self.prefetch}, maxWrites={self.maxWrites})"
+
+    def __init__(self, loader, modVals: list, **kwargs):
+        self.verbose = kwargs.get('verbose', False)
+        assert callable(loader), f"loader [{loader}] is not callable"
+        self.loader = loader
+        self.modVals = list(modVals)
+        self.prefetch = kwargs.get('prefetch', 2)
+        self.maxWrites = kwargs.get('maxWrites', max(self.prefetch, 1))
+        assert isinstance(self.prefetch, int) and self.prefetch >= 0, f"prefetch [{self.prefetch}] is not an int >= 0"
+        self.readers = None
+        self.writer = None
+        self.writes = deque()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close(wait=exc_type is None)
+        return False
+
+    ###########################################################################
+    # Read (In ModVal Order)
+    ###########################################################################
+    def __iter__(self):
+        if self.prefetch == 0:
+            for modVal in self.modVals:
+                yield modVal, self.loader(modVal)
+            return
+
+        # At most prefetch shards are loaded ahead of the one being processed
+        self.readers = ThreadPoolExecutor(max_workers=self.prefetch, thread_name_prefix="modval-read")
+        loads = deque()
+        todo = iter(self.modVals)
+        try:
+            for modVal in todo:
+                loads.append((modVal, self.readers.submit(self.loader, modVal)))
+                if len(loads) > self.prefetch:
+                    modVal, future = loads.popleft()
+                    yield modVal, future.result()
+            while len(loads) > 0:
+                modVal, future = loads.popleft()
+                yield modVal, future.result()
+        finally:
+            for _, future in loads:
+                future.cancel()
+            self.readers.shutdown(wait=True)
+            self.readers = None
+
+    ###########################################################################
+    # Write (Asynchronous, Bounded)
+    ###########################################################################
+    def write(self, saver, *args, **kwargs) -> 'None':
+        if self.prefetch == 0:
+            saver(*args, **kwargs)
+            return
+        if self.writer is None:
+            self.writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="modval-write")
+        # Back-pressure: wait for the oldest write before queueing more than maxWrites
+        while len(self.writes) >= self.maxWrites:
+            self.writes.popleft().result()
+        self.writes.append(self.writer.submit(saver, *args, **kwargs))
+
+    def flush(self) -> 'None':
+        while len(self.writes) > 0:
+            self.writes.popleft().result()
+
+    def close(self, wait=True) -> 'None':
+        try:
+            if wait is True:
+                self.flush()
+        finally:
+            if self.writer is not None:
+                self.writer.shutdown(wait=True)
+                self.writer = None
+            self.writes.clear()
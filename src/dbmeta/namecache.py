@@ -0,0 +1,187 @@
+""" Memoized Name Standardization (SummaryNameStandard/MatchNameStandard) """
+
+__all__ = ["NameStandardCache"]
+
+from pandas import Series, factorize
+from pandas.api.types import infer_dtype
+from itertools import islice
+from pathlib import Path
+from .compact import expandSummaryData
+from .metacheckpoint import getProducerFingerprint
+import numpy as np
+import threading
+import pickle
+
+
+###############################################################################
+# Deduplicate => Standardize Unique Values => Map Back
+###############################################################################
+class NameStandardCache:
+    fingerprintExclude = {"added", "rows", "hits", "misses", "maxSize", "cacheFile", "lock"}
+
+    def __repr__(self):
+        return f"NameStandardCache(standard={self.standard.__class__.__name__}, size={len(self.cache)}, hitRate={self.getHitRate():.3f})"
+
+    def __init__(self, standard, **kwargs):
+        self.verbose = kwargs.get('verbose', False)
+        assert hasattr(standard, 'update'), f"standard [{standard}] does not have an update function"
+        self.standard = standard
+        self.maxSize = kwargs.get('maxSize', 2_000_000)
+        self.version = kwargs.get('version', None)
+        cacheFile = kwargs.get('cacheFile', None)
+        self.cacheFile = Path(cacheFile) if cacheFile is not None else None
+        self.cache = {}
+        self.added = None
+        # Prefetch reader threads share one cache: lookups, inserts, trims and counters run under this lock
+        self.lock = threading.RLock()
+        self.resetCounters()
+        self.load()
+
+    def __getstate__(self):
+        # Process pool workers get the standard, not the (possibly large) cache
+        state = self.__dict__.copy()
+        state["cache"] = {}
+        del state["lock"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.lock = threading.RLock()
+
+    ###########################################################################
+    # Counters
+    ###########################################################################
+    def resetCounters(self) -> 'None':
+        self.rows = 0
+        self.hits = 0
+        self.misses = 0
+
+    def getHitRate(self) -> 'float':
+        lookups = self.hits + self.misses
+        retval = self.hits / lookups if lookups > 0 else 0.0
+        return retval
+
+    def getCounters(self) -> 'dict':
+        unique = self.hits + self.misses
+        retval = {"Rows": self.rows, "Unique": unique, "Hits": self.hits, "Misses": self.misses,
+                  "HitRate": self.getHitRate(), "DedupRatio": self.rows / unique if unique > 0 else 0.0}
+        return retval
+
+    def info(self) -> 'None':
+        counters = self.getCounters()
+        print(f"  ==> {self.standard.__class__.__name__} Cache: {counters['Rows']} Rows, {counters['Unique']} Unique, "
+              f"{counters['Hits']} Hits ({counters['HitRate']:.1%}), {len(self.cache)} Cached")
+
+    ###########################################################################
+    # Pool Worker Updates (Worker Copy => Parent)
+    ###########################################################################
+    def startUpdates(self) -> 'None':
+        # Called in a pool worker: from here on its new entries and counts are kept for popUpdates()
+        with self.lock:
+            self.added = {}
+            self.resetCounters()
+
+    def popUpdates(self) -> 'dict':
+        with self.lock:
+            retval = {"cache": self.added if self.added is not None else {}, "rows": self.rows, "hits": self.hits, "misses": self.misses}
+            self.added = {} if self.added is not None else None
+            self.resetCounters()
+        return retval
+
+    def mergeUpdates(self, updates) -> 'None':
+        if not isinstance(updates, dict):
+            return
+        with self.lock:
+            self.cache.update(updates["cache"])
+            self.rows += updates["rows"]
+            self.hits += updates["hits"]
+            self.misses += updates["misses"]
+            self.trim()
+
+    ###########################################################################
+    # Persistent Cache
+    ###########################################################################
+    def getSignature(self) -> 'tuple':
+        # Source and config of the standard, so an edited standard never serves stale names from disk
+        return (self.standard.__class__.__module__, self.standard.__class__.__name__, self.version, getProducerFingerprint(self.standard))
+
+    def load(self) -> 'None':
+        if self.cacheFile is None or not self.cacheFile.exists():
+            return
+        with open(self.cacheFile, "rb") as f:
+            cacheData = pickle.load(f)
+        if cacheData.get("signature") == self.getSignature():
+            with self.lock:
+                self.cache = cacheData.get("cache", {})
+                self.trim()
+
+    def save(self) -> 'None':
+        if self.cacheFile is None:
+            return
+        self.cacheFile.parent.mkdir(parents=True, exist_ok=True)
+        with self.lock:
+            self.trim()
+            with open(self.cacheFile, "wb") as f:
+                pickle.dump({"signature": self.getSignature(), "cache": self.cache}, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+    def trim(self) -> 'None':
+        # LRU: hits are moved to the end, so the first entries are the least recently used
+        with self.lock:
+            excess = len(self.cache) - self.maxSize
+            if excess > 0:
+                for key in list(islice(self.cache, excess)):
+                    del self.cache[key]
+
+    ###########################################################################
+    # Standardize
+    ###########################################################################
+    def getKeys(self, values: Series) -> 'Series':
+        if infer_dtype(values, skipna=True) in ["string", "empty"]:
+            return values
+        return values.map(lambda value: tuple(value) if isinstance(value, list) else value)
+
+    def update(self, values, *args, **kwargs):
+        if not isinstance(values, Series):
+            return self.standard.update(values, *args, **kwargs)
+
+        namespace = (args, tuple(sorted((k, v) for k, v in kwargs.items() if k != 'verbose')))
+        try:
+            hash(namespace)
+        except TypeError:
+            return self.standard.update(values, *args, **kwargs)
+        values = expandSummaryData(values)
+        codes, uniques = factorize(self.getKeys(values), use_na_sentinel=False)
+        _, firstPos = np.unique(codes, return_index=True)
+        uniqueValues = values.iloc[firstPos]
+        uniqueIsNA = uniqueValues.isna().to_numpy()
+
+        results = np.empty(len(uniques), dtype=object)
+        missing = []
+        with self.lock:
+            for i, key in enumerate(uniques):
+                if not uniqueIsNA[i] and (namespace, key) in self.cache:
+                    results[i] = self.cache[(namespace, key)] = self.cache.pop((namespace, key))
+                else:
+                    missing.append(i)
+            self.rows += len(values)
+            self.hits += len(uniques) - len(missing)
+            self.misses += len(missing)
+
+        name = values.name
+        if len(missing) > 0:
+            missingValues = Series(uniqueValues.to_numpy()[missing], index=range(len(missing)), name=values.name)
+            standardValues = self.standard.update(missingValues, *args, **kwargs)
+            name = getattr(standardValues, 'name', name)
+            standardValues = standardValues.reindex(range(len(missing))).to_numpy()
+            # The standard itself runs outside the lock, only the inserts are serialized
+            with self.lock:
+                for i, value in zip(missing, standardValues):
+                    results[i] = value
+                    if not uniqueIsNA[i]:
+                        self.cache[(namespace, uniques[i])] = value
+                        if self.added is not None:
+                            self.added[(namespace, uniques[i])] = value
+                self.trim()
+
+        retval = Series(results[codes], index=values.index, name=name)
+        return retval
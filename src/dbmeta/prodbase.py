@@ -7,7 +7,22 @@ from dbmaster import MasterMetas
 from dbbase import SummaryNameStandard, MatchNameStandard, MusicDBRootDataIO
 from dbraw import RawDataIOBase
 from utils import getFlatList
-from pandas import Series
+from pandas import Series, DataFrame, Index, factorize
+from .namecache import NameStandardCache
+from .datacache import CachedDataIO, getDataIO
+from operator import attrgetter
+import numpy as np
+import re
+
+
+###############################################################################
+# Name Standard (Optionally Memoized)
+###############################################################################
+def getNameStandard(standard, **kwargs):
+    if kwargs.get('nameCache', True) is False:
+        return standard
+    retval = NameStandardCache(standard, cacheFile=kwargs.get('nameCacheFile'), maxSize=kwargs.get('nameCacheSize', 2_000_000))
+    return retval
 
 
 ###############################################################################
@@ -19,12 +34,12 @@ class MatchProducerBase:
     
     def __init__(self, rdio: MusicDBRootDataIO, **kwargs):
         self.verbose = kwargs.get('verbose', False)
-        assert isinstance(rdio, MusicDBRootDataIO), f"rdio [{rdio}] is not of type MusicDBRootDataIO"
+        assert isinstance(rdio, (MusicDBRootDataIO, CachedDataIO)), f"rdio [{rdio}] is not of type MusicDBRootDataIO"
         mm = MasterMetas()
         self.matchTypes = mm.getMatchTypes()
         self.summaryTypes = mm.getSummaryTypes()
-        self.mns = MatchNameStandard()
-        self.rdio = rdio
+        self.mns = getNameStandard(MatchNameStandard(), **kwargs)
+        self.rdio = getDataIO(rdio, **kwargs)
         self.db = rdio.db
 
 
@@ -40,10 +55,18 @@ class MatchOmitBase:
         self.setMatchTypes()
         assert isinstance(self.matchTypes, list), f"MatchTypes [{self.matchTypes}] is not a list"
         self.omit = {}
+        self.omitIndex = None
         
     def setOmitData(self, omitData: dict) -> 'None':
         assert isinstance(omitData, dict), f"OmitData [{type(omitData)}] is not a dict"
         self.omit = omitData
+        self.omitIndex = None
+        
+    def getOmitIndex(self) -> 'Index':
+        # Precompiled (hashed) omitted IDs so the whole mask is a single isin()
+        if self.omitIndex is None:
+            self.omitIndex = Index([dbid for dbid, omitted in self.omit.items() if omitted], dtype=object)
+        return self.omitIndex
         
     def setMatchTypes(self, keep=None, skip=None) -> 'None':
         mm = MasterMetas()
@@ -70,11 +93,11 @@ class SummaryProducerBase:
     
     def __init__(self, rdio, **kwargs):
         self.verbose = kwargs.get('verbose', False)
-        assert isinstance(rdio, MusicDBRootDataIO), f"rdio [{rdio}] is not of type MusicDBRootDataIO"
+        assert isinstance(rdio, (MusicDBRootDataIO, CachedDataIO)), f"rdio [{rdio}] is not of type MusicDBRootDataIO"
         mm = MasterMetas()
         self.summaryTypes = mm.getSummaryTypes()
-        self.sns = SummaryNameStandard()
-        self.rdio = rdio
+        self.sns = getNameStandard(SummaryNameStandard(), **kwargs)
+        self.rdio = getDataIO(rdio, **kwargs)
         self.db = rdio.db
 
     ###########################################################################
@@ -91,20 +114,73 @@ class SummaryProducerBase:
 # Media Type Rank Base
 ###############################################################################
 class MediaTypeRankBase:
+    fingerprintExclude = {"classifier", "classifierSignature", "groupRanks", "cache", "maxCacheSize"}
+    
     def __init__(self, **kwargs):
         self.verbose = kwargs.get('verbose', False)
         self.mediaTypes = MasterMetas().getMediaTypes()
         self.last = Series(self.mediaTypes).index.max()
+        self.maxCacheSize = kwargs.get('maxCacheSize', 100_000)
         self.mediaRanking = {rank: [] for rank in self.mediaTypes.keys()}
+        
+    @property
+    def mediaRanking(self) -> 'dict':
+        return self.rankingData
+    
+    @mediaRanking.setter
+    def mediaRanking(self, mediaRanking: dict):
+        # A new ranking drops the compiled classifier and the memoized ranks
+        self.rankingData = mediaRanking
+        self.classifier = None
+        self.classifierSignature = None
+        self.cache = {}
+        
+    ###########################################################################
+    # Compiled Classifier (mediaRanking is filled by the derived class)
+    ###########################################################################
+    def getClassifier(self):
+        signature = tuple((rank, tuple(rankTags)) for rank, rankTags in self.mediaRanking.items())
+        if self.classifier is not None and signature == self.classifierSignature:
+            return self.classifier
+        
+        # One lookahead per rank, tried from the highest rank down, so the first branch
+        # that contains any of its tags is the highest matching rank
+        ranks = sorted([rank for rank, rankTags in self.mediaRanking.items() if rank not in [self.last] and len(rankTags) > 0], reverse=True)
+        self.groupRanks = {f"r{i}": rank for i, rank in enumerate(ranks)}
+        branches = [f"(?=.*?(?P<r{i}>{'|'.join([re.escape(tag) for tag in self.mediaRanking[rank]])}))" for i, rank in enumerate(ranks)]
+        self.classifier = re.compile(f"(?:{'|'.join(branches)})", re.DOTALL) if len(branches) > 0 else None
+        self.classifierSignature = signature
+        self.cache = {}
+        return self.classifier
+    
+    def getRank(self, mediaType):
+        # Highest matching rank or None (=> last rank / Remaining)
+        if not isinstance(mediaType, str):
+            return None
+        # The classifier is checked first: a changed (even in place) ranking clears the memo
+        classifier = self.getClassifier()
+        if mediaType in self.cache:
+            return self.cache[mediaType]
+        match = classifier.match(mediaType) if classifier is not None else None
+        retval = self.groupRanks[match.lastgroup] if match is not None else None
+        # Bounded FIFO memo: the oldest classified media type is dropped first
+        if len(self.cache) >= self.maxCacheSize:
+            del self.cache[next(iter(self.cache))]
+        self.cache[mediaType] = retval
+        return retval
+    
+    def getRanks(self, mediaTypes) -> 'list':
+        codes, uniques = factorize(np.asarray(list(mediaTypes), dtype=object), use_na_sentinel=False)
+        uniqueRanks = [self.getRank(mediaType) for mediaType in uniques]
+        retval = [uniqueRanks[code] for code in codes]
+        return retval
          
     def sortMediaData(self, mediaData):
         results = {rank: {} for rank in self.mediaRanking.keys()}
         remaining = {}
-        for mediaType, cnt in mediaData.iteritems():
-            values = Series({rank: sum([tag in mediaType for tag in rankTags]) for rank, rankTags in self.mediaRanking.items() if rank not in [self.last]})
-            values = values[values > 0]
-            if len(values) > 0:
-                results[values.index.max()][mediaType] = cnt
+        for (mediaType, cnt), rank in zip(mediaData.items(), self.getRanks(mediaData.index)):
+            if rank is not None:
+                results[rank][mediaType] = cnt
             else:
                 remaining[mediaType] = cnt
                 
@@ -115,22 +191,24 @@ class MediaTypeRankBase:
         return results
     
     def getMediaTypeRank(self, mediaType):
-        if isinstance(mediaType, str):
-            values = Series({rank: sum([tag in mediaType for tag in rankTags]) for rank, rankTags in self.mediaRanking.items() if rank not in [self.last]})
-            values = values[values > 0]
-            retval = self.mediaTypes[values.index.max()] if len(values) > 0 else self.mediaTypes[self.last]
-            return retval
-        else:
-            retval = self.mediaTypes[self.last]
-            return retval
+        rank = self.getRank(mediaType)
+        retval = self.mediaTypes[rank] if rank is not None else self.mediaTypes[self.last]
+        return retval
+    
+    def getMediaTypeRanks(self, mediaTypes) -> 'list':
+        retval = [self.mediaTypes[rank] if rank is not None else self.mediaTypes[self.last] for rank in self.getRanks(mediaTypes)]
+        return retval
    
 
 ###############################################################################
 # Meta Data Utils Base
 ###############################################################################
 class MetaProducerUtilBase:
+    fingerprintExclude = {"plans"}
+    
     def __init__(self, **kwargs):
         self.rawbase = RawDataIOBase()
+        self.plans = {}
         
     def isRawData(self, rData):
         retval = rData.__class__.__name__ == "RawData"
@@ -218,8 +296,9 @@ class MetaProducerUtilBase:
         return retval
     
     def getMediaDates(self, rData):
-        return {}
         media = self.getMediaData(rData, {})
+        if not isinstance(media, dict):
+            return {}
         retval = {mediaType: [release.year for release in mediaTypeData.values() if isinstance(release.year, (int, str))] for mediaType, mediaTypeData in media.items()}
         return retval
     
@@ -233,4 +312,70 @@ class MetaProducerUtilBase:
         return {}
         media = self.getMediaData(rData, {})
         retval = getFlatList([[release.aformat for release in mediaTypeData.values()] for mediaTypeData in media.values()])
-        return retval
\ No newline at end of file
+        return retval
+    
+    ###########################################################################
+    # Batch Extraction (One Cached Accessor Plan Per Raw Class)
+    ###########################################################################
+    def getFieldSpec(self, field) -> 'tuple':
+        # "Profile", "General", "External", "Extra", "Genres", "Tags", "Media", "MediaNames"
+        # or (group, key[, default]) for a single key of the General/External/Extra dicts
+        if isinstance(field, str):
+            return (field, None, {} if field == "MediaNames" else None)
+        assert isinstance(field, tuple) and len(field) in [2, 3], f"field [{field}] is not a str or (group, key[, default]) tuple"
+        assert field[0] in ["General", "External", "Extra"], f"field group [{field[0]}] does not have keys"
+        return (field[0], field[1], field[2] if len(field) == 3 else None)
+    
+    def getAccessor(self, className: str, field, maxNum=100):
+        # Returns a function of an array of raw objects (all of class className) => list of values
+        group, key, default = self.getFieldSpec(field)
+        if className != "RawData":
+            return lambda rDatas: [default] * len(rDatas)
+        if group == "MediaNames":
+            return lambda rDatas: [self.getMediaNames(rData, maxNum=maxNum) for rData in rDatas]
+        
+        getters = {"Profile": "profile", "General": "profile.general", "External": "profile.external", "Extra": "profile.extra",
+                   "Genres": "profile.genres", "Tags": "profile.tags", "Media": "media.media"}
+        assert group in getters, f"field [{group}] is not a known raw data field"
+        getter = attrgetter(getters[group])
+        
+        def safeGetter(rData):
+            try:
+                return getter(rData)
+            except AttributeError:
+                return default
+        
+        def accessor(rDatas):
+            try:
+                values = list(map(getter, rDatas))
+            except AttributeError:
+                values = list(map(safeGetter, rDatas))
+            if key is not None:
+                values = [value.get(key, default) if isinstance(value, dict) else default for value in values]
+            return values
+        return accessor
+    
+    def getAccessorPlan(self, className: str, fields: tuple, maxNum=100) -> 'list':
+        planKey = (className, fields, maxNum)
+        if planKey not in self.plans:
+            self.plans[planKey] = [self.getAccessor(className, field, maxNum) for field in fields]
+        return self.plans[planKey]
+    
+    def getBatchData(self, modValData: Series, fields: list, **kwargs) -> 'DataFrame':
+        assert isinstance(modValData, Series), f"modValData [{type(modValData)}] is not a Series"
+        maxNum = kwargs.get('maxNum', 100)
+        fields = tuple(fields)
+        columns = [field if isinstance(field, str) else field[1] for field in fields]
+        values = [np.empty(len(modValData), dtype=object) for _ in fields]
+        
+        # Rows are grouped by raw class so each plan runs over a whole group at once
+        rDatas = modValData.to_numpy(dtype=object)
+        classCodes, rawClasses = factorize(np.fromiter(map(type, rDatas), dtype=object, count=len(rDatas)))
+        for code, rawClass in enumerate(rawClasses):
+            rows = np.flatnonzero(classCodes == code)
+            plan = self.getAccessorPlan(rawClass.__name__, fields, maxNum)
+            for columnValues, accessor in zip(values, plan):
+                columnValues[rows] = np.fromiter(accessor(rDatas[rows]), dtype=object, count=len(rows))
+        
+        retval = DataFrame(dict(zip(columns, values)), index=modValData.index).infer_objects()
+        return retval
@@ -0,0 +1,96 @@
+""" Summary Data Accumulator """
+
+__all__ = ["SummaryAccumulator"]
+
+from pandas import Series, DataFrame, concat
+from tempfile import mkdtemp
+from pathlib import Path
+from shutil import rmtree
+import pickle
+
+
+###############################################################################
+# Collect ModVal Shards And Materialize Once
+###############################################################################
+class SummaryAccumulator:
+    def __repr__(self):
+        return f"SummaryAccumulator(shards={len(self.shards)}, spilled={self.numSpilled}, memory={self.memory})"
+
+    def __init__(self, **kwargs):
+        self.verbose = kwargs.get('verbose', False)
+        self.maxMemory = kwargs.get('maxMemory', None)
+        self.spillDir = kwargs.get('spillDir', None)
+        assert self.maxMemory is None or isinstance(self.maxMemory, int), f"maxMemory [{self.maxMemory}] is not an int (bytes)"
+        self.clear()
+
+    def clear(self) -> 'None':
+        self.release()
+        self.shardIndex = {}
+        self.peakMemory = 0
+        self.numSpilled = 0
+
+    def release(self) -> 'None':
+        if getattr(self, 'tmpDir', None) is not None:
+            rmtree(self.tmpDir, ignore_errors=True)
+        self.tmpDir = None
+        self.shards = []
+        self.memory = 0
+
+    def __len__(self):
+        return len(self.shards)
+
+    ###########################################################################
+    # Memory Budget
+    ###########################################################################
+    def getMemory(self, data) -> 'int':
+        # Shallow (array) size: one cheap estimate per shard, without walking the Python objects
+        if self.maxMemory is None:
+            return 0
+        retval = data.memory_usage(deep=False)
+        retval = int(retval.sum()) if isinstance(retval, Series) else int(retval)
+        return retval
+
+    def spill(self) -> 'None':
+        if self.tmpDir is None:
+            self.tmpDir = Path(mkdtemp(prefix="dbmeta-summary-", dir=self.spillDir))
+        for i, shard in enumerate(self.shards):
+            if isinstance(shard, Path):
+                continue
+            spillFile = self.tmpDir / f"shard-{i}.p"
+            with open(spillFile, "wb") as f:
+                pickle.dump(shard, f, protocol=pickle.HIGHEST_PROTOCOL)
+            self.shards[i] = spillFile
+            self.numSpilled += 1
+        if self.verbose is True:
+            print(f"  ==> Spilled {self.numSpilled} Summary Shards ({self.memory} bytes) To {self.tmpDir}")
+        self.memory = 0
+
+    ###########################################################################
+    # Add & Materialize
+    ###########################################################################
+    def add(self, data, key=None) -> 'None':
+        if not isinstance(data, (Series, DataFrame)):
+            return
+        self.shards.append(data)
+        if key is not None:
+            self.shardIndex[key] = data.index
+        self.memory += self.getMemory(data)
+        self.peakMemory = max(self.peakMemory, self.memory)
+        if self.maxMemory is not None and self.memory > self.maxMemory:
+            self.spill()
+
+    def getShard(self, shard):
+        if isinstance(shard, Path):
+            with open(shard, "rb") as f:
+                return pickle.load(f)
+        return shard
+
+    def get(self):
+        # One concat over all shards (spilled ones are read back here), so the result and the shards
+        # are alive together once
+        if len(self.shards) == 0:
+            return None
+        shards = [self.getShard(shard) for shard in self.shards]
+        self.release()
+        retval = concat(shards) if len(shards) > 1 else shards[0]
+        return retval
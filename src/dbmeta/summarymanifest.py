@@ -0,0 +1,99 @@
+""" Per-Shard Manifest For Incremental Summary Rebuilds """
+
+__all__ = ["SummaryManifest"]
+
+from dbbase import MusicDBRootDataIO
+from pandas import Index
+from .fileutils import getArtifactPath, getSidecarPath, getFileStats, getFileHash
+import pickle
+
+
+###############################################################################
+# Meta{SummaryType} Shard => (size, mtime, hash, artist IDs)
+###############################################################################
+class SummaryManifest:
+    def __repr__(self):
+        return f"SummaryManifest(db={self.rdio.db}, summaryType={self.summaryType}, shards={len(self.shards)})"
+
+    def __init__(self, rdio: MusicDBRootDataIO, summaryType: str, **kwargs):
+        self.verbose = kwargs.get('verbose', False)
+        assert isinstance(summaryType, str), f"summaryType [{summaryType}] is not a str"
+        self.rdio = rdio
+        self.summaryType = summaryType
+        self.metaType = f"Meta{summaryType}"
+        self.filename = getSidecarPath(rdio, "SummaryName", f"Summary{summaryType}Manifest.p")
+        self.outputs = []
+        self.shards = {}
+        self.stats = {}
+        self.load()
+
+    ###########################################################################
+    # I/O
+    ###########################################################################
+    def load(self) -> 'None':
+        if not self.filename.exists():
+            return
+        with open(self.filename, "rb") as f:
+            manifest = pickle.load(f)
+        self.outputs = manifest.get("outputs", [])
+        self.shards = manifest.get("shards", {})
+
+    def save(self) -> 'None':
+        self.filename.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.filename, "wb") as f:
+            pickle.dump({"outputs": self.outputs, "shards": self.shards}, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+    def isPatchable(self) -> 'bool':
+        if len(self.shards) == 0 or len(self.outputs) == 0:
+            return False
+        retval = all([getArtifactPath(self.rdio, output).exists() for output in self.outputs])
+        return retval
+
+    ###########################################################################
+    # Changed Shards
+    ###########################################################################
+    def getShardStats(self, modVal) -> 'dict':
+        if self.stats.get(modVal) is None:
+            path = getArtifactPath(self.rdio, self.metaType, modVal)
+            size, mtime = getFileStats(path) if path.exists() else (None, None)
+            self.stats[modVal] = {"size": size, "mtime": mtime, "hash": None}
+        return self.stats[modVal]
+
+    def isChanged(self, modVal) -> 'bool':
+        entry = self.shards.get(modVal)
+        stats = self.getShardStats(modVal)
+        if stats["size"] is None:
+            return entry is not None
+        if entry is None:
+            return True
+        if (stats["size"], stats["mtime"]) == (entry["size"], entry["mtime"]):
+            return False
+        if entry["hash"] is None:
+            return True
+        # Touched but maybe not modified
+        stats["hash"] = getFileHash(getArtifactPath(self.rdio, self.metaType, modVal))
+        return stats["hash"] != entry["hash"]
+
+    def getChangedModVals(self, modVals) -> 'list':
+        retval = [modVal for modVal in modVals if self.isChanged(modVal)]
+        return retval
+
+    def getStaleIDs(self, modVals) -> 'Index':
+        ids = [self.shards[modVal]["ids"] for modVal in modVals if self.shards.get(modVal) is not None]
+        retval = ids[0].append(ids[1:]) if len(ids) > 0 else Index([])
+        return retval
+
+    ###########################################################################
+    # Update
+    ###########################################################################
+    def update(self, modVals, shardIndex: dict, outputs: list, hashed=False) -> 'None':
+        for modVal in modVals:
+            stats = self.getShardStats(modVal)
+            if stats["size"] is None:
+                self.shards.pop(modVal, None)
+                continue
+            if hashed is True and stats["hash"] is None:
+                stats["hash"] = getFileHash(getArtifactPath(self.rdio, self.metaType, modVal))
+            self.shards[modVal] = {**stats, "ids": shardIndex.get(modVal, Index([]))}
+        self.outputs = sorted(set(self.outputs).union(outputs))
+        self.stats = {}
@@ -4,19 +4,86 @@ __all__ = ["SummaryProducerIO"]
 
 from dbbase import MusicDBRootDataIO, getModVals
 from utils import Timestat, getFlatList
-from pandas import Series, DataFrame, concat
+from pandas import Series, DataFrame, Index, concat
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
 from .prodbase import SummaryProducerBase
+from .summaryaccum import SummaryAccumulator
+from .summarymanifest import SummaryManifest
+from .summarystore import SummaryPartitionIO
+from .namecache import NameStandardCache
+from .compact import compactSummaryData
+from .modvalpipe import ModValPipeline
+from .mediametaprod import isLongMediaMetaData, flattenLongMediaMetaData
+import numpy as np
+
+
+###############################################################################
+# ModVal Loaders (module level so they can be shipped to a process pool)
+###############################################################################
+def getSummaryModValData(rdio: MusicDBRootDataIO, metaType: str, modVal: int, transform=None):
+    modValMetaData = rdio.getData(metaType, modVal) if rdio.getFilename(metaType, modVal).exists() else None
+    if isinstance(modValMetaData, DataFrame) and callable(transform):
+        modValMetaData = transform(modValMetaData)
+    return modValMetaData
+
+
+summaryShardWorker = {}
+
+
+def initSummaryShardWorker(rdio: MusicDBRootDataIO, metaType: str, transform=None) -> 'None':
+    # The loader (and the name standard of its transform) is shipped once per worker, not once per shard,
+    # so a worker's name cache stays warm across its shards
+    summaryShardWorker["loader"] = partial(getSummaryModValData, rdio, metaType, transform=transform)
+    sns = transform.keywords.get('sns') if isinstance(transform, partial) else None
+    summaryShardWorker["sns"] = sns if isinstance(sns, NameStandardCache) else None
+    if summaryShardWorker["sns"] is not None:
+        summaryShardWorker["sns"].startUpdates()
+
+
+def makeSummaryShardWorker(modVal: int) -> 'tuple':
+    # Pool workers also return the new entries of their copy of the name cache for the parent to merge
+    modValMetaData = summaryShardWorker["loader"](modVal)
+    updates = summaryShardWorker["sns"].popUpdates() if summaryShardWorker["sns"] is not None else None
+    return modValMetaData, updates
+
+
+def standardizeBasicMetaData(modValMetaData: DataFrame, sns) -> 'DataFrame':
+    modValMetaData = modValMetaData.copy()
+    modValMetaData["ArtistName"] = sns.update(modValMetaData["ArtistName"], "Name")
+    return modValMetaData
+
+
+def flattenMediaMetaData(modValMetaData: DataFrame) -> 'DataFrame':
+    # Per rank name lists ("Media") and their lengths ("Counts"). Long shards are counted while grouped.
+    if isLongMediaMetaData(modValMetaData):
+        mediaData, countsData = flattenLongMediaMetaData(modValMetaData, counts=True)
+    else:
+        mediaData = modValMetaData.map(lambda x: getFlatList(x.values()) if isinstance(x, dict) else None)
+        countsData = mediaData.map(lambda x: len(x) if isinstance(x, list) else 0)
+    retval = concat({"Media": mediaData, "Counts": countsData.astype(int)}, axis=1)
+    return retval
 
 
 ###############################################################################
 # MusicDB Summary Data Producer
 ###############################################################################
 class SummaryProducerIO(SummaryProducerBase):
+    fingerprintExclude = {"manifest", "patching", "summaryModVals", "shardIndex", "sio", "modVals", "test"}
+    
     def __repr__(self):
         return f"SummaryProducerIO(db={self.db})"
         
     def __init__(self, rdio: MusicDBRootDataIO, **kwargs):
         super().__init__(rdio, **kwargs)
+        self.workers = kwargs.get('workers', None)
+        self.prefetch = kwargs.get('prefetch', None)
+        self.maxMemory = kwargs.get('maxMemory', None)
+        self.incremental = kwargs.get('incremental', False)
+        self.partitioned = kwargs.get('partitioned', False)
+        self.compact = kwargs.get('compact', False)
+        self.manifest = None
+        self.shardIndex = {}
         self.dbsums = {}
         if self.verbose:
             print(self.__repr__())
@@ -43,6 +110,142 @@ class SummaryProducerIO(SummaryProducerBase):
         else:
             print(f"  ==> Did not create Artist ID => {summaryType} Summary Data")
             
+    ###########################################################################
+    # ModVal Meta Data Iterator
+    ###########################################################################
+    def iterModValMetaData(self, metaType: str, transform=None, modVals=None):
+        # Shards are yielded in modVal order. With workers > 1 they are loaded/transformed
+        # in a process pool and executor.map() keeps the merge order deterministic. With
+        # prefetch = K the next K shards are loaded on threads while one is merged.
+        modVals = self.modVals if modVals is None else modVals
+        loader = partial(getSummaryModValData, self.rdio, metaType, transform=transform)
+        if isinstance(self.workers, int) and self.workers > 1 and len(modVals) > 1:
+            with ProcessPoolExecutor(max_workers=min(self.workers, len(modVals)), initializer=initSummaryShardWorker,
+                                     initargs=(self.rdio, metaType, transform)) as executor:
+                for modVal, (modValMetaData, updates) in zip(modVals, executor.map(makeSummaryShardWorker, modVals)):
+                    if isinstance(self.sns, NameStandardCache):
+                        self.sns.mergeUpdates(updates)
+                    yield modVal, modValMetaData
+        elif isinstance(self.prefetch, int) and self.prefetch > 0:
+            with ModValPipeline(loader, modVals, prefetch=self.prefetch, verbose=self.verbose) as pipe:
+                yield from pipe
+        else:
+            for modVal in modVals:
+                yield modVal, loader(modVal)
+                
+    def getSummaryAccumulator(self) -> 'SummaryAccumulator':
+        # Shards are collected and concatenated once (spilled to disk above maxMemory bytes)
+        return SummaryAccumulator(maxMemory=self.maxMemory, verbose=self.verbose)
+    
+    ###########################################################################
+    # Load/Save Summary Data (Full Or Incremental)
+    ###########################################################################
+    def getSummaryModVals(self, summaryType: str) -> 'list':
+        self.manifest = SummaryManifest(self.rdio, summaryType, verbose=self.verbose)
+        self.patching = self.incremental is True and self.manifest.isPatchable()
+        if self.patching is False:
+            return self.modVals
+        retval = self.manifest.getChangedModVals(self.modVals)
+        if self.verbose:
+            print(f"  ==> Incremental {summaryType} Summary: {len(retval)}/{len(self.modVals)} Changed ModVals")
+        return retval
+        
+    def getSummaryData(self, summaryType: str, ts: Timestat, transform=None):
+        metaType = f"Meta{summaryType}"
+        self.summaryModVals = self.getSummaryModVals(summaryType)
+        summaryData = self.getSummaryAccumulator()
+        for n, (modVal, modValMetaData) in enumerate(self.iterModValMetaData(metaType, transform, self.summaryModVals)):
+            if self.isUpdateModVal(n) is True:
+                ts.update(n=n + 1, N=len(self.summaryModVals))
+            if isinstance(modValMetaData, DataFrame):
+                summaryData.add(modValMetaData, key=modVal)
+        self.shardIndex = summaryData.shardIndex
+        return summaryData.get()
+    
+    def patchSummaryData(self, summaryKey: str, summaryData):
+        # Drop the IDs previously contributed by the changed shards and append their new data
+        existingData = self.rdio.getData(summaryKey) if self.rdio.getFilename(summaryKey).exists() else None
+        if not isinstance(existingData, (DataFrame, Series)):
+            return summaryData
+        existingData = existingData[~existingData.index.isin(self.manifest.getStaleIDs(self.summaryModVals))]
+        if not isinstance(summaryData, (DataFrame, Series)):
+            return existingData
+        retval = concat([existingData, summaryData])
+        retval.name = getattr(summaryData, 'name', None)
+        
+        # Same row order as a full rebuild: shards in modVal order (IDs outside every shard go last)
+        shardIndex = self.getFullShardIndex()
+        ids = [shardIndex[modVal] for modVal in sorted(shardIndex.keys())]
+        order = ids[0].append(ids[1:]) if len(ids) > 0 else Index([])
+        if order.is_unique:
+            position = order.get_indexer(retval.index)
+            retval = retval.take(np.argsort(np.where(position < 0, len(order), position), kind="stable"))
+        return retval
+    
+    def getFullShardIndex(self) -> 'dict':
+        # modVal => artist IDs of every shard after this run: the manifest's for unchanged shards
+        retval = {}
+        if self.patching is True:
+            retval = {modVal: shard["ids"] for modVal, shard in self.manifest.shards.items() if modVal not in self.summaryModVals}
+        retval.update(self.shardIndex)
+        return retval
+    
+    def isPartitionPatchable(self, summaryKey: str) -> 'bool':
+        # The store only holds the unchanged shards when it was written for the same shards as the manifest
+        if self.patching is False or not self.sio.exists(summaryKey):
+            return False
+        partitions = set(self.sio.getStats(summaryKey)["partitions"].keys())
+        missing = set(self.manifest.shards.keys()).difference(partitions)
+        retval = partitions.issubset(self.manifest.shards.keys()) and all([len(self.manifest.shards[modVal]["ids"]) == 0 for modVal in missing])
+        return retval
+    
+    def savePartitionedData(self, summaryKey: str, data) -> 'None':
+        if self.isPartitionPatchable(summaryKey) is True:
+            self.sio.save(summaryKey, data, self.shardIndex, self.summaryModVals, replace=False)
+            return
+        
+        # Full write of every shard: the unchanged shards' IDs come from the manifest
+        shardIndex = self.getFullShardIndex()
+        self.sio.save(summaryKey, data, shardIndex, sorted(shardIndex.keys()), replace=True)
+    
+    def saveSummaryData(self, summaryType: str, summaryData: dict, optional=None) -> 'None':
+        optional = [] if optional is None else optional
+        if self.test is True:
+            print("  ==> Only testing. Will not save.")
+            return
+        
+        if self.patching is True and len(self.summaryModVals) == 0:
+            return
+        
+        outputs, rebuild = [], False
+        for summaryKey, data in summaryData.items():
+            if self.patching is True and (summaryKey in self.manifest.outputs or summaryKey not in optional):
+                data = self.patchSummaryData(summaryKey, data)
+            if not isinstance(data, (DataFrame, Series)):
+                continue
+            if summaryKey in optional and not (len(data) > 0 and data.count() > 0):
+                continue
+            if self.patching is True and summaryKey not in self.manifest.outputs:
+                # A new optional output only has the changed shards' rows: not saved, the next run rebuilds everything
+                if self.verbose:
+                    print(f"  ==> New {summaryKey} Output Needs A Full Rebuild (Not Saved)")
+                rebuild = True
+                continue
+            data = compactSummaryData(data) if self.compact is True else data
+            self.rdio.saveData(summaryKey, data=data)
+            if self.partitioned is True:
+                self.savePartitionedData(summaryKey, data)
+            outputs.append(summaryKey)
+            
+        if self.patching is False:
+            self.manifest.shards = {}
+            self.manifest.outputs = []
+        self.manifest.update(self.summaryModVals, self.shardIndex, outputs, hashed=self.patching)
+        if len(self.manifest.outputs) > 0 and rebuild is False:
+            self.manifest.save()
+        elif self.manifest.filename.exists():
+            self.manifest.filename.unlink()
+            
     ###########################################################################
     # Master Maker
     ###########################################################################
@@ -50,11 +253,22 @@ class SummaryProducerIO(SummaryProducerBase):
         self.verbose = kwargs.get("verbose", self.verbose)
         self.test = kwargs.get('test', False)
         self.modVals = getModVals(modVal) if self.test is False else [0]
+        self.workers = kwargs.get('workers', self.workers)
+        self.prefetch = kwargs.get('prefetch', self.prefetch)
+        self.maxMemory = kwargs.get('maxMemory', self.maxMemory)
+        self.incremental = kwargs.get('incremental', self.incremental)
+        self.partitioned = kwargs.get('partitioned', self.partitioned)
+        self.compact = kwargs.get('compact', self.compact)
+        self.sio = SummaryPartitionIO(self.rdio, verbose=self.verbose) if self.partitioned is True else None
         summaryTypes = self.getSummaryTypes(key)
             
         ts = Timestat(f"Making {list(summaryTypes.keys())} Summary Data", verbose=self.verbose)
         for summaryType, summaryTypeFunc in summaryTypes.items():
             summaryTypeFunc(**kwargs)
+        if isinstance(self.sns, NameStandardCache):
+            if self.verbose:
+                self.sns.info()
+            self.sns.save()
         ts.stop()
         
     ###########################################################################
@@ -62,37 +276,19 @@ class SummaryProducerIO(SummaryProducerBase):
     ###########################################################################
     def makeBasicSummaryData(self, **kwargs) -> 'None':
         summaryType = "Basic"
-        metaType = f"Meta{summaryType}"
         ts = Timestat(f"Making {self.db} {summaryType} Summary Data", verbose=self.verbose)
         
-        artistIDToName = None
-        artistIDToRef = None
-        artistIDToNumAlbums = None
-        for n, modVal in enumerate(self.modVals):
-            if self.isUpdateModVal(n) is True:
-                ts.update(n=n + 1, N=len(self.modVals))
-            modValMetaData = self.rdio.getData(metaType, modVal) if self.rdio.getFilename(metaType, modVal).exists() else None
-            if isinstance(modValMetaData, DataFrame):
-                artistNames = self.sns.update(modValMetaData["ArtistName"], "Name")
-                artistIDToName = concat([artistIDToName, artistNames]) if isinstance(artistIDToName, Series) else artistNames
-                artistURLs = modValMetaData["URL"]
-                artistIDToRef = concat([artistIDToRef, artistURLs]) if isinstance(artistIDToRef, Series) else artistURLs
-                artistNumAlbums = modValMetaData["NumAlbums"]
-                artistIDToNumAlbums = concat([artistIDToNumAlbums, artistNumAlbums]) if isinstance(artistIDToNumAlbums, Series) else artistNumAlbums
+        transform = partial(standardizeBasicMetaData, sns=self.sns)
+        artistIDToBasic = self.getSummaryData(summaryType, ts, transform)
+        artistIDToName = artistIDToBasic["ArtistName"].rename("Name") if isinstance(artistIDToBasic, DataFrame) else None
+        artistIDToRef = artistIDToBasic["URL"].rename("Ref") if isinstance(artistIDToBasic, DataFrame) else None
+        artistIDToNumAlbums = artistIDToBasic["NumAlbums"].rename("NumAlbums") if isinstance(artistIDToBasic, DataFrame) else None
 
         self.info(f"Name {summaryType}", artistIDToName)
         self.info(f"Ref {summaryType}", artistIDToRef)
 
-        if self.test is True:
-            print("  ==> Only testing. Will not save.")
-        else:
-            artistIDToName.name = "Name"
-            self.rdio.saveData("SummaryName", data=artistIDToName)
-            artistIDToRef.name = "Ref"
-            self.rdio.saveData("SummaryRef", data=artistIDToRef)
-            artistIDToNumAlbums.name = "NumAlbums"
-            self.rdio.saveData("SummaryNumAlbums", data=artistIDToNumAlbums)
-        
+        summaryData = {"SummaryName": artistIDToName, "SummaryRef": artistIDToRef, "SummaryNumAlbums": artistIDToNumAlbums}
+        self.saveSummaryData(summaryType, summaryData)
         ts.stop()
 
     ###########################################################################
@@ -100,34 +296,24 @@ class SummaryProducerIO(SummaryProducerBase):
     ###########################################################################
     def makeMediaSummaryData(self, **kwargs):
         summaryType = "Media"
-        metaType = f"Meta{summaryType}"
         ts = Timestat(f"Making {self.db} {summaryType} Summary Data", verbose=self.verbose)
                 
-        artistIDToMedia = None
-        artistIDToCounts = None
-        for n, modVal in enumerate(self.modVals):
-            if self.isUpdateModVal(n) is True:
-                ts.update(n=n + 1, N=len(self.modVals))
-            modValMetaData = self.rdio.getData(metaType, modVal) if self.rdio.getFilename(metaType, modVal).exists() else None
-            if isinstance(modValMetaData, DataFrame):
-                modValMetaData = modValMetaData.map(lambda x: getFlatList(x.values()) if isinstance(x, dict) else None)
-                artistIDToMedia = concat([artistIDToMedia, modValMetaData]) if artistIDToMedia is not None else modValMetaData
-            
-        artistIDToCounts = artistIDToMedia.map(lambda x: len(x) if isinstance(x, list) else 0)
-        artistIDToCounts = artistIDToCounts.fillna(0).astype(int)
+        artistIDToMediaData = self.getSummaryData(summaryType, ts, flattenMediaMetaData)
+        artistIDToMedia, artistIDToCounts = None, None
+        if isinstance(artistIDToMediaData, DataFrame):
+            artistIDToMedia = artistIDToMediaData["Media"]
+            artistIDToCounts = artistIDToMediaData["Counts"].fillna(0).astype(int)
+        del artistIDToMediaData
         
         self.info(f"Counts {summaryType}", artistIDToCounts)
-                
-        if self.test is True:
-            print("  ==> Only testing. Will not save.")
-        else:
-            artistIDToCounts.name = "Counts"
-            self.rdio.saveData("SummaryCounts", data=artistIDToCounts)
-            for rankedMediaType, rankedMediaTypeData in artistIDToMedia.items():
-                if len(rankedMediaTypeData) > 0 and rankedMediaTypeData.count() > 0:
-                    rankedMediaTypeData.name = rankedMediaType
-                    self.rdio.saveData(f"Summary{rankedMediaType}Media", data=rankedMediaTypeData)
         
+        summaryData = {"SummaryCounts": artistIDToCounts}
+        rankedMediaData = artistIDToMedia.items() if isinstance(artistIDToMedia, DataFrame) else []
+        for rankedMediaType, rankedMediaTypeData in rankedMediaData:
+            rankedMediaTypeData.name = rankedMediaType
+            summaryData[f"Summary{rankedMediaType}Media"] = rankedMediaTypeData
+        optional = [summaryKey for summaryKey in summaryData.keys() if summaryKey != "SummaryCounts"]
+        self.saveSummaryData(summaryType, summaryData, optional=optional)
         ts.stop()
 
     ###########################################################################
@@ -135,27 +321,12 @@ class SummaryProducerIO(SummaryProducerBase):
     ###########################################################################
     def makeGenreSummaryData(self, **kwargs):
         summaryType = "Genre"
-        metaType = f"Meta{summaryType}"
         ts = Timestat(f"Making {self.db} {summaryType} Summary Data", verbose=self.verbose)
         
-        artistIDToGenre = None
-        for n, modVal in enumerate(self.modVals):
-            if self.isUpdateModVal(n) is True:
-                ts.update(n=n + 1, N=len(self.modVals))
-
-            modValMetaData = self.rdio.getData(metaType, modVal) if self.rdio.getFilename(metaType, modVal).exists() else None
-            if isinstance(modValMetaData, DataFrame):
-                artistIDToGenre = concat([artistIDToGenre, modValMetaData]) if artistIDToGenre is not None else modValMetaData
-
+        artistIDToGenre = self.getSummaryData(summaryType, ts)
         self.info(summaryType, artistIDToGenre)
             
-        if self.test is True:
-            print("  ==> Only testing. Will not save.")
-        else:
-            if isinstance(artistIDToGenre, DataFrame):
-                artistIDToGenre.name = "Genre"
-                self.rdio.saveData(f"Summary{summaryType}", data=artistIDToGenre)
-        
+        self.saveSummaryData(summaryType, {f"Summary{summaryType}": artistIDToGenre})
         ts.stop()
 
     ###########################################################################
@@ -163,26 +334,12 @@ class SummaryProducerIO(SummaryProducerBase):
     ###########################################################################
     def makeLinkSummaryData(self, **kwargs):
         summaryType = "Link"
-        metaType = f"Meta{summaryType}"
         ts = Timestat(f"Making {self.db} {summaryType} Summary Data", verbose=self.verbose)
         
-        artistIDToLink = None
-        for n, modVal in enumerate(self.modVals):
-            if self.isUpdateModVal(n) is True:
-                ts.update(n=n + 1, N=len(self.modVals))
-
-            modValMetaData = self.rdio.getData(metaType, modVal) if self.rdio.getFilename(metaType, modVal).exists() else None
-            if isinstance(modValMetaData, DataFrame):
-                artistIDToLink = concat([artistIDToLink, modValMetaData]) if artistIDToLink is not None else modValMetaData
-
+        artistIDToLink = self.getSummaryData(summaryType, ts)
         self.info(summaryType, artistIDToLink)
             
-        if self.test is True:
-            print("  ==> Only testing. Will not save.")
-        else:
-            if isinstance(artistIDToLink, DataFrame):
-                self.rdio.saveData(f"Summary{summaryType}", data=artistIDToLink)
-        
+        self.saveSummaryData(summaryType, {f"Summary{summaryType}": artistIDToLink})
         ts.stop()
 
     ###########################################################################
@@ -190,52 +347,25 @@ class SummaryProducerIO(SummaryProducerBase):
     ###########################################################################
     def makeBioSummaryData(self, **kwargs):
         summaryType = "Bio"
-        metaType = f"Meta{summaryType}"
         ts = Timestat(f"Making {self.db} {summaryType} Summary Data", verbose=self.verbose)
         
-        artistIDToBio = None
-        for n, modVal in enumerate(self.modVals):
-            if self.isUpdateModVal(n) is True:
-                ts.update(n=n + 1, N=len(self.modVals))
-            modValMetaData = self.rdio.getData(metaType, modVal) if self.rdio.getFilename(metaType, modVal).exists() else None
-            if isinstance(modValMetaData, DataFrame):
-                artistIDToBio = concat([artistIDToBio, modValMetaData]) if artistIDToBio is not None else modValMetaData
-
+        artistIDToBio = self.getSummaryData(summaryType, ts)
         self.info(summaryType, artistIDToBio)
             
-        if self.test is True:
-            print("  ==> Only testing. Will not save.")
-        else:
-            if isinstance(artistIDToBio, DataFrame):
-                self.rdio.saveData(f"Summary{summaryType}", data=artistIDToBio)
-        
+        self.saveSummaryData(summaryType, {f"Summary{summaryType}": artistIDToBio})
         ts.stop()
-        
+
     ###########################################################################
     # Artist ID => Dates
     ###########################################################################
     def makeDatesSummaryData(self, **kwargs):
-        return
         summaryType = "Dates"
-        metaType = f"Meta{summaryType}"
         ts = Timestat(f"Making {self.db} {summaryType} Summary Data", verbose=self.verbose)
         
-        artistIDToDates = None
-        for n, modVal in enumerate(self.modVals):
-            if self.isUpdateModVal(n) is True:
-                ts.update(n=n + 1, N=len(self.modVals))
-            modValMetaData = self.rdio.getData(metaType, modVal) if self.rdio.getFilename(metaType, modVal).exists() else None
-            if isinstance(modValMetaData, DataFrame):
-                artistIDToDates = concat([artistIDToDates, modValMetaData]) if artistIDToDates is not None else modValMetaData
-
+        artistIDToDates = self.getSummaryData(summaryType, ts)
         self.info(summaryType, artistIDToDates)
             
-        if self.test is True:
-            print("  ==> Only testing. Will not save.")
-        else:
-            if isinstance(artistIDToDates, DataFrame):
-                self.rdio.saveData(f"Summary{summaryType}", data=artistIDToDates)
-        
+        self.saveSummaryData(summaryType, {f"Summary{summaryType}": artistIDToDates})
         ts.stop()
 
     ###########################################################################
@@ -243,24 +373,10 @@ class SummaryProducerIO(SummaryProducerBase):
     ###########################################################################
     def makeMetricSummaryData(self, **kwargs):
         summaryType = "Metric"
-        metaType = f"Meta{summaryType}"
         ts = Timestat(f"Making {self.db} {summaryType} Summary Data", verbose=self.verbose)
         
-        artistIDToMetric = None
-        for n, modVal in enumerate(self.modVals):
-            if self.isUpdateModVal(n) is True:
-                ts.update(n=n + 1, N=len(self.modVals))
-            modValMetaData = self.rdio.getData(metaType, modVal) if self.rdio.getFilename(metaType, modVal).exists() else None
-            if isinstance(modValMetaData, DataFrame):
-                artistIDToMetric = concat([artistIDToMetric, modValMetaData]) if artistIDToMetric is not None else modValMetaData
-
+        artistIDToMetric = self.getSummaryData(summaryType, ts)
         self.info(summaryType, artistIDToMetric)
             
-        if self.test is True:
-            print("  ==> Only testing. Will not save.")
-        else:
-            if isinstance(artistIDToMetric, DataFrame):
-                self.rdio.saveData(f"Summary{summaryType}", data=artistIDToMetric)
-        
+        self.saveSummaryData(summaryType, {f"Summary{summaryType}": artistIDToMetric})
         ts.stop()
-        
\ No newline at end of file
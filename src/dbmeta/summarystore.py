@@ -0,0 +1,203 @@
+""" ModVal Partitioned Columnar (Parquet) Summary Store """
+
+__all__ = ["SummaryPartitionIO"]
+
+from dbbase import MusicDBRootDataIO
+from pandas import Series, DataFrame, Index, concat, read_parquet
+from pandas.api.types import is_numeric_dtype, infer_dtype
+from shutil import rmtree
+from .fileutils import getSidecarPath
+from .compact import getCompactLists, isArrowList, expandSummaryData, requireArrow
+import numpy as np
+import warnings
+import pickle
+try:
+    import pyarrow as pa
+except ImportError:
+    pa = None
+
+
+###############################################################################
+# Summary{Key} => {root}/Summary{Key}/part-{modVal}.parquet (+ column stats)
+###############################################################################
+class SummaryPartitionIO:
+    def __repr__(self):
+        return f"SummaryPartitionIO(db={self.rdio.db}, root={self.root})"
+
+    def __init__(self, rdio: MusicDBRootDataIO, **kwargs):
+        self.verbose = kwargs.get('verbose', False)
+        requireArrow("partitioned summary data")
+        self.rdio = rdio
+        self.root = getSidecarPath(rdio, "SummaryName", "SummaryPartitions")
+        self.stats = {}
+
+    ###########################################################################
+    # Layout & Stats
+    ###########################################################################
+    def getDir(self, summaryKey: str):
+        return self.root / summaryKey
+
+    def getPartitionFilename(self, summaryKey: str, modVal):
+        return self.getDir(summaryKey) / f"part-{modVal}.parquet"
+
+    def exists(self, summaryKey: str) -> 'bool':
+        return (self.getDir(summaryKey) / "_stats.p").exists()
+
+    def getStats(self, summaryKey: str) -> 'dict':
+        if self.stats.get(summaryKey) is None:
+            statsFile = self.getDir(summaryKey) / "_stats.p"
+            assert statsFile.exists(), f"There is no partitioned {summaryKey} data in {self.root}"
+            with open(statsFile, "rb") as f:
+                self.stats[summaryKey] = pickle.load(f)
+        return self.stats[summaryKey]
+
+    def saveStats(self, summaryKey: str, stats: dict) -> 'None':
+        with open(self.getDir(summaryKey) / "_stats.p", "wb") as f:
+            pickle.dump(stats, f, protocol=pickle.HIGHEST_PROTOCOL)
+        self.stats[summaryKey] = stats
+
+    def getColumnStats(self, data: DataFrame) -> 'dict':
+        retval = {}
+        for column, values in data.items():
+            nulls = int(values.isna().sum())
+            values = values.dropna()
+            if len(values) == 0:
+                retval[column] = (None, None, nulls)
+            elif is_numeric_dtype(values) or infer_dtype(values, skipna=True) == "string":
+                retval[column] = (values.min(), values.max(), nulls)
+            else:
+                retval[column] = (None, None, nulls)
+        return retval
+
+    def getListColumns(self, data: DataFrame) -> 'list':
+        # Parquet hands lists back as numpy arrays so they are converted again on read
+        retval = []
+        for column, values in data.items():
+            values = values.dropna()
+            if len(values) > 0 and isinstance(values.iloc[0], list):
+                retval.append(column)
+        return retval
+
+    def getArrowListColumns(self, data: DataFrame) -> 'list':
+        # Compact list<string> columns are written as plain lists and restored on read
+        retval = [column for column, values in data.items() if isArrowList(values)]
+        return retval
+
+    ###########################################################################
+    # Write
+    ###########################################################################
+    def getPartitionRows(self, index: Index, shardIndex: dict, modVals: list) -> 'dict':
+        # modVal => row positions, from one lookup of every row's modVal instead of one isin() per modVal
+        shards = [(n, shardIndex[modVal]) for n, modVal in enumerate(modVals) if shardIndex.get(modVal) is not None]
+        if len(shards) == 0:
+            return {}
+        ids = shards[0][1].append([shardIDs for _, shardIDs in shards[1:]])
+        owners = Series(np.repeat([n for n, _ in shards], [len(shardIDs) for _, shardIDs in shards]), index=ids, dtype=np.int64)
+        owners = owners[~owners.index.duplicated()]
+        codes = owners.reindex(index).fillna(-1).to_numpy(dtype=np.int64)
+        order = np.argsort(codes, kind="stable")
+        cuts = np.concatenate([[0], np.cumsum(np.bincount(codes + 1, minlength=len(modVals) + 1))])
+        retval = {modVals[n]: order[cuts[n + 1]:cuts[n + 2]] for n, _ in shards}
+        return retval
+    
+    def save(self, summaryKey: str, data, shardIndex: dict, modVals: list, replace=True) -> 'bool':
+        assert isinstance(data, (DataFrame, Series)), f"data [{type(data)}] is not a DataFrame/Series"
+        isSeries = isinstance(data, Series)
+        frame = data.to_frame(name=data.name if data.name is not None else summaryKey) if isSeries else data
+        frame = frame.rename(columns=str)
+        arrowLists = self.getArrowListColumns(frame)
+        frame = expandSummaryData(frame)
+
+        partDir = self.getDir(summaryKey)
+        if replace is True or not self.exists(summaryKey):
+            rmtree(partDir, ignore_errors=True)
+            stats = {"series": isSeries, "columns": list(frame.columns), "lists": self.getListColumns(frame), "arrowLists": arrowLists, "partitions": {}}
+        else:
+            stats = self.getStats(summaryKey)
+        partDir.mkdir(parents=True, exist_ok=True)
+
+        partRows = self.getPartitionRows(frame.index, shardIndex, modVals)
+        try:
+            for modVal in modVals:
+                partFile = self.getPartitionFilename(summaryKey, modVal)
+                ids = shardIndex.get(modVal)
+                if ids is None:
+                    partFile.unlink(missing_ok=True)
+                    stats["partitions"].pop(modVal, None)
+                    continue
+                partData = frame.take(partRows[modVal])
+                partData.to_parquet(partFile, engine="pyarrow", index=True)
+                stats["partitions"][modVal] = {"rows": partData.shape[0], "columns": self.getColumnStats(partData)}
+        except (pa.ArrowInvalid, pa.ArrowTypeError, pa.ArrowNotImplementedError) as error:
+            warnings.warn(f"Could not write partitioned {summaryKey} data: {error}")
+            rmtree(partDir, ignore_errors=True)
+            self.stats.pop(summaryKey, None)
+            return False
+
+        self.saveStats(summaryKey, stats)
+        return True
+
+    ###########################################################################
+    # Read (Partition Pruning + Column Pruning + Predicate Pushdown)
+    ###########################################################################
+    def isPrunable(self, partStats: dict, filters: list) -> 'bool':
+        if partStats["rows"] == 0:
+            return True
+        for column, op, value in filters:
+            mn, mx, _ = partStats["columns"].get(column, (None, None, None))
+            if mn is None or mx is None:
+                continue
+            if op == ">=" and mx < value:
+                return True
+            if op == ">" and mx <= value:
+                return True
+            if op == "<=" and mn > value:
+                return True
+            if op == "<" and mn >= value:
+                return True
+            if op in ["==", "="] and (value < mn or value > mx):
+                return True
+            if op == "in" and all([(v < mn or v > mx) for v in value]):
+                return True
+            if op == "!=" and mn == mx == value:
+                return True
+        return False
+
+    def getPartitions(self, summaryKey: str, filters=None, modVals=None) -> 'list':
+        filters = [] if filters is None else filters
+        partitions = self.getStats(summaryKey)["partitions"]
+        modVals = partitions.keys() if modVals is None else [modVal for modVal in modVals if modVal in partitions]
+        retval = [modVal for modVal in sorted(modVals) if not self.isPrunable(partitions[modVal], filters)]
+        return retval
+
+    def iterPartitions(self, summaryKey: str, columns=None, filters=None, modVals=None):
+        stats = self.getStats(summaryKey)
+        columns = stats["columns"] if columns is None else columns
+        for modVal in self.getPartitions(summaryKey, filters, modVals):
+            partFile = self.getPartitionFilename(summaryKey, modVal)
+            partData = read_parquet(partFile, engine="pyarrow", columns=columns, filters=filters if filters else None)
+            for column in [column for column in stats.get("lists", []) if column in columns]:
+                partData[column] = partData[column].map(list, na_action="ignore")
+                if column in stats.get("arrowLists", []):
+                    partData[column] = getCompactLists(partData[column])
+            yield modVal, (partData[columns[0]] if stats["series"] is True and len(columns) == 1 else partData)
+
+    def getEmptyData(self, summaryKey: str, columns=None):
+        stats = self.getStats(summaryKey)
+        columns = stats["columns"] if columns is None else columns
+        retval = DataFrame(columns=columns, index=Index([], dtype=object))
+        retval = retval[columns[0]] if stats["series"] is True and len(columns) == 1 else retval
+        return retval
+
+    def read(self, summaryKey: str, columns=None, filters=None, modVals=None):
+        # Empty (not None) when every partition is pruned so callers can still align on the index
+        partData = [data for _, data in self.iterPartitions(summaryKey, columns, filters, modVals)]
+        if len(partData) == 0:
+            return self.getEmptyData(summaryKey, columns)
+        retval = concat(partData) if len(partData) > 1 else partData[0]
+        return retval
+
+    def readIndex(self, summaryKey: str, filters=None, modVals=None) -> 'Index':
+        ids = [data.index for _, data in self.iterPartitions(summaryKey, columns=[], filters=filters, modVals=modVals)]
+        retval = ids[0].append(ids[1:]) if len(ids) > 0 else Index([])
+        return retval
@@ -2,10 +2,10 @@
 
 __all__ = ["UniversalMetaProducer"]
 
-from utils import getFlatList
-from pandas import DataFrame, Series
-from statistics import median
+from pandas import DataFrame, Series, to_numeric
+from itertools import chain
 from .prodbase import MetaProducerUtilBase
+import numpy as np
 
 
 class UniversalMetaProducer:
@@ -17,41 +17,74 @@ class UniversalMetaProducer:
     ###############################################################################################################
     def getBasicMetaData(self, modValData: Series) -> 'Series':
         assert isinstance(modValData, Series), "modValData is not a Series"
-        artistNames = modValData.apply(lambda rData: rData.artist.name)
-        artistNames.name = "ArtistName"
-        artistURLs = modValData.apply(lambda rData: rData.url.url)
-        artistURLs.name = "URL"
-        artistNumAlbums = modValData.apply(lambda rData: sum(rData.mediaCounts.counts.values()))
-        artistNumAlbums.name = "NumAlbums"
-
-        metaData = DataFrame([artistNames, artistURLs, artistNumAlbums]).T
+        # One pass over the raw objects into preallocated typed columns
+        artistNames = np.empty(len(modValData), dtype=object)
+        artistURLs = np.empty(len(modValData), dtype=object)
+        artistNumAlbums = np.empty(len(modValData), dtype=np.int32)
+        for i, rData in enumerate(modValData.to_numpy(dtype=object)):
+            artistNames[i] = rData.artist.name
+            artistURLs[i] = rData.url.url
+            artistNumAlbums[i] = sum(rData.mediaCounts.counts.values())
+
+        metaData = DataFrame({"ArtistName": artistNames, "URL": artistURLs, "NumAlbums": artistNumAlbums}, index=modValData.index)
         return metaData
 
     ###############################################################################################################
     # Date MetaData
     ###############################################################################################################
-    def getDatesMetaData(self, modValData: Series) -> 'Series':
+    def getYear(self, value) -> 'float':
+        try:
+            return int(value)
+        except Exception:
+            return np.nan
+
+    def getYears(self, values: np.ndarray) -> 'np.ndarray':
+        # Bulk int(year): one type pass splits strings (plain integer strings parsed with one str.extract)
+        # from everything else (one to_numeric, finite values truncated). The rare leftovers to_numeric
+        # cannot read (bytes, ...) go through int() itself. Unparsable years are NaN.
+        values = Series(values, dtype=object)
+        isStr = (values.map(type) == str).to_numpy(dtype=bool)
+        retval = to_numeric(values.mask(isStr), errors="coerce").to_numpy(dtype=np.float64)
+        retval = np.where(np.isfinite(retval), np.trunc(retval), np.nan)
+        if isStr.any():
+            retval[isStr] = to_numeric(values[isStr].str.extract(r"^\s*([+-]?[0-9]+)\s*$", expand=False), errors="coerce").to_numpy(dtype=np.float64)
+        isOther = np.isnan(retval) & ~isStr & values.notna().to_numpy(dtype=bool)
+        if isOther.any():
+            retval[isOther] = np.fromiter((self.getYear(value) for value in values[isOther]), dtype=np.float64, count=int(isOther.sum()))
+        return retval
+
+    def getDatesMetaData(self, modValData: Series) -> 'DataFrame':
         assert isinstance(modValData, Series), "modValData is not a Series"
         
-        def getMediaDateStats(mediaDates):
-            mediaTypeDates = {}
-            for mediaType, mediaTypeYears in mediaDates.items():
-                mediaTypeYearsData = []
-                for year in mediaTypeYears:
-                    try:
-                        yearValue = int(year)
-                    except Exception as error:
-                        continue
-                    mediaTypeYearsData.append(yearValue)
-
-                if len(mediaTypeYearsData) > 0:
-                    mediaTypeDates[mediaType] = mediaTypeYearsData
-            mediaTypeDates = getFlatList(mediaTypeDates.values())
-            mediaDatesStats = (min(mediaTypeDates), max(mediaTypeDates), int(median(mediaTypeDates))) if len(mediaTypeDates) > 0 else (None, None, None)
-            return mediaDatesStats
-
-        artistMediaDates = modValData.apply(self.utils.getMediaDates).apply(getMediaDateStats)
+        # All years of the shard in one flat array with per artist counts
+        artistMediaDates = [self.utils.getMediaDates(rData).values() for rData in modValData.to_numpy(dtype=object)]
+        counts = np.fromiter((sum(map(len, mediaDates)) for mediaDates in artistMediaDates), dtype=np.int64, count=len(artistMediaDates))
+        years = self.getYears(np.fromiter(chain.from_iterable(chain.from_iterable(artistMediaDates)), dtype=object, count=int(counts.sum())))
+        artists = np.repeat(np.arange(len(artistMediaDates)), counts)
+        del artistMediaDates
         
-        metaData = artistMediaDates.apply(Series)
-        metaData.columns = ["MinYear", "MaxYear", "MedianYear"]
-        return metaData
\ No newline at end of file
+        # Segmented min/max/median over years sorted within each artist
+        valid = ~np.isnan(years)
+        years, artists = years[valid], artists[valid]
+        order = np.lexsort((years, artists))
+        years, artists = years[order], artists[order]
+        numYears = np.bincount(artists, minlength=len(modValData))
+        hasYears = numYears > 0
+        starts = (np.cumsum(numYears) - numYears)[hasYears]
+        num = numYears[hasYears]
+        
+        minYears = np.full(len(modValData), np.nan)
+        maxYears = np.full(len(modValData), np.nan)
+        medianYears = np.full(len(modValData), np.nan)
+        minYears[hasYears] = years[starts]
+        maxYears[hasYears] = years[starts + num - 1]
+        medianYears[hasYears] = np.trunc((years[starts + (num - 1) // 2] + years[starts + num // 2]) / 2)
+        
+        # Same dtypes as the per artist apply: int64 when every artist has years, float64 (NaN) when
+        # some do not and object (None) when none do
+        metaData = DataFrame({"MinYear": minYears, "MaxYear": maxYears, "MedianYear": medianYears}, index=modValData.index)
+        if hasYears.all():
+            metaData = metaData.astype(np.int64)
+        elif not hasYears.any():
+            metaData = DataFrame(None, index=modValData.index, columns=metaData.columns, dtype=object)
+        return metaData
@@ -0,0 +1,55 @@
+from dbmeta import DataCache, CachedDataIO, getDataSize
+from pandas import DataFrame
+from tempfile import TemporaryDirectory
+from tests.tmpdataio import TmpDataIO
+import pickle
+
+
+def test_datacache():
+    data = DataFrame({"NumAlbums": range(100)})
+    size = getDataSize(data)
+    cache = DataCache(maxBytes=2 * size)
+    cache.put(("DB", "SummaryNumAlbums", None), data, (1, 1))
+    cache.put(("DB", "MetaBasic", 0), data, (1, 1))
+    assert cache.get(("DB", "SummaryNumAlbums", None), (1, 1)) == (True, data), f"DataCache [{cache}] did not return a cached entry"
+    assert cache.get(("DB", "SummaryNumAlbums", None), (2, 1))[0] is False, f"DataCache [{cache}] returned an entry whose file changed"
+
+    cache.put(("DB", "SummaryNumAlbums", None), data)
+    cache.put(("DB", "MetaBasic", 1), data)
+    assert cache.get(("DB", "MetaBasic", 0))[0] is False, f"DataCache [{cache}] did not evict the least recently used entry"
+    assert cache.numBytes <= cache.maxBytes, f"DataCache [{cache}] is over its byte budget"
+
+    cache.invalidate(("DB", "MetaBasic", 1))
+    assert cache.get(("DB", "MetaBasic", 1))[0] is False, f"DataCache [{cache}] did not invalidate an entry"
+    cache.put(("DB", "Large", None), DataFrame({"NumAlbums": range(1000)}))
+    assert cache.get(("DB", "Large", None))[0] is False, f"DataCache [{cache}] cached an entry larger than its budget"
+
+    shipped = pickle.loads(pickle.dumps(cache))
+    assert len(shipped.entries) == 0 and shipped.maxBytes == cache.maxBytes, f"DataCache [{shipped}] shipped its entries"
+
+
+
+def test_datacache_copy():
+    small, large = {i: str(i) for i in range(10)}, {i: str(i) for i in range(1000)}
+    assert 0 < getDataSize(small) < getDataSize(large), f"getDataSize did not count the items of a dict"
+
+    with TemporaryDirectory() as tmpDir:
+        cdio = CachedDataIO(TmpDataIO(tmpDir), DataCache())
+        data = DataFrame({"NumAlbums": range(10)})
+        cdio.saveData("SummaryNumAlbums", data=data)
+        key = cdio.getKey("SummaryNumAlbums")
+        assert cdio.dataCache.get(key)[1] is data, f"CachedDataIO [{cdio}] copied the saved data on put"
+        retval = cdio.getData("SummaryNumAlbums")
+        assert retval is not data and retval.equals(data), f"CachedDataIO [{cdio}] did not return a copy"
+        retval["NumAlbums"] = 0
+        assert cdio.getData("SummaryNumAlbums").equals(data), f"CachedDataIO [{cdio}] leaked a change into the cache"
+
+        # A miss caches the read data and returns a copy of it
+        cdio.dataCache.clear()
+        retval = cdio.getData("SummaryNumAlbums")
+        assert retval is not cdio.dataCache.get(key)[1] and retval.equals(data), f"CachedDataIO [{cdio}] returned the cached object on a miss"
+
+
+if __name__ == "__main__":
+    test_datacache()
+    test_datacache_copy()
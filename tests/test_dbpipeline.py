@@ -0,0 +1,102 @@
+from dbbase import getModVals
+from dbmeta import MusicDBPipeline
+from dbmeta import dbpipeline
+from functools import partial
+from tempfile import TemporaryDirectory
+from tests.tmpdataio import TmpDataIO
+
+
+class StageProducer:
+    runs = []
+    fingerprintExclude = ("failedModVals",)
+
+    def __init__(self, rdio, name="Stage", fail=False, minMedia=1, collect=False, **kwargs):
+        self.rdio = rdio
+        self.name = name
+        self.fail = fail
+        self.minMedia = minMedia
+        self.collect = collect
+
+    def make(self, **kwargs):
+        StageProducer.runs.append(self.name)
+        assert self.fail is False, f"{self.name} failed"
+        # Collected (not raised) shard failures, like MetaProducerBase.make(onError="collect")
+        self.failedModVals = {getModVals()[0]: f"{self.name} failed"} if self.collect is True else {}
+
+
+def test_dbpipeline():
+    stages = {"Meta": dict, "Summary": dict, "Match": dict}
+    pipe = MusicDBPipeline(dbs=["A", "B", "C"], stages=stages, workers=4, maxMemory=100)
+    assert pipe.graph[("B", "Meta")] == [], f"MusicDBPipeline [{pipe}] made Meta depend on another stage"
+    assert pipe.graph[("B", "Match")] == [("B", "Summary")], f"MusicDBPipeline [{pipe}] did not chain Summary => Match"
+    assert all([db == upstreamDB for (db, _), upstream in pipe.graph.items() for (upstreamDB, _) in upstream]), f"MusicDBPipeline [{pipe}] linked two DBs"
+    assert (pipe.getConcurrency(), pipe.getStageWorkers()) == (3, 1), f"MusicDBPipeline [{pipe}] did not split the worker budget"
+    assert pipe.isAdmissible(150, 0, 0) is True, f"MusicDBPipeline [{pipe}] did not admit a single large DB"
+    assert pipe.isAdmissible(60, 50, 1) is False, f"MusicDBPipeline [{pipe}] exceeded the memory budget"
+    assert pipe.isAdmissible(40, 50, 1) is True, f"MusicDBPipeline [{pipe}] did not admit a DB that fits"
+    assert pipe.isAdmissible(0, 0, 3) is False, f"MusicDBPipeline [{pipe}] exceeded the concurrency"
+    
+    
+def test_dbpipeline_resume():
+    with TemporaryDirectory() as tmpDir:
+        getDataIO = dbpipeline.MusicDBRootDataIO
+        dbpipeline.MusicDBRootDataIO = partial(TmpDataIO, tmpDir)
+        try:
+            rdio = TmpDataIO(tmpDir, "A")
+            for modVal in getModVals():
+                rdio.saveData("ModValData", modVal, data={})
+            stages = {"Meta": partial(StageProducer, name="Meta"), "Summary": partial(StageProducer, name="Summary", fail=True),
+                      "Match": partial(StageProducer, name="Match")}
+            pipe = MusicDBPipeline(dbs=["A"], stages=stages, workers=1)
+            results = pipe.make()["A"]
+            assert [results[stage]["Status"] for stage in results] == ["Done", "Failed"], f"MusicDBPipeline [{pipe}] did not stop at the failed stage"
+            assert dbpipeline.getPipelineStateFilename(rdio).name == "PipelineState.p" and dbpipeline.loadPipelineState(rdio)["Summary"]["Status"] == "Failed"
+
+            # Resume after the last finished stage
+            StageProducer.runs = []
+            stages["Summary"] = partial(StageProducer, name="Summary")
+            results = MusicDBPipeline(dbs=["A"], stages=stages, workers=1).make()["A"]
+            assert [results[stage]["Status"] for stage in results] == ["Skipped", "Done", "Done"], f"MusicDBPipeline [{pipe}] did not resume"
+            assert StageProducer.runs == ["Summary", "Match"], f"MusicDBPipeline [{pipe}] reran a finished stage"
+            results = MusicDBPipeline(dbs=["A"], stages=stages, workers=1).make()["A"]
+            assert all([result["Status"] == "Skipped" for result in results.values()]), f"MusicDBPipeline [{pipe}] did not skip unchanged stages"
+
+            # Changed producer config reruns that stage and everything after it
+            StageProducer.runs = []
+            stages["Summary"] = partial(StageProducer, name="Summary", minMedia=2)
+            results = MusicDBPipeline(dbs=["A"], stages=stages, workers=1).make()["A"]
+            assert [results[stage]["Status"] for stage in results] == ["Skipped", "Done", "Done"], f"MusicDBPipeline [{pipe}] did not rerun a changed stage"
+        finally:
+            dbpipeline.MusicDBRootDataIO = getDataIO
+
+
+
+def test_dbpipeline_reuse():
+    with TemporaryDirectory() as tmpDir:
+        getDataIO = dbpipeline.MusicDBRootDataIO
+        dbpipeline.MusicDBRootDataIO = partial(TmpDataIO, tmpDir)
+        try:
+            rdio = TmpDataIO(tmpDir, "A")
+            for modVal in getModVals():
+                rdio.saveData("ModValData", modVal, data={})
+
+            # Collected shard failures fail the stage (not an assert, so it also holds under python -O)
+            stages = {"Meta": partial(StageProducer, name="Meta", collect=True)}
+            results = MusicDBPipeline(dbs=["A"], stages=stages, workers=1).make()["A"]
+            assert results["Meta"]["Status"] == "Failed" and "RuntimeError" in results["Meta"]["Error"], f"MusicDBPipeline did not fail a stage with failed ModVals"
+
+            # A reused (warmed) producer instance keeps its fingerprint, so the stage is still skipped
+            producer = StageProducer(rdio, name="Meta")
+            stages = {"Meta": lambda rdio: producer}
+            results = MusicDBPipeline(dbs=["A"], stages=stages, workers=1).make()["A"]
+            assert results["Meta"]["Status"] == "Done", f"MusicDBPipeline did not run the reused producer"
+            results = MusicDBPipeline(dbs=["A"], stages=stages, workers=1).make()["A"]
+            assert results["Meta"]["Status"] == "Skipped", f"MusicDBPipeline reran a reused producer after its run state changed"
+        finally:
+            dbpipeline.MusicDBRootDataIO = getDataIO
+
+
+if __name__ == "__main__":
+    test_dbpipeline()
+    test_dbpipeline_resume()
+    test_dbpipeline_reuse()
@@ -1 +1 @@
-from dbmaster import MasterDBsfrom dbbase import MusicDBRootDataIOfrom dbmeta import MatchProducerIO, MatchOmitBasedef test_match():    dbs = MasterDBs().getDBs()    rdio = MusicDBRootDataIO(dbs[0])    momit = MatchOmitBase()    matchprodio = MatchProducerIO(rdio, momit)    assert hasattr(matchprodio, 'make'), f"MatchProducerIO [{matchprodio}] does not have a make function"    if __name__ == "__main__":    test_match()    
\ No newline at end of file
+from dbmaster import MasterDBsfrom dbbase import MusicDBRootDataIOfrom dbmeta import MatchProducerIO, MatchOmitBase, getSidecarPathfrom pandas import Seriesfrom tempfile import TemporaryDirectoryfrom tests.tmpdataio import TmpDataIOimport pickledef test_match():    dbs = MasterDBs().getDBs()    rdio = MusicDBRootDataIO(dbs[0])    momit = MatchOmitBase()    matchprodio = MatchProducerIO(rdio, momit)    assert hasattr(matchprodio, 'make'), f"MatchProducerIO [{matchprodio}] does not have a make function"    def saveSummaryData(rdio, names: dict, numAlbums=1):    rdio.saveData("SummaryName", data=Series(names, name="Name"))    rdio.saveData("SummaryNumAlbums", data=Series(numAlbums, index=list(names.keys()), name="NumAlbums"))    def test_match_incremental():    with TemporaryDirectory() as tmpDir:        rdio = TmpDataIO(tmpDir)        names = {"a": "The Band", "b": "Artist", "c": "Other Artist", "d": "Singer"}        saveSummaryData(rdio, names)        MatchProducerIO(rdio, MatchOmitBase(), incremental=True).make(verbose=False)                # One changed, one removed and one added artist        names = {"a": "The Band", "b": "New Artist", "d": "Singer", "e": "Added Artist"}        saveSummaryData(rdio, names)        matchprodio = MatchProducerIO(rdio, MatchOmitBase(), incremental=True)        matchprodio.make(verbose=False)        with open(getSidecarPath(rdio, "MatchName", "MatchChangeLog.p"), "rb") as f:            changeLog = pickle.load(f)["Name"]        assert {change: list(ids) for change, ids in changeLog.items()} == {"Added": ["e"], "Changed": ["b"], "Removed": ["c"]}, f"MatchProducerIO [{matchprodio}] change log is {changeLog}"        incrementalData = rdio.getData("MatchName").sort_index()        MatchProducerIO(rdio, MatchOmitBase()).make(verbose=False)        assert incrementalData.equals(rdio.getData("MatchName").sort_index()), f"MatchProducerIO [{matchprodio}] delta does not match a full rebuild"                # Nothing matchable => the previous match data is replaced        saveSummaryData(rdio, names, numAlbums=0)        MatchProducerIO(rdio, MatchOmitBase(), incremental=True).make(verbose=False)        assert len(rdio.getData("MatchName")) == 0, f"MatchProducerIO [{matchprodio}] kept stale match data"    def test_match_matchable():    with TemporaryDirectory() as tmpDir:        momit = MatchOmitBase()        momit.setOmitData({"c": True, "d": False})        matchprodio = MatchProducerIO(TmpDataIO(tmpDir), momit)        artistNameData = Series({"a": "The Band", "b": "", "c": "Omitted", "d": "Kept", "e": float("nan"), "f": None, "g": 7, "h": "Few"})        artistCountsData = Series({"a": 2, "b": 2, "c": 2, "d": 1, "e": 2, "f": 2, "g": 2, "h": float("nan")})                # Original apply based mask (+ omitted IDs dropped afterwards with isValid)        countsReq = artistCountsData >= matchprodio.minMedia        nameReq = artistNameData.apply(lambda value: (isinstance(value, str) and len(value) > 0))        expected = (countsReq & nameReq) & artistNameData.index.map(momit.isValid).to_numpy(dtype=bool)        for nameData in [artistNameData, artistNameData.where(artistNameData.map(lambda value: isinstance(value, str))).astype("category")]:            matchableResults = matchprodio.getMatchableResults(nameData, artistCountsData)            assert matchableResults.equals(expected), f"MatchProducerIO [{matchprodio}] matchable mask {matchableResults.to_dict()} is not {expected.to_dict()}"        if __name__ == "__main__":    test_match()    test_match_incremental()    test_match_matchable()    
\ No newline at end of file
@@ -0,0 +1,50 @@
+from dbmeta import MatchNameIndex
+from pandas import Series
+from tempfile import TemporaryDirectory
+from pathlib import Path
+
+
+def test_matchindex():
+    names = Series(["the beatles", "beatles tribute", "rolling stones", "stone roses", None], index=["a", "b", "c", "d", "e"])
+    mni = MatchNameIndex().build(names)
+    result = mni.query("the beatles", k=2)
+    assert list(result.index) == ["a", "b"], f"MatchNameIndex [{mni}] did not rank the exact name first"
+    assert "e" not in mni.ids, f"MatchNameIndex [{mni}] indexed a missing name"
+
+    with TemporaryDirectory() as tmpDir:
+        mni.save(Path(tmpDir) / "MatchNameIndex.npz")
+        loaded = MatchNameIndex().load(Path(tmpDir) / "MatchNameIndex.npz")
+    assert loaded.query("rolling stones", k=1).index[0] == "c", f"MatchNameIndex [{loaded}] did not load"
+    assert len(mni.query("zzzz")) == 0, f"MatchNameIndex [{mni}] returned candidates without shared terms"
+
+
+
+def test_matchindex_budget():
+    names = Series(["unique alpha", "alpha", "alpha beta"], index=["a", "b", "c"])
+    mni = MatchNameIndex(maxFrequency=1.0).build(names)
+    assert set(mni.query("unique alpha").index) == {"a", "b", "c"}, f"MatchNameIndex [{mni}] did not score every shared term"
+    # A zero budget still scores the rarest term (only found in "a")
+    result = mni.query("unique alpha", budget=0)
+    assert list(result.index) == ["a"], f"MatchNameIndex [{mni}] did not score the rarest term within the budget"
+
+    raised = False
+    try:
+        mni.query("unique alpha", k=-1)
+    except AssertionError:
+        raised = True
+    assert raised, f"MatchNameIndex [{mni}] accepted a negative k"
+
+
+def test_matchindex_common():
+    names = Series(["aa", "aa", "aa bb"], index=["a", "b", "c"])
+    mni = MatchNameIndex(maxFrequency=0.5).build(names)
+    # Only common terms match => they are used anyway
+    assert set(mni.query("aa").index) == {"a", "b", "c"}, f"MatchNameIndex [{mni}] did not fall back to common terms"
+    # A rarer term matches => common terms are dropped
+    assert list(mni.query("aa bb").index) == ["c"], f"MatchNameIndex [{mni}] scored common terms next to rarer ones"
+
+
+if __name__ == "__main__":
+    test_matchindex()
+    test_matchindex_budget()
+    test_matchindex_common()
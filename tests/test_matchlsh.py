@@ -0,0 +1,44 @@
+from dbmeta import MatchMediaLSH
+from pandas import Series
+import numpy as np
+
+
+def test_matchlsh():
+    lsh = MatchMediaLSH(numPerm=64, bands=32)
+    left = Series([["a", "b", "c", "d"], ["x", "y"], None], index=["l1", "l2", "l3"])
+    right = Series([["a", "b", "c", "d"], ["p", "q", "r"]], index=["r1", "r2"])
+    leftSigs, rightSigs = lsh.getSignatures(left), lsh.getSignatures(right)
+    assert leftSigs.shape == (3, 64), f"MatchMediaLSH [{lsh}] did not create one signature per artist"
+    candidates = lsh.getCandidates((left.index, leftSigs), (right.index, rightSigs), threshold=0.5)
+    assert list(zip(candidates["LeftID"], candidates["RightID"])) == [("l1", "r1")], f"MatchMediaLSH [{lsh}] did not find the shared media set"
+    assert candidates["Jaccard"].iloc[0] == 1.0, f"MatchMediaLSH [{lsh}] did not estimate identical sets as Jaccard=1"
+
+
+
+def test_matchlsh_jaccard():
+    lsh = MatchMediaLSH(numPerm=256, bands=64, seed=3)
+    left = Series([[f"m{i}" for i in range(0, 60)], ["x"]], index=["l1", "l2"])
+    right = Series([[f"m{i}" for i in range(20, 100)]], index=["r1"])
+    exact = len(set(left["l1"]) & set(right["r1"])) / len(set(left["l1"]) | set(right["r1"]))
+    leftSigs = lsh.getSignatures(left)
+    estimate = (leftSigs[0] == lsh.getSignatures(right)[0]).mean()
+    assert abs(estimate - exact) < 0.1, f"MatchMediaLSH [{lsh}] estimated Jaccard [{estimate}] is not close to [{exact}]"
+
+    # Element slicing (one artist per slice here) gives the same signatures as one block
+    sliced = MatchMediaLSH(numPerm=256, bands=64, seed=3, maxElements=10).getSignatures(left)
+    assert np.array_equal(sliced, leftSigs), f"MatchMediaLSH [{lsh}] signatures depend on maxElements"
+
+
+def test_matchlsh_empty():
+    lsh = MatchMediaLSH(numPerm=64, bands=32)
+    for media in [Series([], dtype=object), Series([None, None], index=["l1", "l2"])]:
+        signatures = lsh.getSignatures(media)
+        assert signatures.shape == (len(media), 64), f"MatchMediaLSH [{lsh}] did not create one signature per artist"
+        candidates = lsh.getCandidates((media.index, signatures), (media.index, signatures))
+        assert len(candidates) == 0, f"MatchMediaLSH [{lsh}] found candidates for empty media sets"
+
+
+if __name__ == "__main__":
+    test_matchlsh()
+    test_matchlsh_jaccard()
+    test_matchlsh_empty()
@@ -0,0 +1,88 @@
+from dbmeta import MediaJoinEngine, MediaSummaryFileIO
+from pandas import DataFrame, concat, merge, unique
+from pandas.testing import assert_frame_equal
+import numpy as np
+import tracemalloc
+
+
+def test_mediajoin():
+    artistMedia = DataFrame({"dbid": ["b", "a", "c", np.nan], "artids": ["1", "2", np.nan, "4"], "Year": [2001.0, np.nan, 2003.0, 2004.0]})
+    media = DataFrame({"dbid": ["a", "b", "d", np.nan], "artids": ["2", "5", "6", "4"], "Year": [1999.0, 1998.0, np.nan, 1997.0]})
+
+    joinData, dupls = MediaJoinEngine(method="hash", numPartitions=3).join(artistMedia, media)
+    assert dupls == ["Year"], f"MediaJoinEngine did not find the shared columns: {dupls}"
+    assert list(joinData["dbid"].fillna("-")) == ["a", "b", "b", "d", "-"], f"MediaJoinEngine did not keep the merge order: {joinData}"
+    assert list(joinData["artids"]) == ["2", "1", "5", "6", "4"], f"MediaJoinEngine did not expand the artist IDs: {joinData}"
+    assert list(joinData["Year"].fillna(0)) == [1999.0, 2001.0, 2001.0, 0.0, 2004.0], f"MediaJoinEngine did not coalesce Year: {joinData}"
+
+    spillData, _ = MediaJoinEngine(method="hash", numPartitions=2, spill=True).join(artistMedia, media)
+    assert_frame_equal(spillData, joinData)
+
+    sortedArtistMedia, sortedMedia = artistMedia.dropna(subset=["dbid"]).sort_values("dbid"), media.dropna(subset=["dbid"]).sort_values("dbid")
+    engine = MediaJoinEngine(blockSize=1)
+    assert engine.getMethod(sortedArtistMedia, sortedMedia) == "merge", f"MediaJoinEngine [{engine}] did not use the merge join on sorted data"
+    mergeData, _ = engine.join(sortedArtistMedia, sortedMedia)
+    streamData = concat([block for block, _ in engine.iterJoin(sortedArtistMedia, sortedMedia)])
+    assert_frame_equal(streamData, mergeData)
+    assert_frame_equal(mergeData, joinData.iloc[:-1])
+
+
+def getMergeJoinData(artistMedia, media):
+    # Single outer merge of the original joinMediaData
+    mergeData = merge(artistMedia, media, how='outer', on='dbid')
+    mergeData["artids"] = mergeData[["artids_x", "artids_y"]].apply(unique, axis=1)
+    dupls = [col[:-2] for col in mergeData.columns if (col.endswith("_x") and not col.startswith("artids"))]
+    for col in dupls:
+        mergeData[col] = mergeData[f"{col}_x"]
+        mergeData.loc[mergeData[col].isna(), col] = mergeData.loc[mergeData[col].isna(), f"{col}_y"]
+    mergeData = mergeData.drop([f"{col}{suffix}" for col in ["artids"] + dupls for suffix in ["_x", "_y"]], axis=1).explode('artids')
+    return mergeData[mergeData["artids"].notna()]
+
+
+def getPeakMemory(func):
+    tracemalloc.start()
+    try:
+        func()
+        retval = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return retval
+
+
+def test_mediajoin_memory():
+    rng = np.random.default_rng(0)
+    num = 1000
+    artistMedia = DataFrame({"dbid": [f"d{i}" for i in rng.integers(0, num, num)], "artids": [f"a{i}" for i in range(num)],
+                             "Year": rng.integers(1950, 2020, num).astype(float), "Genre": [f"genre {i % 50}" for i in range(num)]})
+    media = DataFrame({"dbid": [f"d{i}" for i in rng.integers(0, num, num)], "artids": [f"a{i}" for i in rng.integers(0, num, num)],
+                       "Year": rng.integers(1950, 2020, num).astype(float), "Label": [f"label {i}" for i in range(num)]})
+    for joinMethod in ["hash", "merge"]:
+        if joinMethod == "merge":
+            artistMedia, media = artistMedia.sort_values("dbid", ignore_index=True), media.sort_values("dbid", ignore_index=True)
+        mergeData = getMergeJoinData(artistMedia, media)
+        mergePeak = getPeakMemory(lambda: getMergeJoinData(artistMedia, media))
+        msfio = MediaSummaryFileIO(None, {"Artist": {"ArtistA": ["Year", "Genre"]}, "Media": {"MediaM": ["Year", "Label"]}}, joinMethod=joinMethod)
+        msfio.mediaData = {"ArtistA": artistMedia, "MediaM": media}
+        joinPeak = getPeakMemory(lambda: msfio.joinMediaData("ArtistA", "MediaM"))
+        joinData = msfio.mediaData["ArtistA-MediaM"]
+        assert msfio.colLocations["Year"] == "ArtistA-MediaM", f"MediaSummaryFileIO [{msfio}] did not locate Year in the joined data"
+        assert joinPeak < mergePeak, f"MediaSummaryFileIO [{msfio}] {joinMethod} join peak memory {joinPeak} is not below the single merge {mergePeak}"
+        for col in ["artids", "dbid", "Year"]:
+            assert list(joinData[col]) == list(mergeData[col]), f"MediaSummaryFileIO [{msfio}] {joinMethod} join {col} does not match the single merge"
+
+
+def test_mediaplan():
+    mediaSummary = {"Artist": {"ArtistA": ["Year", "Genre"], "ArtistB": ["Genre"]}, "Media": {"MediaM": ["Year", "Label"]}}
+    msfio = MediaSummaryFileIO(None, mediaSummary)
+    plan = msfio.getMediaPlan(["Label"])
+    assert plan == {"Load": {"MediaM": ["Label"]}, "Concat": {}, "Join": []}, f"MediaSummaryFileIO did not plan a single column load: {plan}"
+    plan = msfio.getMediaPlan(["Genre", "Year"])
+    assert plan["Load"] == {"ArtistA": ["Genre", "Year"], "ArtistB": ["Genre"], "MediaM": ["Year"]}, f"MediaSummaryFileIO did not plan the needed columns: {plan}"
+    assert plan["Concat"] == {"ArtistA-ArtistB": ["Genre"]}, f"MediaSummaryFileIO did not plan the Genre concat: {plan}"
+    assert plan["Join"] == [("ArtistA", "MediaM")], f"MediaSummaryFileIO did not plan the Year join: {plan}"
+    
+    
+if __name__ == "__main__":
+    test_mediajoin()
+    test_mediajoin_memory()
+    test_mediaplan()
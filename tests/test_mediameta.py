@@ -1,4 +1,12 @@
-from dbmeta import MediaMetaProducer
+from dbmeta import MediaMetaProducer, MediaTypeRankBase, flattenLongMediaMetaData
+from utils import getFlatList
+from pandas import Series
+from types import SimpleNamespace
+
+
+class RawData:
+    def __init__(self, media):
+        self.media = SimpleNamespace(media=media)
 
 
 def test_mediameta():
@@ -6,6 +14,47 @@ def test_mediameta():
     assert hasattr(mediametaprod, 'getMediaMetaData'), f"MediaMetaProducer [{mediametaprod}] does not have a getMediaMetaData function"
     
     
+def test_mediatyperank():
+    mtr = MediaTypeRankBase()
+    ranks = sorted(mtr.mediaTypes.keys())
+    mtr.mediaRanking = {ranks[0]: ["Album"], ranks[1]: ["Single", "Live"], ranks[-1]: []}
+    assert mtr.getMediaTypeRank("Live Album") == mtr.mediaTypes[ranks[1]], f"MediaTypeRankBase [{mtr}] did not pick the highest rank"
+    assert mtr.getMediaTypeRank("Mixtape") == mtr.mediaTypes[mtr.last], f"MediaTypeRankBase [{mtr}] did not put unmatched media in the last rank"
+    assert mtr.getMediaTypeRanks(["Album", None, "Album"]) == [mtr.mediaTypes[ranks[0]], mtr.mediaTypes[mtr.last], mtr.mediaTypes[ranks[0]]]
+    results = mtr.sortMediaData(Series({"Album": 2, "Mixtape": 1}))
+    assert results["Remaining"] == {"Mixtape": 1} and results[ranks[0]] == {"Album": 2}, f"MediaTypeRankBase [{mtr}] did not sort media data"
+    mtr.mediaRanking = {ranks[0]: ["Mixtape"], ranks[-1]: []}
+    assert mtr.getMediaTypeRank("Mixtape") == mtr.mediaTypes[ranks[0]], f"MediaTypeRankBase [{mtr}] did not reclassify after a new ranking"
+    mtr.mediaRanking[ranks[1]] = ["Mix"]
+    assert mtr.getMediaTypeRank("Mixtape") == mtr.mediaTypes[ranks[1]], f"MediaTypeRankBase [{mtr}] returned a memoized rank after an in place ranking change"
+    
+    
+def test_mediameta_long():
+    mtr = MediaTypeRankBase()
+    ranks = sorted(mtr.mediaTypes.keys())
+    mtr.mediaRanking = {ranks[0]: ["Album"], ranks[1]: ["Single"], ranks[-1]: []}
+    modValData = Series({"a": RawData({"Album": {1: SimpleNamespace(album="x"), 2: SimpleNamespace(album="y")}, "Mix": {3: SimpleNamespace(album="z")}}),
+                         "b": RawData({}), "c": RawData({"Single": {}})})
+    mediametaprod = MediaMetaProducer(mediaTypeRank=mtr, longFormat=True)
+    mediaNames = mediametaprod.getMediaNamesData(modValData)
+    assert all([mediaNames[artistID] == mediametaprod.utils.getMediaNames(rData) for artistID, rData in modValData.items()]), f"MediaMetaProducer [{mediametaprod}] batch media names are not the per artist names"
+    metaData = mediametaprod.getMediaMetaData(modValData)
+    assert metaData.shape[0] == 5, f"MediaMetaProducer [{mediametaprod}] did not create one row per media name (+ one per empty artist/media type)"
+    assert list(metaData["Position"]) == [0, 1, 0, -1, -1], f"MediaMetaProducer [{mediametaprod}] did not set media positions"
+    flatData, countsData = flattenLongMediaMetaData(metaData, counts=True)
+    assert flatData.loc["a", mtr.mediaTypes[ranks[0]]] == ["x", "y"] and flatData.loc["a", mtr.mediaTypes[mtr.last]] == ["z"]
+    assert flatData.loc["b"].isna().all(), "Empty artist does not have empty media"
+    assert flatData.loc["c", mtr.mediaTypes[ranks[1]]] == [] and flatData.loc["c", mtr.mediaTypes[ranks[0]]] is None, "Media type without names is not an empty list"
+    assert countsData.loc["a", mtr.mediaTypes[ranks[0]]] == 2 and countsData.loc["c"].sum() == 0, f"Media counts {countsData.to_dict()} are not the list lengths"
+    
+    # Same lists as flattening the wide format
+    wideData = MediaMetaProducer(mediaTypeRank=mtr).getMediaMetaData(modValData)
+    wideData = wideData.map(lambda x: getFlatList(x.values()) if isinstance(x, dict) else None).reindex(flatData.index)
+    assert all([wideValue == longValue for column in flatData.columns for wideValue, longValue in zip(wideData[column], flatData[column])]), "Long and wide media do not match"
+    
+    
 if __name__ == "__main__":
     test_mediameta()
+    test_mediatyperank()
+    test_mediameta_long()
     
\ No newline at end of file
@@ -0,0 +1,40 @@
+from dbmeta import MediaSummaryScheduler, MediaSummaryFileIO
+from pandas import DataFrame
+import time
+
+
+class SleepProc:
+    def __init__(self, key: str, summaryType: str, cols: list, spans: dict):
+        self.key = key
+        self.summaryType = summaryType
+        self.mapper = {col: None for col in cols}
+        self.spans = spans
+
+    def getMediaSummaryData(self):
+        start = time.perf_counter()
+        time.sleep(0.1)
+        self.spans[self.key] = (start, time.perf_counter())
+
+
+def test_mediasched():
+    mediaSummary = {"Artist": {"ArtistA": ["Year"]}, "Media": {"MediaM": ["Year", "Label"]}}
+    msfio = MediaSummaryFileIO(None, mediaSummary)
+    for name in ["ArtistA", "MediaM", "ArtistA-MediaM"]:
+        msfio.mediaData[name] = DataFrame({"dbid": [], "artids": [], "Year": [], "Label": []})
+    msfio.mediaColumns = {"ArtistA": {"Year"}, "MediaM": {"Year", "Label"}}
+
+    spans = {}
+    procs = {key: SleepProc(key, summaryType, cols, spans) for key, summaryType, cols in [("Dates", "Dates", ["Year"]), ("Label", "Label", ["Label"]), ("Label2", "Label", ["Label"])]}
+    sched = MediaSummaryScheduler(msfio, procs, workers=3)
+    timings = sched.run()
+    assert sched.deps[("Proc", "Dates")] == {("Join", "ArtistA-MediaM")}, f"MediaSummaryScheduler [{sched}] did not wait for the Year join"
+    assert ("Proc", "Label") in sched.deps[("Proc", "Label2")], f"MediaSummaryScheduler [{sched}] did not serialize the Label procs"
+    assert set(timings.keys()) == set(sched.tasks.keys()), f"MediaSummaryScheduler [{sched}] did not time every task"
+
+    (datesStart, datesEnd), (labelStart, labelEnd) = spans["Dates"], spans["Label"]
+    assert datesStart < labelEnd and labelStart < datesEnd, f"MediaSummaryScheduler [{sched}] did not overlap independent procs"
+    assert spans["Label2"][0] >= labelEnd, f"MediaSummaryScheduler [{sched}] ran two Label procs at once"
+    
+    
+if __name__ == "__main__":
+    test_mediasched()
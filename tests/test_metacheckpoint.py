@@ -0,0 +1,86 @@
+from dbbase import getModVals
+from dbmeta import MetaProducerBase, MetaTypeProducer, MediaMetaProducer, MediaTypeRankBase, getProducerFingerprint
+from pandas import DataFrame, Series
+from types import SimpleNamespace
+from tempfile import TemporaryDirectory
+from tests.tmpdataio import TmpDataIO
+
+
+def saveModValData(rdio, modVal, bad=False):
+    ids = [f"{modVal}-{i}" for i in range(3)]
+    data = DataFrame({"name": [f"Artist {dbid}" for dbid in ids], "url": [f"/artist/{dbid}" for dbid in ids],
+                      "General": [{"Born": 1970 + i, "Genre": ["rock"] * i} for i in range(3)]}, index=ids)
+    rdio.saveData("ModValData", modVal, data=data.drop(columns=["url"]) if bad is True else data)
+
+
+def test_metacheckpoint():
+    assert getProducerFingerprint(MetaTypeProducer("General", {"Columns": ["General"], "General": ["Born"]})) == \
+        getProducerFingerprint(MetaTypeProducer("General", {"Columns": ["General"], "General": ["Born"]})), "Same producer config has different fingerprints"
+    with TemporaryDirectory() as tmpDir:
+        rdio = TmpDataIO(tmpDir)
+        modVals = getModVals()
+        for modVal in modVals:
+            saveModValData(rdio, modVal)
+        mpb = MetaProducerBase(rdio)
+        mpb.procs["General"] = MetaTypeProducer("General", {"Columns": ["General"], "General": ["Born"]})
+        mpb.make(verbose=False)
+        assert mpb.getTasks(modVals, {}) == {}, f"MetaProducerBase [{mpb}] did not checkpoint every shard"
+
+        # Same producer class and code, different rules => only that MetaType is remade
+        mpb.procs["General"] = MetaTypeProducer("General", {"Columns": ["General"], "General": ["Born", ("Genre", len)]})
+        assert mpb.getTasks(modVals, {}) == {modVal: ["General"] for modVal in modVals}, f"MetaProducerBase [{mpb}] did not invalidate shards of a changed rule"
+        mpb.make(verbose=False)
+        assert list(rdio.getData("MetaGeneral", modVals[0]).columns) == ["Born", "Genre"], f"MetaProducerBase [{mpb}] did not remake MetaGeneral"
+        assert mpb.getTasks(modVals, {}) == {}, f"MetaProducerBase [{mpb}] did not checkpoint the remade shards"
+
+
+def test_metacheckpoint_memo():
+    # Memoized state filled while producing does not change a producer's fingerprint
+    mtr = MediaTypeRankBase()
+    ranks = sorted(mtr.mediaTypes.keys())
+    mtr.mediaRanking = {ranks[0]: ["Album"], ranks[-1]: []}
+    mediametaprod = MediaMetaProducer(mediaTypeRank=mtr)
+    fingerprints = (getProducerFingerprint(mtr), getProducerFingerprint(mediametaprod))
+    assert mtr.getRank("Live Album") == ranks[0], f"MediaTypeRankBase [{mtr}] did not rank Live Album"
+    mediametaprod.getMediaMetaData(Series({"a": SimpleNamespace(media=SimpleNamespace(media={"Album": {1: SimpleNamespace(album="x")}}))}))
+    assert len(mtr.cache) > 0 and len(mediametaprod.utils.plans) > 0, f"MediaMetaProducer [{mediametaprod}] did not fill its memos"
+    assert (getProducerFingerprint(mtr), getProducerFingerprint(mediametaprod)) == fingerprints, f"MediaMetaProducer [{mediametaprod}] fingerprint changed after producing"
+    
+    with TemporaryDirectory() as tmpDir:
+        rdio = TmpDataIO(tmpDir)
+        for modVal in getModVals():
+            saveModValData(rdio, modVal)
+        mpb = MetaProducerBase(rdio)
+        fingerprint = getProducerFingerprint(mpb)
+        mpb.make(verbose=False)
+        assert getProducerFingerprint(mpb) == fingerprint, f"MetaProducerBase [{mpb}] fingerprint changed after make"
+    
+    
+def test_meta_failed_shard():
+    # Serial, prefetch and pool runs all record the bad shard, save and checkpoint the others
+    for options in [{}, {"prefetch": 2}, {"workers": 2}]:
+        with TemporaryDirectory() as tmpDir:
+            rdio = TmpDataIO(tmpDir)
+            modVals = getModVals()
+            for modVal in modVals:
+                saveModValData(rdio, modVal, bad=(modVal == modVals[1]))
+            mpb = MetaProducerBase(rdio)
+            mpb.make(verbose=False, onError="collect", **options)
+            assert list(mpb.failedModVals.keys()) == [modVals[1]], f"MetaProducerBase [{mpb}] with {options} failed ModVals {list(mpb.failedModVals.keys())}"
+            assert "AssertionError" in mpb.failedModVals[modVals[1]], f"MetaProducerBase [{mpb}] with {options} did not keep the shard error"
+            assert rdio.getData("MetaBasic", modVals[1]) is None and rdio.getData("MetaBasic", modVals[-1]) is not None, f"MetaProducerBase [{mpb}] with {options} did not skip only the bad shard"
+            assert list(mpb.getTasks(modVals, {}).keys()) == [modVals[1]], f"MetaProducerBase [{mpb}] with {options} checkpointed the bad shard"
+            
+            # Default: every shard is tried, then the failures are raised
+            raised = False
+            try:
+                MetaProducerBase(rdio).make(verbose=False, force=True, **options)
+            except RuntimeError as error:
+                raised = f"[{modVals[1]}]" in str(error)
+            assert raised is True, f"MetaProducerBase with {options} did not raise for the failed shard"
+
+
+if __name__ == "__main__":
+    test_metacheckpoint()
+    test_metacheckpoint_memo()
+    test_meta_failed_shard()
@@ -0,0 +1,31 @@
+from dbmeta import MetaProducerUtilBase
+from pandas import Series
+from types import SimpleNamespace
+
+
+class RawData:
+    def __init__(self, general, media):
+        self.profile = SimpleNamespace(general=general, genres=["rock"])
+        self.media = SimpleNamespace(media=media)
+
+
+class RawTextData:
+    pass
+
+
+def test_metautils_batch():
+    utils = MetaProducerUtilBase()
+    modValData = Series({"a": RawData({"Born": 1970}, {"Album": {1: SimpleNamespace(album="x")}}), "b": RawTextData(), "c": RawData(None, {})})
+    fields = ["General", ("General", "Born", -1), "Genres", "MediaNames"]
+    batchData = utils.getBatchData(modValData, fields)
+    assert list(batchData.columns) == ["General", "Born", "Genres", "MediaNames"], f"MetaProducerUtilBase [{utils}] did not name the batch columns"
+    for artistID, rData in modValData.items():
+        assert batchData.loc[artistID, "General"] == utils.getGeneralDictData(rData)
+        assert batchData.loc[artistID, "Born"] == utils.getGeneralData(rData, "Born", -1)
+        assert batchData.loc[artistID, "Genres"] == utils.getGenresData(rData)
+        assert batchData.loc[artistID, "MediaNames"] == utils.getMediaNames(rData)
+    assert len(utils.plans) == 2, f"MetaProducerUtilBase [{utils}] did not cache one plan per raw class"
+
+
+if __name__ == "__main__":
+    test_metautils_batch()
@@ -0,0 +1,18 @@
+from dbmeta import MetaVisitor, MetaTypeProducer, MetaBasicProducer
+from pandas import DataFrame
+
+
+def test_metavisitor():
+    modValData = DataFrame({"name": ["a", "b"], "url": ["/a", "/b"], "profile": [{"Born": 1970, "Genres": ["rock"]}, None],
+                            "Media": [DataFrame({"Type": ["LP", "EP"]}), None]}, index=["1", "2"])
+    procs = {"Basic": MetaBasicProducer(), "Profile": MetaTypeProducer("Profile", {"Columns": ["profile"], "profile": ["Born", ("Genres", len)]})}
+    mv = MetaVisitor(procs)
+    metaData = mv.visit(modValData)
+    for metaType, metaTypeProd in procs.items():
+        assert metaData[metaType].equals(metaTypeProd.getMetaData(modValData)), f"MetaVisitor [{mv}] did not reproduce the {metaType} producer"
+    emptyData = mv.visit(modValData.iloc[:0])
+    assert all([emptyData[metaType].shape[0] == 0 for metaType in procs.keys()]), f"MetaVisitor [{mv}] did not handle an empty shard"
+    
+    
+if __name__ == "__main__":
+    test_metavisitor()
@@ -0,0 +1,21 @@
+from dbmeta import ModValPipeline
+import time
+
+
+def test_modvalpipe():
+    def loader(modVal):
+        time.sleep(0.01 * (5 - modVal))
+        return modVal * 10
+    
+    written = []
+    with ModValPipeline(loader, range(5), prefetch=3, maxWrites=2) as pipe:
+        results = list(pipe)
+        for modVal, data in results:
+            pipe.write(written.append, (modVal, data))
+            assert len(pipe.writes) <= 2, f"ModValPipeline [{pipe}] did not bound the pending writes"
+    assert results == [(modVal, modVal * 10) for modVal in range(5)], f"ModValPipeline [{pipe}] did not keep the modVal order"
+    assert written == results, f"ModValPipeline [{pipe}] did not finish all writes"
+    
+    
+if __name__ == "__main__":
+    test_modvalpipe()
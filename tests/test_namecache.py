@@ -0,0 +1,77 @@
+from dbmeta import NameStandardCache
+from pandas import Series
+from concurrent.futures import ThreadPoolExecutor
+from tempfile import TemporaryDirectory
+from pathlib import Path
+import pickle
+
+
+class LowerNameStandard:
+    def __init__(self, suffix=""):
+        self.suffix = suffix
+        
+    def update(self, values, dtype="Name", **kwargs):
+        return values.map(lambda value: value.lower() + self.suffix if isinstance(value, str) else value)
+
+
+def test_namecache():
+    nsc = NameStandardCache(LowerNameStandard())
+    values = Series(["The Band", "Artist", "The Band", None], index=["a", "b", "c", "d"])
+    result = nsc.update(values, dtype="Name")
+    assert result.loc["a"] == "the band" and result.loc["c"] == "the band", f"NameStandardCache [{nsc}] did not standardize duplicates"
+    assert result.index.equals(values.index), f"NameStandardCache [{nsc}] did not keep the index"
+    nsc.update(values, dtype="Name")
+    assert nsc.hits == 2, f"NameStandardCache [{nsc}] did not reuse cached values"
+    
+    
+def test_namecache_worker():
+    nsc = NameStandardCache(LowerNameStandard())
+    nsc.update(Series(["The Band"]), dtype="Name")
+    worker = pickle.loads(pickle.dumps(nsc))
+    assert len(worker.cache) == 0, f"NameStandardCache [{worker}] shipped its cache"
+    worker.startUpdates()
+    worker.update(Series(["Artist", "Other", "Artist"]), dtype="Name")
+    nsc.mergeUpdates(worker.popUpdates())
+    assert len(nsc.cache) == 3 and nsc.rows == 4 and nsc.misses == 3, f"NameStandardCache [{nsc}] did not merge the worker's entries"
+    assert worker.popUpdates()["cache"] == {}, f"NameStandardCache [{worker}] returned the same entries twice"
+    nsc.update(Series(["Other"]), dtype="Name")
+    assert nsc.hits == 1, f"NameStandardCache [{nsc}] did not reuse a merged entry"
+    
+    
+def test_namecache_lru():
+    nsc = NameStandardCache(LowerNameStandard(), maxSize=2)
+    for name in ["A", "B", "A", "C"]:
+        nsc.update(Series([name]), dtype="Name")
+    assert [key for _, key in nsc.cache.keys()] == ["A", "C"], f"NameStandardCache [{nsc}] did not evict the least recently used name"
+    
+    
+def test_namecache_file():
+    with TemporaryDirectory() as tmpDir:
+        cacheFile = Path(tmpDir) / "NameCache.p"
+        nsc = NameStandardCache(LowerNameStandard(), cacheFile=cacheFile)
+        nsc.update(Series(["The Band"]), dtype="Name")
+        nsc.save()
+        assert len(NameStandardCache(LowerNameStandard(), cacheFile=cacheFile).cache) == 1, "NameStandardCache did not load its saved cache"
+        nsc = NameStandardCache(LowerNameStandard(suffix="!"), cacheFile=cacheFile)
+        assert len(nsc.cache) == 0, f"NameStandardCache [{nsc}] loaded the cache of a changed standard"
+        assert nsc.update(Series(["The Band"]), dtype="Name").iloc[0] == "the band!", f"NameStandardCache [{nsc}] served a stale name"
+    
+    
+def test_namecache_threads():
+    # Prefetch reader threads standardize through one (small, constantly trimmed) cache
+    nsc = NameStandardCache(LowerNameStandard(), maxSize=50)
+    shards = [Series([f"Artist {(shard * 7 + i) % 200}" for i in range(100)]) for shard in range(40)]
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        results = list(executor.map(lambda values: nsc.update(values, dtype="Name"), shards))
+    for values, result in zip(shards, results):
+        assert result.equals(values.str.lower()), f"NameStandardCache [{nsc}] returned wrong names under threads"
+    assert len(nsc.cache) <= 50 and nsc.rows == 4000, f"NameStandardCache [{nsc}] cache size/counters are off under threads"
+    assert len(pickle.loads(pickle.dumps(nsc)).update(Series(["A"]), dtype="Name")) == 1, f"NameStandardCache [{nsc}] did not unpickle with a lock"
+    
+    
+if __name__ == "__main__":
+    test_namecache()
+    test_namecache_worker()
+    test_namecache_lru()
+    test_namecache_file()
+    test_namecache_threads()
@@ -1 +1 @@
-from dbmaster import MasterDBsfrom dbbase import MusicDBRootDataIOfrom dbmeta import SummaryProducerIOdef test_summary():    dbs = MasterDBs().getDBs()    rdio = MusicDBRootDataIO(dbs[0])    sumprodio = SummaryProducerIO(rdio)    assert hasattr(sumprodio, 'make'), f"SummaryProducerIO [{sumprodio}] does not have a make function"        if __name__ == "__main__":    test_summary()    
\ No newline at end of file
+from dbmaster import MasterDBsfrom dbbase import MusicDBRootDataIO, getModValsfrom dbmeta import SummaryProducerIOfrom pandas import DataFramefrom tempfile import TemporaryDirectoryfrom tests.tmpdataio import TmpDataIOdef test_summary():    dbs = MasterDBs().getDBs()    rdio = MusicDBRootDataIO(dbs[0])    sumprodio = SummaryProducerIO(rdio)    assert hasattr(sumprodio, 'make'), f"SummaryProducerIO [{sumprodio}] does not have a make function"        def test_summary_workers():    # Pool workers return the same frames (in modVal order) as the serial loop and their name cache entries    with TemporaryDirectory() as tmpDir:        rdio = TmpDataIO(tmpDir)        modVals = getModVals()        for modVal in reversed(modVals):            ids = [f"{modVal}-{i}" for i in range(5)]            data = DataFrame({"ArtistName": [f"Artist {i % 3}" for i in range(5)], "URL": [f"/artist/{dbid}" for dbid in ids], "NumAlbums": range(5)}, index=ids)            rdio.saveData("MetaBasic", modVal, data=data)        summaryData = {}        for workers in [None, 2]:            sumprodio = SummaryProducerIO(rdio, workers=workers)            sumprodio.make(key="Basic")            summaryData[workers] = {summaryKey: rdio.getData(summaryKey) for summaryKey in ["SummaryName", "SummaryRef", "SummaryNumAlbums"]}            assert len(sumprodio.sns.cache) == 3, f"SummaryProducerIO [{sumprodio}] with workers={workers} did not keep the name cache entries"        for summaryKey, data in summaryData[None].items():            assert data.equals(summaryData[2][summaryKey]), f"SummaryProducerIO parallel {summaryKey} does not match the serial one"            assert list(data.index[:5]) == [f"{modVals[0]}-{i}" for i in range(5)], f"SummaryProducerIO {summaryKey} is not in modVal order"        if __name__ == "__main__":    test_summary()    test_summary_workers()    
\ No newline at end of file
@@ -0,0 +1,19 @@
+from dbmeta import SummaryAccumulator
+from pandas import DataFrame, concat
+
+
+def test_summaryaccum():
+    shards = [DataFrame({"ArtistName": [f"Artist {modVal}-{i}" for i in range(20)], "NumAlbums": range(20)},
+                        index=[f"{modVal}-{i}" for i in range(20)]) for modVal in range(6)]
+    summaryData = SummaryAccumulator(maxMemory=2 * int(shards[0].memory_usage(deep=False).sum()))
+    for modVal, shard in enumerate(shards):
+        summaryData.add(shard, key=modVal)
+    assert summaryData.numSpilled > 0, f"SummaryAccumulator [{summaryData}] did not spill above maxMemory"
+    tmpDir = summaryData.tmpDir
+    assert list(summaryData.shardIndex.keys()) == list(range(6)), f"SummaryAccumulator [{summaryData}] did not keep the shard index"
+    assert summaryData.get().equals(concat(shards)), f"SummaryAccumulator [{summaryData}] did not round trip the spilled shards"
+    assert len(summaryData) == 0 and not tmpDir.exists(), f"SummaryAccumulator [{summaryData}] did not release the spilled shards"
+    
+    
+if __name__ == "__main__":
+    test_summaryaccum()
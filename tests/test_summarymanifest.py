@@ -0,0 +1,100 @@
+from dbbase import getModVals
+from dbmeta import SummaryProducerIO, SummaryPartitionIO
+from pandas import DataFrame
+from tempfile import TemporaryDirectory
+from tests.tmpdataio import TmpDataIO
+
+
+def saveBasicMetaData(rdio, modVal, numArtists=4):
+    ids = [f"{modVal}-{i}" for i in range(numArtists)]
+    data = DataFrame({"ArtistName": [f"Artist {dbid}" for dbid in ids], "URL": [f"/artist/{dbid}" for dbid in ids],
+                      "NumAlbums": [i % 3 for i in range(numArtists)]}, index=ids)
+    rdio.saveData("MetaBasic", modVal, data=data)
+
+
+def test_summary_incremental_partitioned():
+    with TemporaryDirectory() as tmpDir:
+        rdio = TmpDataIO(tmpDir)
+        modVals = getModVals()
+        for modVal in modVals:
+            saveBasicMetaData(rdio, modVal)
+        SummaryProducerIO(rdio, nameCache=False).make(key="Basic", incremental=True)
+
+        # First partitioned run against an existing manifest: only one shard changed but the store is empty
+        saveBasicMetaData(rdio, modVals[-1], numArtists=5)
+        sumprodio = SummaryProducerIO(rdio, nameCache=False)
+        sumprodio.make(key="Basic", incremental=True, partitioned=True)
+        sio = SummaryPartitionIO(rdio)
+        summaryName = rdio.getData("SummaryName")
+        assert summaryName.shape[0] == 4 * len(modVals) + 1, f"SummaryProducerIO [{sumprodio}] did not patch SummaryName"
+        assert sio.getPartitions("SummaryName") == sorted(modVals), f"SummaryPartitionIO [{sio}] did not write every shard"
+        assert sio.read("SummaryName").sort_index().equals(summaryName.sort_index()), f"SummaryPartitionIO [{sio}] does not match SummaryName"
+
+        # Partitioned patch of a store that matches the manifest
+        saveBasicMetaData(rdio, modVals[0], numArtists=2)
+        SummaryProducerIO(rdio, nameCache=False).make(key="Basic", incremental=True, partitioned=True)
+        sio = SummaryPartitionIO(rdio)
+        summaryName = rdio.getData("SummaryName")
+        assert summaryName.shape[0] == 4 * len(modVals) - 1, f"SummaryProducerIO [{sumprodio}] did not patch SummaryName"
+        assert sio.read("SummaryName").sort_index().equals(summaryName.sort_index()), f"SummaryPartitionIO [{sio}] does not match SummaryName"
+        numAlbums = sio.read("SummaryNumAlbums", filters=[("NumAlbums", ">=", 10)])
+        assert numAlbums is not None and numAlbums.shape[0] == 0, f"SummaryPartitionIO [{sio}] did not return empty data when every partition is pruned"
+
+
+
+def test_summary_incremental_rebuild():
+    with TemporaryDirectory() as tmpDir:
+        rdio = TmpDataIO(tmpDir)
+        modVals = getModVals()
+        for modVal in modVals:
+            saveBasicMetaData(rdio, modVal)
+        SummaryProducerIO(rdio, nameCache=False).make(key="Basic", incremental=True)
+
+        # One changed (smaller) shard and one deleted shard
+        saveBasicMetaData(rdio, modVals[0], numArtists=2)
+        rdio.getFilename("MetaBasic", modVals[-1]).unlink()
+        sumprodio = SummaryProducerIO(rdio, nameCache=False, incremental=True)
+        sumprodio.make(key="Basic")
+        assert sumprodio.summaryModVals == [modVals[0], modVals[-1]], f"SummaryProducerIO [{sumprodio}] patched shards {sumprodio.summaryModVals}"
+        patchedData = {summaryKey: rdio.getData(summaryKey) for summaryKey in ["SummaryName", "SummaryRef", "SummaryNumAlbums"]}
+
+        SummaryProducerIO(rdio, nameCache=False).make(key="Basic")
+        for summaryKey, data in patchedData.items():
+            assert data.equals(rdio.getData(summaryKey)), f"SummaryProducerIO [{sumprodio}] patched {summaryKey} does not match a full rebuild"
+
+
+def saveMediaMetaData(rdio, modVal, ranks=("RankA",)):
+    ids = [f"{modVal}-{i}" for i in range(3)]
+    data = DataFrame({rank: [{"Album": [f"{rank} {dbid}"]} if rank in ranks else None for dbid in ids] for rank in ["RankA", "RankB"]}, index=ids)
+    rdio.saveData("MetaMedia", modVal, data=data)
+
+
+def test_summary_incremental_optional():
+    with TemporaryDirectory() as tmpDir:
+        rdio = TmpDataIO(tmpDir)
+        modVals = getModVals()
+        for modVal in modVals:
+            saveMediaMetaData(rdio, modVal)
+        SummaryProducerIO(rdio, nameCache=False).make(key="Media", incremental=True)
+        assert not rdio.getFilename("SummaryRankBMedia").exists(), "SummaryProducerIO saved an empty optional output"
+        
+        # A changed shard makes a new optional output: it is not saved from that shard's rows alone
+        saveMediaMetaData(rdio, modVals[0], ranks=("RankA", "RankB"))
+        sumprodio = SummaryProducerIO(rdio, nameCache=False, incremental=True)
+        sumprodio.make(key="Media")
+        assert sumprodio.patching is True, f"SummaryProducerIO [{sumprodio}] did not patch"
+        assert not rdio.getFilename("SummaryRankBMedia").exists(), f"SummaryProducerIO [{sumprodio}] saved a partial optional output"
+        
+        # The next run rebuilds every shard and saves it like a full rebuild
+        sumprodio = SummaryProducerIO(rdio, nameCache=False, incremental=True)
+        sumprodio.make(key="Media")
+        assert sumprodio.summaryModVals == modVals, f"SummaryProducerIO [{sumprodio}] did not rebuild every shard"
+        rankData = rdio.getData("SummaryRankBMedia")
+        assert rankData.shape[0] == 3 * len(modVals), f"SummaryProducerIO [{sumprodio}] SummaryRankBMedia does not cover every artist"
+        assert rankData.count() == 3, f"SummaryProducerIO [{sumprodio}] SummaryRankBMedia does not have the changed shard's media"
+
+
+if __name__ == "__main__":
+    test_summary_incremental_partitioned()
+    test_summary_incremental_rebuild()
+    test_summary_incremental_optional()
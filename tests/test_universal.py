@@ -0,0 +1,73 @@
+from dbmeta import UniversalMetaProducer
+from utils import getFlatList
+from pandas import DataFrame, Series
+from types import SimpleNamespace
+from statistics import median
+import numpy as np
+
+
+def getMediaDateStats(mediaDates):
+    # Per artist int(year) + statistics.median of the original getDatesMetaData
+    mediaTypeDates = []
+    for year in getFlatList(mediaDates.values()):
+        try:
+            mediaTypeDates.append(int(year))
+        except Exception:
+            continue
+    retval = (min(mediaTypeDates), max(mediaTypeDates), int(median(mediaTypeDates))) if len(mediaTypeDates) > 0 else (None, None, None)
+    return retval
+
+
+def getBasicMetaData(modValData):
+    # Per column apply of the original getBasicMetaData
+    artistNames = modValData.apply(lambda rData: rData.artist.name)
+    artistNames.name = "ArtistName"
+    artistURLs = modValData.apply(lambda rData: rData.url.url)
+    artistURLs.name = "URL"
+    artistNumAlbums = modValData.apply(lambda rData: sum(rData.mediaCounts.counts.values()))
+    artistNumAlbums.name = "NumAlbums"
+    return DataFrame([artistNames, artistURLs, artistNumAlbums]).T
+
+
+def getRawData(name, url, counts):
+    return SimpleNamespace(artist=SimpleNamespace(name=name), url=SimpleNamespace(url=url), mediaCounts=SimpleNamespace(counts=counts))
+
+
+def test_universal_basic():
+    ump = UniversalMetaProducer()
+    modValData = Series({"a": getRawData("Artist A", "/artist/a", {"Album": 3, "Single": 2}),
+                         "b": getRawData(None, None, {}),
+                         "c": getRawData(float("nan"), "/artist/c", {"Album": np.int64(1)}),
+                         "d": getRawData(7, b"/artist/d", {"Album": 0, "Single": True})})
+    metaData = ump.getBasicMetaData(modValData)
+    expected = getBasicMetaData(modValData)
+    assert list(metaData.columns) == list(expected.columns) and metaData.index.equals(expected.index), f"UniversalMetaProducer [{ump}] basic columns/index changed"
+    assert metaData.astype(object).equals(expected.astype(object)), f"UniversalMetaProducer [{ump}] basic metadata {metaData.to_dict()} is not {expected.to_dict()}"
+    assert metaData["NumAlbums"].dtype.kind == "i", f"UniversalMetaProducer [{ump}] NumAlbums is not an integer column"
+
+
+def getDatesMetaData(modValData):
+    # Per artist apply of the original getDatesMetaData
+    metaData = modValData.apply(getMediaDateStats).apply(Series)
+    metaData.columns = ["MinYear", "MaxYear", "MedianYear"]
+    return metaData
+
+
+def test_universal_dates():
+    ump = UniversalMetaProducer()
+    ump.utils.getMediaDates = lambda mediaDates: mediaDates
+    modValData = Series({"a": {"Album": [1999.0, "2001", 2003, np.float64(2005.0), b"2007"]},
+                         "b": {"Album": [" 1990 ", "199x", None, float("nan")], "Single": [True, 1994.7, np.int64(1980)]},
+                         "c": {"Album": ["", "2001.0", float("inf")]},
+                         "d": {}})
+    for artistIDs in [["a", "b", "c", "d"], ["a", "b"], ["c", "d"]]:
+        metaData = ump.getDatesMetaData(modValData[artistIDs])
+        expected = getDatesMetaData(modValData[artistIDs])
+        assert list(metaData.columns) == ["MinYear", "MaxYear", "MedianYear"], f"UniversalMetaProducer [{ump}] did not name the dates columns"
+        assert list(metaData.dtypes) == list(expected.dtypes), f"UniversalMetaProducer [{ump}] dates dtypes {list(metaData.dtypes)} are not {list(expected.dtypes)}"
+        assert metaData.equals(expected), f"UniversalMetaProducer [{ump}] dates {metaData.to_dict()} are not {expected.to_dict()}"
+
+
+if __name__ == "__main__":
+    test_universal_basic()
+    test_universal_dates()
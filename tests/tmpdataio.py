@@ -0,0 +1,37 @@
+from dbbase import MusicDBRootDataIO
+from pathlib import Path
+import pickle
+
+
+###############################################################################
+# rdio Whose Artifacts Live In A Temporary Directory
+###############################################################################
+class TmpDataIO(MusicDBRootDataIO):
+    def __repr__(self):
+        return f"TmpDataIO(db={self.db}, root={self.root})"
+
+    def __init__(self, root, db="TestDB"):
+        self.db = db
+        self.root = Path(root)
+
+    def getFilename(self, name, modVal=None):
+        retval = self.root / self.db / (name if modVal is None else "ModVal") / (f"{name}.p" if modVal is None else f"{modVal}-{name}.p")
+        retval.parent.mkdir(parents=True, exist_ok=True)
+        return retval
+
+    def getData(self, name, modVal=None):
+        if not self.getFilename(name, modVal).exists():
+            return None
+        with open(self.getFilename(name, modVal), "rb") as f:
+            retval = pickle.load(f)
+        return retval
+
+    def saveData(self, name, modVal=None, data=None):
+        with open(self.getFilename(name, modVal), "wb") as f:
+            pickle.dump(data, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+    def getModValFilename(self, modVal):
+        return self.getFilename("ModValData", modVal)
+
+    def getModValData(self, modVal):
+        return self.getData("ModValData", modVal)